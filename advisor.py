@@ -5,20 +5,37 @@ Collects position, strategy, market, and candlestick data
 for AI strategy analysis and generates suggestions.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
 import re
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 import config
+import indicators
+import models
+from advisor_memo import AnalysisMemo, fingerprint, is_partial
 from api import TerminalAPI
+from candle_store import CandleStore
+from history_publisher import HistoryPublisher
 from llm import LLMClient
+from llm_scheduler import LLMScheduler
+from snapshot_hub import latest_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Timestamp line of format_for_llm, ignored when deduplicating LLM jobs
+_COLLECTED_AT = re.compile(r"^Collected at: .*$", re.MULTILINE)
+
+
+class ApiResponseError(Exception):
+    """TerminalAPI returned an {"error": ...} dict instead of data."""
+
 
 @dataclass
 class CollectedData:
@@ -111,89 +128,151 @@ class StrategyDataCollector:
     CANDLE_TIMEFRAMES = ["1h", "4h", "1d"]
     CANDLE_LIMITS = {"1h": 24, "4h": 24, "1d": 7}
     MAX_TOKENS_FOR_CANDLES = 5
+    # Requests run concurrently, at most FETCH_CONCURRENCY at once, each bounded by CALL_TIMEOUT
+    FETCH_CONCURRENCY = 6
+    CALL_TIMEOUT = 15.0
 
     def __init__(self, api: TerminalAPI):
         self.api = api
+        # Kept across collect() calls, so later runs only fetch the newest bars
+        self.candle_store = CandleStore(api)
+        self._collecting: asyncio.Future | None = None
 
     async def collect(self) -> CollectedData:
+        """Collect all analysis data; concurrent callers share one collection.
+
+        Returns:
+            CollectedData with positions, strategies, market data, candles
+        """
+        loop = asyncio.get_running_loop()
+        if self._collecting is None or self._collecting.get_loop() is not loop:
+            self._collecting = asyncio.ensure_future(self._collect())
+            self._collecting.add_done_callback(self._collect_done)
+        # shield: a cancelled caller must not cancel the collection others wait on
+        return await asyncio.shield(self._collecting)
+
+    def _collect_done(self, future: asyncio.Future):
+        if self._collecting is future:
+            self._collecting = None
+
+    async def _collect(self) -> CollectedData:
         """Collect all analysis data.
 
+        The token list and the vault snapshot are fetched concurrently; candle
+        requests fan out as soon as positions are known. Calls that raise, time
+        out or return an {"error": ...} dict are recorded in CollectedData.errors
+        and leave their field empty.
+
         Returns:
             CollectedData with positions, strategies, market data, candles
         """
         result = CollectedData(collected_at=datetime.now().isoformat())
+        semaphore = asyncio.Semaphore(self.FETCH_CONCURRENCY)
 
-        # Collect core data (each independently to handle partial failures)
-        try:
-            result.positions = await self.api.get_positions()
-        except Exception as e:
-            logger.error("Failed to fetch positions: %s", e)
-            result.errors.append(f"positions: {e}")
+        await asyncio.gather(
+            self._collect_tokens(result, semaphore),
+            self._collect_snapshot_and_candles(result, semaphore),
+        )
+        return result
 
-        try:
-            result.strategies = await self.api.get_strategies()
-        except Exception as e:
-            logger.error("Failed to fetch strategies: %s", e)
-            result.errors.append(f"strategies: {e}")
+    async def _bounded(self, semaphore: asyncio.Semaphore, call: Awaitable[Any]) -> Any:
+        """Run one API call under the concurrency limit and deadline.
 
-        try:
-            result.vault = await self.api.get_vault()
-        except Exception as e:
-            logger.error("Failed to fetch vault: %s", e)
-            result.errors.append(f"vault: {e}")
+        Raises:
+            ApiResponseError: The call returned an {"error": ...} dict
+        """
+        async with semaphore:
+            data = await asyncio.wait_for(call, self.CALL_TIMEOUT)
+        if isinstance(data, dict) and "error" in data:
+            raise ApiResponseError(data["error"])
+        return data
+
+    @staticmethod
+    def _describe(error: Exception) -> str:
+        return "timed out" if isinstance(error, TimeoutError) else str(error)
 
+    async def _collect_tokens(self, result: CollectedData, semaphore: asyncio.Semaphore):
         try:
-            result.eth_price = await self.api.get_eth_price()
+            result.tokens = await self._bounded(semaphore, self.api.get_tokens(limit=20))
         except Exception as e:
-            logger.error("Failed to fetch ETH price: %s", e)
-            result.errors.append(f"eth_price: {e}")
-
+            logger.error("Failed to fetch tokens: %s", self._describe(e))
+            result.errors.append(f"tokens: {self._describe(e)}")
+
+    async def _collect_snapshot_and_candles(
+        self, result: CollectedData, semaphore: asyncio.Semaphore
+    ):
+        # Core data comes from the shared vault snapshot; sections fail (and time
+        # out, see snapshot_hub.SECTION_TIMEOUT) independently
+        sections = ("positions", "strategies", "vault", "eth_price")
         try:
-            result.tokens = await self.api.get_tokens(limit=20)
+            snapshot = await latest_snapshot(self.api)
+            errors = snapshot.errors
         except Exception as e:
-            logger.error("Failed to fetch tokens: %s", e)
-            result.errors.append(f"tokens: {e}")
+            snapshot, errors = None, dict.fromkeys(sections, self._describe(e))
+
+        for section in sections:
+            if section in errors:
+                logger.error(f"Failed to fetch {section}: {errors[section]}")
+                result.errors.append(f"{section}: {errors[section]}")
+            else:
+                setattr(result, section, getattr(snapshot, section))
 
         # Collect candlestick data for held tokens
-        result.candles = await self._collect_candles(result.positions)
+        result.candles = await self._collect_candles(result.positions, semaphore, result.errors)
 
-        return result
+    async def _collect_candles(
+        self,
+        positions: dict,
+        semaphore: asyncio.Semaphore | None = None,
+        errors: list[str] | None = None,
+    ) -> dict[str, dict[str, list]]:
+        """Collect candlestick data for held tokens (all timeframes concurrently).
 
-    async def _collect_candles(self, positions: dict) -> dict[str, dict[str, list]]:
-        """Collect candlestick data for held tokens."""
+        Args:
+            positions: Positions response
+            semaphore: Shared concurrency limit (default: a new FETCH_CONCURRENCY limit)
+            errors: List failed requests are appended to
+        """
         candles = {}
 
         if not positions:
             return candles
 
-        # Support both API formats: positions (from API) or tokens (from test)
-        held_tokens = positions.get("positions", positions.get("tokens", []))[
-            : self.MAX_TOKENS_FOR_CANDLES
-        ]
-
+        semaphore = semaphore or asyncio.Semaphore(self.FETCH_CONCURRENCY)
+        held_tokens = models.positions_snapshot(positions).positions[: self.MAX_TOKENS_FOR_CANDLES]
+
+        async def fetch(addr: str, symbol: str, tf: str):
+            limit = self.CANDLE_LIMITS.get(tf, 24)
+            try:
+                data = await self._bounded(semaphore, self.candle_store.get(addr, tf, limit))
+            except Exception as e:
+                logger.warning("Failed to fetch %s candles for %s: %s", tf, symbol, e)
+                if errors is not None:
+                    errors.append(f"candles {symbol} {tf}: {self._describe(e)}")
+                data = None
+            if isinstance(data, dict) and "stale" in data:
+                # Update failed; the stored bars are used but the run is partial
+                if errors is not None:
+                    errors.append(f"candles {symbol} {tf}: stale ({data['stale']})")
+            # API returns UDF format (dict with s, h, l, c, t, v arrays)
+            candles[symbol][tf] = data if isinstance(data, dict) and data.get("s") == "ok" else {}
+
+        requests = []
         for token in held_tokens:
-            addr = token.get("tokenAddress")
-            symbol = token.get("tokenSymbol", token.get("symbol", "UNKNOWN"))
+            addr, symbol = token.token_address, token.symbol
 
             if not addr:
                 continue
 
             candles[symbol] = {}
+            requests.extend(fetch(addr, symbol, tf) for tf in self.CANDLE_TIMEFRAMES)
 
-            for tf in self.CANDLE_TIMEFRAMES:
-                try:
-                    limit = self.CANDLE_LIMITS.get(tf, 24)
-                    data = await self.api.get_candles(addr, tf, limit)
-                    # API returns UDF format (dict with s, h, l, c, t, v arrays)
-                    if isinstance(data, dict) and data.get("s") == "ok":
-                        candles[symbol][tf] = data
-                    else:
-                        candles[symbol][tf] = {}
-                except Exception as e:
-                    logger.warning("Failed to fetch %s candles for %s: %s", tf, symbol, e)
-                    candles[symbol][tf] = {}
-
-        return candles
+        await asyncio.gather(*requests)
+        # Keep timeframe order stable regardless of completion order
+        return {
+            symbol: {tf: frames[tf] for tf in self.CANDLE_TIMEFRAMES if tf in frames}
+            for symbol, frames in candles.items()
+        }
 
     def format_for_llm(self, data: CollectedData) -> str:
         """Format collected data as LLM-readable text.
@@ -258,47 +337,35 @@ class StrategyDataCollector:
             lines.append(f"ETH Balance: {eth_balance} ETH")
             lines.append(f"Total PnL (USD): {total_pnl}")
 
-            # Support both API formats: positions/tokenSymbol and tokens/symbol
-            tokens = data.positions.get("positions", data.positions.get("tokens", []))
+            tokens = models.positions_snapshot(data.positions).positions
             if tokens:
                 lines.append(f"Held Tokens ({len(tokens)}):")
                 for t in tokens[:10]:
-                    # Support both tokenSymbol (API) and symbol (test)
-                    symbol = t.get("tokenSymbol", t.get("symbol", "?"))
-                    # Support both currentValueUsd (API) and balance (test)
-                    val_raw = t.get("currentValueUsd", t.get("balance", "0"))
-                    val = format_usd(val_raw)
                     # Show unrealized PnL (floating) for decision-making, plus realized for context
-                    unrealized_pnl_raw = t.get("unrealizedPnlUsd", t.get("pnlUsd", "0"))
-                    unrealized_pnl = format_usd(unrealized_pnl_raw)
-                    realized_pnl_raw = t.get("realizedPnlUsd", "0")
-                    realized_pnl = format_usd(realized_pnl_raw)
+                    unrealized_pnl = format_usd(t.unrealized_pnl_usd)
+                    realized_pnl = format_usd(t.realized_pnl_usd)
                     lines.append(
-                        f"  - {symbol}: {val} (Unrealized: {unrealized_pnl}, Realized: {realized_pnl})"
+                        f"  - {t.symbol}: {format_usd(t.value_usd)} "
+                        f"(Unrealized: {unrealized_pnl}, Realized: {realized_pnl})"
                     )
             lines.append("")
 
         # Strategies
         if data.strategies:
             lines.append("## Active Strategies")
-            strategies = data.strategies if isinstance(data.strategies, list) else []
+            strategies = (
+                models.strategies(data.strategies) if isinstance(data.strategies, list) else ()
+            )
             current_time = int(datetime.now().timestamp())
             # Filter to only show non-expired strategies
-            active_strategies = [
-                s
-                for s in strategies
-                if s.get("expiry", 0) == 0 or s.get("expiry", 0) > current_time
-            ]
+            active_strategies = [s for s in strategies if s.is_live(current_time)]
             for s in active_strategies:
-                sid = s.get("strategyId", s.get("id", "?"))
-                content = s.get("content", "")
-                priority = s.get("strategyPriority", s.get("priority", 1))
-                expiry = s.get("expiry", 0)
-                lines.append(f"  #{sid} (P{priority}): {content}")
-                if expiry:
+                priority = 1 if s.priority is None else s.priority
+                lines.append(f"  #{s.id} (P{priority}): {s.content}")
+                if s.expiry:
                     from utils.formatters import format_time
 
-                    lines.append(f"    Expires: {format_time(expiry)}")
+                    lines.append(f"    Expires: {format_time(s.expiry)}")
             if not active_strategies:
                 lines.append("  (No active strategies)")
             lines.append("")
@@ -326,17 +393,22 @@ class StrategyDataCollector:
                 "Use this data to identify trends, support/resistance, and entry/exit points."
             )
             lines.append("")
+            # UDF format (o, h, l, c, t, v arrays), decoded to float columns
+            charts = {
+                (symbol, tf): models.candles(candle_data)
+                for symbol, tf_data in data.candles.items()
+                for tf, candle_data in tf_data.items()
+                if candle_data and isinstance(candle_data, dict)
+            }
+            # All series in one batch
+            computed = indicators.compute(charts)
             for symbol, tf_data in data.candles.items():
                 lines.append(f"### {symbol}")
                 for tf, candle_data in tf_data.items():
                     if candle_data and isinstance(candle_data, dict):
-                        # Handle UDF format (o, h, l, c, t, v arrays)
-                        opens = candle_data.get("o", [])
-                        highs = candle_data.get("h", [])
-                        lows = candle_data.get("l", [])
-                        closes = candle_data.get("c", [])
-                        volumes = candle_data.get("v", [])
-                        _times = candle_data.get("t", [])  # noqa: F841
+                        series = charts[(symbol, tf)]
+                        opens, highs, lows = series.opens, series.highs, series.lows
+                        closes, volumes = series.closes, series.volumes
 
                         if closes and len(closes) > 0:
                             lines.append(f"  **{tf} Chart ({len(closes)} candles)**")
@@ -400,6 +472,9 @@ class StrategyDataCollector:
                                     f"  Volume Trend: {vol_trend} (avg: {avg_vol:.0f}, recent: {recent_vol:.0f})"
                                 )
 
+                            for line in indicators.describe(computed[(symbol, tf)], format_price):
+                                lines.append(f"  {line}")
+
                             # Candle data for detailed analysis (last 5)
                             if len(closes) > 1:
                                 lines.append("  Recent Candles (oldest to newest):")
@@ -479,22 +554,49 @@ class StrategyAdvisor:
         self.llm = llm
         self.api = api
         self.collector = StrategyDataCollector(api)
+        # Periodic and manual runs share one bounded, deduplicating LLM queue
+        self.scheduler = LLMScheduler(llm, config.LLM_MAX_CONCURRENT)
+        self.memo = AnalysisMemo()
+        self.publisher = HistoryPublisher()
         self._last_record_id: str | None = None
+        # True when the last analyze() reused a memoized result instead of calling the LLM
+        self.last_run_reused = False
 
     @property
     def last_record_id(self) -> str | None:
         return self._last_record_id
 
-    async def analyze(self) -> list[Suggestion]:
+    async def analyze(
+        self, on_progress: Callable[[str], Awaitable[None]] | None = None
+    ) -> list[Suggestion]:
         """Analyze current data and generate strategy suggestions.
 
+        Args:
+            on_progress: If given, the completion is streamed and this is awaited
+                with the response text received so far
+
+        If the market state matches a recent analysis (see advisor_memo), the
+        memoized suggestions are returned without calling the LLM and
+        last_run_reused is set.
+
         Returns:
             List of Suggestion objects, empty list if analysis fails
         """
+        self.last_run_reused = False
         try:
             # Collect data
             data = await self.collector.collect()
 
+            # Reuse a recent analysis of the same market state (never with partial data)
+            fp = None if is_partial(data) else fingerprint(data)
+            memoized = self.memo.lookup(fp) if fp else None
+            self.memo.record_run(skipped=memoized is not None)
+            if memoized is not None:
+                logger.info("Market state unchanged (%s), reusing previous analysis", fp)
+                self.last_run_reused = True
+                self._last_record_id = memoized.get("record_id")
+                return [Suggestion(**s) for s in memoized.get("suggestions", [])]
+
             # Count current active strategies
             current_time = int(datetime.now().timestamp())
             active_strategies = [
@@ -516,8 +618,15 @@ class StrategyAdvisor:
             # Build full request content (for saving)
             full_request = f"{SYSTEM_PROMPT}\n\n{formatted_data}"
 
-            # Call LLM
-            response = await self.llm.chat(SYSTEM_PROMPT, formatted_data)
+            # Call LLM (streamed when someone is watching, stops once the JSON is complete).
+            # Runs of the same market state share one queued job; the prompt itself
+            # differs on every collection because of its "Collected at" line
+            job_key = (
+                fp or hashlib.sha256(_COLLECTED_AT.sub("", formatted_data).encode()).hexdigest()
+            )
+            response = await self.scheduler.chat(
+                SYSTEM_PROMPT, formatted_data, on_progress=on_progress, key=job_key
+            )
 
             # Check for error response
             if response.startswith("Error:"):
@@ -530,19 +639,22 @@ class StrategyAdvisor:
             # Filter suggestions to respect strategy limit
             filtered_suggestions = self._filter_by_strategy_limit(suggestions, slots_available)
 
-            # Save analysis record (Story 8-6)
-            from advisor_history import save_analysis, sync_to_surge
+            # Save analysis record (Story 8-6); disk I/O runs off the event loop
+            from advisor_history import save_analysis
 
-            record_id = save_analysis(
+            record_id = await asyncio.to_thread(
+                save_analysis,
                 request=full_request,
                 response=response,
                 suggestions=[s.__dict__ for s in filtered_suggestions],
             )
             self._last_record_id = record_id
+            if fp:
+                self.memo.store(fp, [s.__dict__ for s in filtered_suggestions], record_id)
 
-            # Sync to surge if history is enabled
+            # Publish the history page in the background if history is enabled
             if config.ADVISOR_HISTORY_ENABLED:
-                sync_to_surge()
+                self.publisher.request()
 
             return filtered_suggestions
 
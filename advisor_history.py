@@ -2,22 +2,312 @@
 Analysis History Storage Module for Story 8-6
 
 Stores AI analysis history with full request/response for debugging.
+
+Records live in a SQLite database in WAL mode (HISTORY_DB): appending a record
+is a single transaction, reads are paged newest-first via the primary key, and
+records beyond ADVISOR_HISTORY_RETAIN are dropped on append (freed pages are
+returned with incremental vacuum). Prompts and responses are stored as
+deduplicated, compressed chunks (see HistoryStore), so thousands of records
+fit where a few dozen full copies used to. ADVISOR_HISTORY_MAX records are
+shown on the web page. The JSON file served by the web page
+(HISTORY_FILE, a manifest plus shards in history/) is an export written
+before each upload.
+
+A legacy HISTORY_FILE found next to an empty database is imported once.
 """
 
+import hashlib
 import json
 import logging
+import os
+import re
+import sqlite3
 import subprocess
+import threading
 import uuid
+import zlib
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
 
-from config import ADVISOR_HISTORY_MAX, ADVISOR_SURGE_DOMAIN, SURGE_TOKEN
+from config import (
+    ADVISOR_HISTORY_MAX,
+    ADVISOR_HISTORY_RETAIN,
+    ADVISOR_SURGE_DOMAIN,
+    SURGE_TOKEN,
+)
+from utils.json_file import write_json_atomic
 
 logger = logging.getLogger(__name__)
 
 # File paths
+HISTORY_DB = Path(os.getenv("ADVISOR_HISTORY_DB", "data/advisor_history.db"))
 HISTORY_FILE = Path("data/advisor_history.json")
 WEB_DIR = Path("data")  # index.html and advisor_history.json both live here
+EXPORT_DIR_NAME = "history"  # per-record and summary page shards, next to HISTORY_FILE
+EXPORT_PAGE_SIZE = 20  # summaries per manifest / index page
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    suggestions TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_timestamp ON analyses (timestamp);
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS parts (
+    seq INTEGER NOT NULL,
+    field INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (seq, field, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS parts_hash ON parts (hash);
+"""
+
+_FIELDS = ("request", "response")  # parts.field is the index into this tuple
+_SECTION = re.compile(r"(?m)^(?=#)")  # prompts are split before each markdown heading
+
+
+def _split(text: str) -> list[str]:
+    """Split text into chunks at markdown headings (joined back losslessly)."""
+    return [chunk for chunk in _SECTION.split(text) if chunk]
+
+
+def _chunk_hash(chunk: str) -> str:
+    return hashlib.blake2b(chunk.encode(), digest_size=16).hexdigest()
+
+
+class HistoryStore:
+    """Append-only analysis log in SQLite (WAL mode).
+
+    Requests and responses are split into sections (the system prompt, each
+    "## ..." block of the data report, each token's chart block) and stored
+    as zlib-compressed chunks keyed by their hash. Consecutive analyses share
+    most sections, so each record mostly adds references to existing chunks.
+    Records are reassembled when read; chunks no longer referenced are
+    deleted when records are trimmed.
+
+    Each operation opens its own connection, so the store can be used from
+    worker threads (asyncio.to_thread) as well as the event loop thread.
+
+    Args:
+        path: Database file
+        legacy_file: JSON history imported if the database is empty
+    """
+
+    def __init__(self, path: Path, legacy_file: Path | None = None):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            # auto_vacuum only takes effect before the first table is created
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(analyses)")}
+            if "request" in columns:
+                self._migrate_inline(conn)
+            conn.executescript(_SCHEMA)
+        if legacy_file is not None and self.count() == 0:
+            self._import_legacy(legacy_file)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def append(self, record: dict, keep: int | None = None) -> bool:
+        """Append a record; with keep, drop all but the newest keep records.
+
+        Returns:
+            False if a record with the same id already exists
+        """
+        with closing(self._connect()) as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                self._insert(conn, record)
+            except sqlite3.IntegrityError:
+                conn.execute("ROLLBACK")
+                return False
+            trimmed = self._trim(conn, keep) if keep is not None else 0
+            conn.execute("COMMIT")
+            if trimmed:
+                conn.execute("PRAGMA incremental_vacuum").fetchall()  # frees one page per step
+        return True
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, record: dict):
+        seq = conn.execute(
+            "INSERT INTO analyses (id, timestamp, suggestions) VALUES (?, ?, ?)",
+            (
+                record["id"],
+                record["timestamp"],
+                json.dumps(record["suggestions"], ensure_ascii=False),
+            ),
+        ).lastrowid
+        for field, name in enumerate(_FIELDS):
+            for pos, chunk in enumerate(_split(record[name])):
+                digest = _chunk_hash(chunk)
+                if (
+                    conn.execute("SELECT 1 FROM chunks WHERE hash = ?", (digest,)).fetchone()
+                    is None
+                ):
+                    conn.execute(
+                        "INSERT INTO chunks (hash, data) VALUES (?, ?)",
+                        (digest, zlib.compress(chunk.encode(), 9)),
+                    )
+                conn.execute(
+                    "INSERT INTO parts (seq, field, pos, hash) VALUES (?, ?, ?, ?)",
+                    (seq, field, pos, digest),
+                )
+
+    @staticmethod
+    def _trim(conn: sqlite3.Connection, keep: int) -> int:
+        """Delete all but the newest keep records and their unshared chunks."""
+        row = conn.execute(
+            "SELECT seq FROM analyses ORDER BY seq DESC LIMIT 1 OFFSET ?", (max(keep, 0),)
+        ).fetchone()
+        if row is None:
+            return 0
+        (last,) = row
+        hashes = [
+            h for (h,) in conn.execute("SELECT DISTINCT hash FROM parts WHERE seq <= ?", (last,))
+        ]
+        trimmed = conn.execute("DELETE FROM analyses WHERE seq <= ?", (last,)).rowcount
+        conn.execute("DELETE FROM parts WHERE seq <= ?", (last,))
+        conn.executemany(
+            "DELETE FROM chunks WHERE hash = ? "
+            "AND NOT EXISTS (SELECT 1 FROM parts WHERE parts.hash = chunks.hash)",
+            [(h,) for h in hashes],
+        )
+        return trimmed
+
+    def _records(self, conn: sqlite3.Connection, rows: list[tuple]) -> list[dict]:
+        """Reassemble records from (seq, id, timestamp, suggestions) rows."""
+        texts: dict[tuple[int, int], list[str]] = {}
+        if rows:
+            seqs = [row[0] for row in rows]
+            placeholders = ",".join("?" * len(seqs))
+            decoded: dict[str, str] = {}  # shared chunks are decompressed once
+            for seq, field, digest, data in conn.execute(
+                "SELECT p.seq, p.field, p.hash, c.data FROM parts p "
+                "JOIN chunks c ON c.hash = p.hash "
+                f"WHERE p.seq IN ({placeholders}) ORDER BY p.seq, p.field, p.pos",
+                seqs,
+            ):
+                if digest not in decoded:
+                    decoded[digest] = zlib.decompress(data).decode()
+                texts.setdefault((seq, field), []).append(decoded[digest])
+
+        records = []
+        for seq, record_id, timestamp, suggestions in rows:
+            record = {"id": record_id, "timestamp": timestamp}
+            for field, name in enumerate(_FIELDS):
+                record[name] = "".join(texts.get((seq, field), ()))
+            record["suggestions"] = json.loads(suggestions)
+            records.append(record)
+        return records
+
+    def page(self, limit: int = 20, offset: int = 0) -> list[dict]:
+        """Records newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT seq, id, timestamp, suggestions FROM analyses "
+                "ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+            return self._records(conn, rows)
+
+    def get(self, record_id: str) -> dict | None:
+        """Record by id."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT seq, id, timestamp, suggestions FROM analyses WHERE id = ?",
+                (record_id,),
+            ).fetchall()
+            records = self._records(conn, rows)
+        return records[0] if records else None
+
+    def summaries(self, limit: int = 20, offset: int = 0) -> list[dict]:
+        """Record summaries (id, timestamp, suggestion count) newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, timestamp, suggestions FROM analyses ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [
+            {"id": record_id, "timestamp": timestamp, "count": len(json.loads(suggestions))}
+            for record_id, timestamp, suggestions in rows
+        ]
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Record and chunk counts and the compressed chunk bytes."""
+        with closing(self._connect()) as conn:
+            chunks, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM chunks"
+            ).fetchone()
+            records = conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return {"records": records, "chunks": chunks, "stored_bytes": stored}
+
+    @classmethod
+    def _migrate_inline(cls, conn: sqlite3.Connection):
+        """Move records stored with inline request/response text into chunks."""
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DROP INDEX IF EXISTS analyses_timestamp")
+        conn.execute("ALTER TABLE analyses RENAME TO analyses_inline")
+        for statement in _SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        rows = conn.execute(
+            "SELECT id, timestamp, request, response, suggestions FROM analyses_inline ORDER BY seq"
+        ).fetchall()
+        for record_id, timestamp, request, response, suggestions in rows:
+            record = {
+                "id": record_id,
+                "timestamp": timestamp,
+                "request": request,
+                "response": response,
+                "suggestions": json.loads(suggestions),
+            }
+            cls._insert(conn, record)
+        conn.execute("DROP TABLE analyses_inline")
+        conn.execute("COMMIT")
+        logger.info(f"Moved {len(rows)} analysis records into the chunk store")
+
+    def _import_legacy(self, legacy_file: Path):
+        if not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, encoding="utf-8") as f:
+                records = json.load(f)
+            if not isinstance(records, list):
+                return  # an export manifest, not a legacy history
+            # The JSON file is newest first; append oldest first to keep the order
+            imported = sum(self.append(record) for record in reversed(records))
+        except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to import legacy history: {e}")
+            return
+        logger.info(f"Imported {imported} analysis records from {legacy_file}")
+
+
+_stores: dict[Path, HistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _store() -> HistoryStore:
+    """Store for the current HISTORY_DB (opened once per path)."""
+    with _stores_lock:
+        store = _stores.get(HISTORY_DB)
+        if store is None:
+            store = _stores[HISTORY_DB] = HistoryStore(HISTORY_DB, legacy_file=HISTORY_FILE)
+        return store
 
 
 def save_analysis(request: str, response: str, suggestions: list) -> str:
@@ -31,45 +321,83 @@ def save_analysis(request: str, response: str, suggestions: list) -> str:
     Returns:
         8-character record ID
     """
-    history = load_history()
+    store = _store()
+    while True:
+        record_id = uuid.uuid4().hex[:8]
+        record = {
+            "id": record_id,
+            "timestamp": datetime.now().isoformat(),
+            "request": request,
+            "response": response,
+            "suggestions": suggestions,
+        }
+        if store.append(record, keep=max(ADVISOR_HISTORY_RETAIN, ADVISOR_HISTORY_MAX)):
+            break
 
-    record_id = uuid.uuid4().hex[:8]
-    record = {
-        "id": record_id,
-        "timestamp": datetime.now().isoformat(),
-        "request": request,
-        "response": response,
-        "suggestions": suggestions,
-    }
-
-    history.insert(0, record)
-
-    # Limit records
-    if len(history) > ADVISOR_HISTORY_MAX:
-        history = history[:ADVISOR_HISTORY_MAX]
-
-    _save_history(history)
     logger.info(f"Saved analysis record: {record_id}")
     return record_id
 
 
-def load_history() -> list:
-    """Load analysis history from file."""
-    if not HISTORY_FILE.exists():
-        return []
+def load_history(limit: int | None = None, offset: int = 0) -> list:
+    """Load analysis history, newest first.
+
+    Args:
+        limit: Page size (default: ADVISOR_HISTORY_MAX)
+        offset: Records to skip
+    """
     try:
-        with open(HISTORY_FILE, encoding="utf-8") as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError) as e:
+        return _store().page(ADVISOR_HISTORY_MAX if limit is None else limit, offset)
+    except (OSError, sqlite3.Error, zlib.error, json.JSONDecodeError) as e:
         logger.error(f"Failed to load history: {e}")
         return []
 
 
-def _save_history(history: list):
-    """Save history to file."""
-    HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+def export_history():
+    """Write the retained history as the web page's manifest and shards.
+
+    HISTORY_FILE is a manifest holding the first EXPORT_PAGE_SIZE summaries,
+    so the page's first request stays a few KB. Older summaries go to
+    history/index-<n>.json, and each record's prompt and response to
+    history/<id>.json, fetched when the record is opened. Record shards never
+    change, so only new ones are written; shards of trimmed records are removed
+    after the manifest is replaced.
+    """
+    store = _store()
+    summaries = store.summaries(ADVISOR_HISTORY_MAX)
+    shard_dir = HISTORY_FILE.parent / EXPORT_DIR_NAME
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    keep = set()
+    for summary in summaries:
+        path = shard_dir / f"{summary['id']}.json"
+        keep.add(path.name)
+        if not path.exists():
+            record = store.get(summary["id"])
+            if record is not None:
+                write_json_atomic(path, record)
+
+    pages = [
+        summaries[i : i + EXPORT_PAGE_SIZE] for i in range(0, len(summaries), EXPORT_PAGE_SIZE)
+    ] or [[]]
+    for n, page in enumerate(pages[1:], start=1):
+        path = shard_dir / f"index-{n}.json"
+        keep.add(path.name)
+        write_json_atomic(path, page)
+
+    write_json_atomic(
+        HISTORY_FILE,
+        {
+            "version": 2,
+            "total": len(summaries),
+            "pages": len(pages),
+            "shards": f"{EXPORT_DIR_NAME}/",
+            "records": pages[0],
+        },
+    )
+
+    for path in shard_dir.glob("*.json"):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
 
 
 SURGE_TOKEN_FILE = Path.home() / ".surge" / "token"
@@ -87,22 +415,33 @@ def _get_surge_token() -> str | None:
     return None
 
 
+def surge_command() -> list[str]:
+    """Command line that uploads WEB_DIR to ADVISOR_SURGE_DOMAIN."""
+    cmd = ["surge", str(WEB_DIR), ADVISOR_SURGE_DOMAIN]
+    token = _get_surge_token()
+    if token:
+        cmd.extend(["--token", token])
+    return cmd
+
+
 def sync_to_surge():
-    """Sync data directory to surge.sh with retry.
+    """Export the history and sync data directory to surge.sh with retry.
 
-    Logs failure but does not raise exception.
+    Blocking; the bot publishes through history_publisher.HistoryPublisher
+    instead. Logs failure but does not raise exception.
     """
     max_retries = 3
     retry_delay = 2  # seconds
 
+    try:
+        export_history()
+    except OSError as e:
+        logger.error(f"History export failed: {e}")
+        return
+
     for attempt in range(max_retries):
         try:
-            token = _get_surge_token()
-            cmd = ["surge", str(WEB_DIR), ADVISOR_SURGE_DOMAIN]
-            if token:
-                cmd.extend(["--token", token])
-
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            result = subprocess.run(surge_command(), capture_output=True, text=True, timeout=60)
 
             if result.returncode == 0:
                 logger.info(f"Synced to surge.sh: https://{ADVISOR_SURGE_DOMAIN}")
@@ -0,0 +1,189 @@
+"""
+Advisor Analysis Memo
+
+Skips LLM calls when the market state has not materially changed since a
+previous analysis. CollectedData is reduced to a fingerprint of the inputs
+that drive suggestions:
+
+- held tokens and their position values (quantized)
+- live strategies (id, content, priority)
+- token prices from the latest 1h candle and the ETH price (quantized)
+- whether the vault is paused
+
+Prices and values are quantized into logarithmic buckets ADVISOR_MEMO_PRICE_STEP
+wide, so small moves map to the same fingerprint. Fingerprints of past analyses
+are kept with their suggestions in a small JSON memo that survives restarts;
+entries expire after ADVISOR_MEMO_TTL_HOURS so a quiet market is still
+re-analyzed now and then.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import config
+import models
+from utils.json_file import write_json_atomic
+
+if TYPE_CHECKING:
+    from advisor import CollectedData
+
+logger = logging.getLogger(__name__)
+
+MEMO_FILE = Path(os.getenv("ADVISOR_MEMO_FILE", "data/advisor_memo.json"))
+MEMO_SIZE = 50
+
+
+def _bucket(value: float | None, step: float) -> int | None:
+    """Logarithmic bucket of a positive value (None for missing / non-positive)."""
+    if value is None or value <= 0 or not math.isfinite(value):
+        return None
+    return round(math.log(value) / math.log1p(step))
+
+
+def is_partial(data: "CollectedData") -> bool:
+    """True if any input failed to collect; partial data is never fingerprinted.
+
+    Checks the recorded errors and also the sections themselves, since
+    TerminalAPI reports failures as {"error": ...} dicts rather than raising.
+    """
+    sections = [data.positions, data.strategies, data.vault, data.eth_price, data.tokens]
+    sections += [frame for frames in (data.candles or {}).values() for frame in frames.values()]
+    return bool(data.errors) or any(isinstance(s, dict) and "error" in s for s in sections)
+
+
+def fingerprint(data: "CollectedData", price_step: float | None = None) -> str:
+    """Stable hash of the suggestion-relevant parts of collected data.
+
+    Args:
+        data: CollectedData from StrategyDataCollector.collect()
+        price_step: Relative width of a price bucket (default: ADVISOR_MEMO_PRICE_STEP)
+    """
+    step = config.ADVISOR_MEMO_PRICE_STEP if price_step is None else price_step
+    now = int(time.time())
+
+    positions = models.positions_snapshot(data.positions) if data.positions else None
+    held = sorted(
+        (
+            ((p.token_address or p.symbol).lower(), _bucket(p.value_usd, step))
+            for p in (positions.positions if positions else ())
+        ),
+        key=repr,
+    )
+    live = (
+        [s for s in models.strategies(data.strategies) if s.active and s.is_live(now)]
+        if isinstance(data.strategies, list)
+        else []
+    )
+    # Missing ids / values mix None into the tuples, so sort on the repr
+    strategies = sorted(((s.id, s.content, s.priority) for s in live), key=repr)
+    prices = {}
+    for symbol, frames in (data.candles or {}).items():
+        closes = models.candles(frames["1h"]).closes if frames.get("1h") else ()
+        prices[symbol] = _bucket(closes[-1], step) if closes else None
+    eth = data.eth_price or {}
+    eth_price = models.to_float(eth.get("priceUsd", eth.get("price")), None)
+
+    state = {
+        "held": held,
+        "strategies": strategies,
+        "prices": prices,
+        "eth": _bucket(eth_price, step),
+        "paused": bool((data.vault or {}).get("paused", False)),
+    }
+    encoded = json.dumps(state, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class AnalysisMemo:
+    """Persisted fingerprint -> analysis memo with skip statistics.
+
+    Args:
+        path: Memo file (default: MEMO_FILE)
+        ttl_hours: Hours a memoized analysis may be reused (default: ADVISOR_MEMO_TTL_HOURS)
+        max_entries: Fingerprints kept (oldest dropped first)
+        clock: Wall-clock time function (replaceable in tests)
+
+    Example:
+        memo = AnalysisMemo()
+        entry = memo.lookup(fp)
+        if entry is None:
+            ...  # call the LLM
+            memo.store(fp, suggestions, record_id)
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl_hours: float | None = None,
+        max_entries: int = MEMO_SIZE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path or MEMO_FILE
+        ttl_hours = config.ADVISOR_MEMO_TTL_HOURS if ttl_hours is None else ttl_hours
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self._clock = clock
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.runs = 0
+        self.skipped = 0
+        self._load()
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.runs if self.runs else 0.0
+
+    def lookup(self, fp: str) -> dict[str, Any] | None:
+        """Unexpired memo entry for a fingerprint ({"suggestions", "record_id", "created_at"})."""
+        entry = self.entries.get(fp)
+        if entry is None or self._clock() - entry.get("created_at", 0) >= self.ttl_seconds:
+            return None
+        return entry
+
+    def store(self, fp: str, suggestions: list[dict], record_id: str | None):
+        """Memoize an analysis (insertion order doubles as age for eviction)."""
+        self.entries.pop(fp, None)
+        self.entries[fp] = {
+            "suggestions": suggestions,
+            "record_id": record_id,
+            "created_at": self._clock(),
+        }
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+        self._save()
+
+    def record_run(self, skipped: bool):
+        """Count an analysis run for the skip ratio."""
+        self.runs += 1
+        self.skipped += skipped
+        self._save()
+
+    def status(self) -> str:
+        """Skip statistics for /advisor_status."""
+        return f"{self.skipped}/{self.runs} runs ({self.skip_ratio:.0%})"
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = dict(data.get("entries", {}))
+            self.runs = int(data.get("runs", 0))
+            self.skipped = int(data.get("skipped", 0))
+        except (OSError, json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to load advisor memo: {e}")
+
+    def _save(self):
+        """Write the memo atomically (temp file, then rename)."""
+        payload = {"runs": self.runs, "skipped": self.skipped, "entries": self.entries}
+        try:
+            write_json_atomic(self.path, payload)
+        except OSError as e:
+            logger.warning(f"Failed to save advisor memo: {e}")
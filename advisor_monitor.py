@@ -18,7 +18,9 @@ import config
 from advisor import StrategyAdvisor, Suggestion
 from advisor_history import get_view_url
 from api import TerminalAPI
+from snapshot_hub import latest_snapshot
 from utils.formatters import format_eth, format_usd
+from utils.rate_limiter import use_background_priority
 
 logger = logging.getLogger(__name__)
 
@@ -225,6 +227,7 @@ class AdvisorMonitor:
     async def start(self):
         """Start the periodic analysis loop."""
         self.running = True
+        use_background_priority()
         logger.info(f"Advisor monitor started (interval: {self.interval_seconds}s)")
 
         while self.running:
@@ -236,7 +239,9 @@ class AdvisorMonitor:
                 suggestions = await self.advisor.analyze()
                 self.last_analysis = datetime.now()
 
-                if suggestions:
+                if self.advisor.last_run_reused:
+                    logger.info("Market state unchanged, suggestions already pushed")
+                elif suggestions:
                     # Get context for message
                     context = await self._build_context()
                     # Push to callback
@@ -262,8 +267,11 @@ class AdvisorMonitor:
         token_count = 0
         strategy_count = 0
 
+        # Failed sections come back as error dicts, so the snapshot itself does not raise
+        snapshot = await latest_snapshot(self.api)
+
         try:
-            positions = await self.api.get_positions()
+            positions = snapshot.positions
 
             # Check for valid positions response (not error dict)
             if positions and not (isinstance(positions, dict) and "error" in positions):
@@ -284,7 +292,7 @@ class AdvisorMonitor:
             logger.error("Failed to get positions: %s", e)
 
         try:
-            strategies = await self.api.get_strategies()
+            strategies = snapshot.strategies
             # Check for valid strategies response and filter non-expired
             current_time = int(time.time())
             if strategies and not (isinstance(strategies, dict) and "error" in strategies):
@@ -321,6 +329,50 @@ class AdvisorMonitor:
         return self._task
 
 
+def _suggestion_change(suggestion: Suggestion | dict) -> dict:
+    """Contract change (see VaultContract.apply_strategy_changes) for a suggestion."""
+    # Handle both dict and Suggestion object
+    action = suggestion.action if hasattr(suggestion, "action") else suggestion.get("action", "add")
+    content = suggestion.content if hasattr(suggestion, "content") else suggestion.get("content")
+    priority = (
+        suggestion.priority if hasattr(suggestion, "priority") else suggestion.get("priority", 1)
+    )
+    expiry_hours = (
+        suggestion.expiry_hours
+        if hasattr(suggestion, "expiry_hours")
+        else suggestion.get("expiry_hours", 0)
+    )
+    strategy_id = (
+        suggestion.strategy_id
+        if hasattr(suggestion, "strategy_id")
+        else suggestion.get("strategy_id")
+    )
+
+    # Convert expiry_hours to timestamp
+    if expiry_hours and expiry_hours > 0:
+        expiry = int(time.time()) + (expiry_hours * 3600)
+    else:
+        expiry = 0
+
+    return {
+        "action": action,
+        "content": content,
+        "expiry": expiry,
+        "priority": priority,
+        "strategy_id": strategy_id,
+    }
+
+
+def _format_result(change: dict, result: dict) -> str:
+    """Result message for an executed suggestion."""
+    if not result.get("success"):
+        return f"Failed: {result.get('error', 'Unknown error')}"
+    tx_hash = result.get("transactionHash", "")
+    if change["action"] == "add":
+        return f"Strategy #{result.get('strategyId', '?')} added (TX: {tx_hash[:10]}...)"
+    return f"Strategy #{change['strategy_id']} disabled (TX: {tx_hash[:10]}...)"
+
+
 async def execute_suggestion(suggestion: Suggestion | dict) -> str:
     """Execute a single suggestion.
 
@@ -335,61 +387,53 @@ async def execute_suggestion(suggestion: Suggestion | dict) -> str:
 
     try:
         contract = get_contract()
+        change = _suggestion_change(suggestion)
 
-        # Handle both dict and Suggestion object
-        action = (
-            suggestion.action if hasattr(suggestion, "action") else suggestion.get("action", "add")
-        )
-        content = (
-            suggestion.content if hasattr(suggestion, "content") else suggestion.get("content")
-        )
-        priority = (
-            suggestion.priority
-            if hasattr(suggestion, "priority")
-            else suggestion.get("priority", 1)
-        )
-        expiry_hours = (
-            suggestion.expiry_hours
-            if hasattr(suggestion, "expiry_hours")
-            else suggestion.get("expiry_hours", 0)
-        )
-        strategy_id = (
-            suggestion.strategy_id
-            if hasattr(suggestion, "strategy_id")
-            else suggestion.get("strategy_id")
-        )
+        if change["action"] == "add":
+            result = await contract.add_strategy(
+                content=change["content"], expiry=change["expiry"], priority=change["priority"]
+            )
+        elif change["action"] == "disable":
+            result = await contract.disable_strategy(change["strategy_id"])
+        else:
+            return f"Unknown action: {change['action']}"
+        return _format_result(change, result)
 
-        if action == "add":
-            # Convert expiry_hours to timestamp
-            if expiry_hours and expiry_hours > 0:
-                expiry = int(time.time()) + (expiry_hours * 3600)
-            else:
-                expiry = 0
+    except Exception as e:
+        logger.error("Failed to execute suggestion: %s", e)
+        return f"Error: {str(e)}"
 
-            result = await contract.add_strategy(content=content, expiry=expiry, priority=priority)
 
-            if result.get("success"):
-                tx_hash = result.get("transactionHash", "")
-                strategy_id = result.get("strategyId", "?")
-                return f"Strategy #{strategy_id} added (TX: {tx_hash[:10]}...)"
-            else:
-                return f"Failed: {result.get('error', 'Unknown error')}"
+async def execute_suggestions(suggestions: list[Suggestion | dict]) -> list[str]:
+    """Execute several suggestions as one transaction batch ("Execute All").
+
+    The transactions are signed and broadcast back-to-back with consecutive
+    nonces and confirmed together (VaultContract.apply_strategy_changes).
 
-        elif action == "disable":
-            result = await contract.disable_strategy(strategy_id)
+    Returns:
+        Result message per suggestion, in order
+    """
+    from main import get_contract
 
-            if result.get("success"):
-                tx_hash = result.get("transactionHash", "")
-                return f"Strategy #{strategy_id} disabled (TX: {tx_hash[:10]}...)"
+    try:
+        contract = get_contract()
+        changes = [_suggestion_change(s) for s in suggestions]
+        messages: list[str | None] = [None] * len(changes)
+        batch = []
+        for i, change in enumerate(changes):
+            if change["action"] in ("add", "disable"):
+                batch.append(i)
             else:
-                return f"Failed: {result.get('error', 'Unknown error')}"
+                messages[i] = f"Unknown action: {change['action']}"
 
-        else:
-            return f"Unknown action: {action}"
+        results = await contract.apply_strategy_changes([changes[i] for i in batch])
+        for i, result in zip(batch, results, strict=True):
+            messages[i] = _format_result(changes[i], result)
+        return messages
 
     except Exception as e:
-        logger.error("Failed to execute suggestion: %s", e)
-        return f"Error: {str(e)}"
+        logger.error("Failed to execute suggestions: %s", e)
+        return [f"Error: {str(e)}"] * len(suggestions)
 
 
 async def handle_advisor_callback(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
@@ -450,10 +494,8 @@ async def handle_advisor_callback(update: Update, ctx: ContextTypes.DEFAULT_TYPE
 
     # Handle execute all
     if choice == "all":
-        results = []
-        for i, s in enumerate(suggestions, 1):
-            result = await execute_suggestion(s)
-            results.append(f"[{i}] {result}")
+        messages = await execute_suggestions(suggestions)
+        results = [f"[{i}] {result}" for i, result in enumerate(messages, 1)]
 
         del pending_requests[request_id]
         await query.edit_message_text(
@@ -12,7 +12,10 @@ from datetime import UTC as datetime_utc
 from typing import Any
 
 from api import TerminalAPI
+from models import positions_snapshot
 from notifier import TelegramNotifier, format_usd
+from snapshot_hub import latest_snapshot
+from utils.rate_limiter import use_background_priority
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +47,8 @@ class ThresholdAlerter:
         # Previous values for comparison
         self._previous_pnl_usd: float | None = None
         self._previous_positions: dict[str, float] = {}
+        # Version of the last fully processed positions response (see TerminalAPI)
+        self._positions_version: int | None = None
         # Cooldown tracking to prevent repeated alerts
         self._last_pnl_alert_time: datetime | None = None
         self._pnl_cooldown_minutes = self._get_pnl_cooldown_minutes()
@@ -76,21 +81,23 @@ class ThresholdAlerter:
         except ValueError:
             return 300
 
-    async def _check_pnl_threshold(self) -> dict[str, Any] | None:
+    async def _check_pnl_threshold(self, positions: dict | None = None) -> dict[str, Any] | None:
         """Check if PnL change exceeds threshold.
 
+        Args:
+            positions: Positions response to check (default: latest vault snapshot)
+
         Returns:
             Alert data if threshold exceeded, None otherwise.
             Does NOT update state - caller must call _confirm_pnl_state() after successful send.
         """
-        positions = await self.api.get_positions()
+        if positions is None:
+            positions = (await latest_snapshot(self.api)).positions
         if not isinstance(positions, dict) or "error" in positions:
             return None
 
-        pnl_usd_str = positions.get("overallPnlUsd", "0")
-        try:
-            current_pnl = float(pnl_usd_str)
-        except (ValueError, TypeError):
+        current_pnl = positions_snapshot(positions).overall_pnl_usd
+        if current_pnl is None:
             return None
 
         if self._previous_pnl_usd is not None:
@@ -120,31 +127,34 @@ class ThresholdAlerter:
         self._previous_pnl_usd = current_pnl
         self._last_pnl_alert_time = datetime.datetime.now(datetime_utc)
 
-    async def _check_position_threshold(self) -> tuple[list[dict[str, Any]], dict[str, float]]:
+    async def _check_position_threshold(
+        self, positions: dict | None = None
+    ) -> tuple[list[dict[str, Any]], dict[str, float]]:
         """Check for significant position changes.
 
+        Args:
+            positions: Positions response to check (default: latest vault snapshot)
+
         Returns:
             Tuple of (list of position alerts, current positions dict).
             Does NOT update state - caller must call _confirm_position_state() after successful send.
         """
-        positions = await self.api.get_positions()
+        if positions is None:
+            positions = (await latest_snapshot(self.api)).positions
         if not isinstance(positions, dict) or "error" in positions:
             # Return empty alerts but preserve previous state on API error
             return [], self._previous_positions.copy()
 
-        pos_items = positions.get("positions", [])
-        if not isinstance(pos_items, list):
+        if not isinstance(positions.get("positions", []), list):
             logger.warning("Unexpected positions format in API response")
             return [], self._previous_positions.copy()
 
         alerts = []
         current_positions = {}
 
-        for pos in pos_items:
-            symbol = pos.get("symbol", pos.get("tokenSymbol", "Unknown"))
-            try:
-                value = float(pos.get("valueUsd", pos.get("value", "0")))
-            except (ValueError, TypeError):
+        for pos in positions_snapshot(positions).positions:
+            symbol, value = pos.symbol, pos.value_usd
+            if value is None:
                 continue
 
             current_positions[symbol] = value
@@ -200,8 +210,16 @@ Change: {sign}{format_usd(str(abs(change)))} ({sign}{data["change_pct"]:.1f}%)
 
     async def _send_alerts(self):
         """Check thresholds and send alerts if needed."""
+        # Both checks read the same snapshot, so they agree on the positions they compare
+        positions = (await latest_snapshot(self.api)).positions
+        version = getattr(positions, "version", None)
+        if version is not None and version == self._positions_version:
+            logger.debug("Positions unchanged since last check, skipping threshold checks")
+            return
+
         # Check PnL threshold
-        pnl_alert = await self._check_pnl_threshold()
+        pnl_pending = False
+        pnl_alert = await self._check_pnl_threshold(positions)
         if pnl_alert:
             # Check cooldown - skip if we sent alert recently
             if self._last_pnl_alert_time is not None:
@@ -226,9 +244,11 @@ Change: {sign}{format_usd(str(abs(change)))} ({sign}{data["change_pct"]:.1f}%)
             # Only update state if at least one send succeeded
             if send_success:
                 self._confirm_pnl_state(pnl_alert["current_pnl"])
+            else:
+                pnl_pending = True
 
         # Check position thresholds
-        position_alerts, current_positions = await self._check_position_threshold()
+        position_alerts, current_positions = await self._check_position_threshold(positions)
         for alert in position_alerts:
             message = self._format_position_alert(alert)
             for user_id in self.notifier.notify_users:
@@ -239,6 +259,9 @@ Change: {sign}{format_usd(str(abs(change)))} ({sign}{data["change_pct"]:.1f}%)
                     logger.error(f"Failed to send position alert: {e}")
         # Update position state regardless - we don't want to re-alert on same positions
         self._confirm_position_state(current_positions)
+        # Unchanged positions can be skipped next time, unless a PnL alert still needs sending
+        if not pnl_pending:
+            self._positions_version = version
 
     async def start(self):
         """Start the threshold monitoring loop."""
@@ -247,6 +270,7 @@ Change: {sign}{format_usd(str(abs(change)))} ({sign}{data["change_pct"]:.1f}%)
             return
 
         self.running = True
+        use_background_priority()
         logger.info(
             f"Threshold alerter started (PnL: {self.pnl_threshold}%, Position: {self.position_threshold}%)"
         )
@@ -1,53 +1,350 @@
 import asyncio
 import logging
+import math
 import time
+from dataclasses import dataclass
+from typing import Any
 
 import aiohttp
 
-from config import API_BASE_URL, VAULT_ADDRESS
+from config import (
+    API_BASE_URL,
+    API_CACHE_ENABLED,
+    API_CACHE_MAX_ENTRIES,
+    API_CACHE_TTLS,
+    API_RATE_BURST,
+    API_RATE_LIMIT,
+    SNAPSHOT_INTERVAL,
+    VAULT_ADDRESS,
+)
+from snapshot_hub import SnapshotHub
+from token_index import TokenIndex
+from utils.circuit_breaker import CLOSED, CircuitBreaker, RetryBudget, backoff_delay
+from utils.rate_limiter import RateLimiter, parse_retry_after
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-# Token symbol -> address 缓存
-_token_cache: dict[str, str] = {}
-_token_cache_time: float = 0
-TOKEN_CACHE_TTL = 3600  # 1 hour
-
 # HTTP 请求配置
 HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30)
 HTTP_MAX_RETRIES = 3
-HTTP_RETRY_DELAY = 1.0
-
-
-async def _build_token_cache(api: "TerminalAPI"):
-    """构建 token symbol -> address 缓存。"""
-    global _token_cache, _token_cache_time
-    cache = {}
-    page = 1
-    while page <= 50:  # 最多50页
-        data = await api._get("/tokens", {"page": page, "limit": 50})
-        if isinstance(data, dict) and "error" in data:
-            break
-        items = data if isinstance(data, list) else data.get("items", [])
-        if not items:
-            break
-        for token in items:
-            symbol = token.get("symbol", "").upper()
-            address = token.get("tokenAddress", "")
-            if symbol and address:
-                cache[symbol] = address
-        page += 1
-    _token_cache = cache
-    _token_cache_time = time.time()
+HTTP_RETRY_DELAY = 1.0  # 指数退避基数（秒），实际延迟在 [0, base * 2^attempt) 内随机
+HTTP_RETRY_MAX_DELAY = 8.0
+
+# 熔断与重试预算 (按 endpoint 第一段路径熔断，重试预算全局共享)
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MIN = 10
+
+# 429 的 Retry-After 超过该值时不再等待重试，直接返回错误（秒）
+RETRY_AFTER_MAX_WAIT = 60.0
+
+# 连接池配置 (所有后台服务和命令共享同一个 session)
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 20
+HTTP_KEEPALIVE_TIMEOUT = 30
+HTTP_DNS_CACHE_TTL = 300
+
+# 响应缓存 TTL（秒），按 endpoint 第一段路径匹配；未列出的 endpoint 不缓存
+CACHE_TTLS: dict[str, float] = {
+    "/positions": 15,
+    "/vault": 60,
+    "/strategies": 30,
+    "/pnl-history": 60,
+    "/eth-price": 10,
+    "/leaderboard": 120,
+    "/launch-schedule": 300,
+}
+# 过期后仍可返回旧值（并后台刷新）的宽限期 = TTL * CACHE_STALE_FACTOR
+CACHE_STALE_FACTOR = 2.0
+# 合约写入后需要失效的 vault 相关 endpoint
+VAULT_WRITE_INVALIDATES = (
+    "/positions",
+    "/vault",
+    "/strategies",
+    "/pnl-history",
+    "/deposits-withdrawals",
+)
+
+
+class ApiDict(dict):
+    """成功的 JSON 对象响应，附带变更标记。
+
+    Attributes:
+        changed: 与同一请求的上一次上游响应相比内容是否变化
+        version: 内容版本号，内容不变时保持不变，可用于跳过重复处理
+        model: models 模块解析出的类型化模型（首次解析时写入，所有调用方共享）
+    """
+
+    __slots__ = ("changed", "version", "model")
+
+
+class ApiList(list):
+    """成功的 JSON 数组响应，属性同 ApiDict。"""
+
+    __slots__ = ("changed", "version", "model")
+
+
+def _tag_response(data: Any, changed: bool, version: int) -> Any:
+    """给响应附加 changed / version（非对象、非数组的响应原样返回）。"""
+    if isinstance(data, dict):
+        tagged = data if isinstance(data, ApiDict) else ApiDict(data)
+    elif isinstance(data, list):
+        tagged = data if isinstance(data, ApiList) else ApiList(data)
+    else:
+        return data
+    tagged.changed = changed
+    tagged.version = version
+    tagged.model = None
+    return tagged
+
+
+@dataclass(slots=True)
+class _Validator:
+    """某个请求上一次成功响应的缓存校验信息。"""
+
+    etag: str | None
+    last_modified: str | None
+    body: Any
+    version: int
 
 
 class TerminalAPI:
     def __init__(self):
         self.base_url = API_BASE_URL
         self.vault = VAULT_ADDRESS
+        self._session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+        # Single-flight: 相同 endpoint + params 的并发请求共享一个上游请求
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        # 响应缓存：新鲜期内直接返回，宽限期内返回旧值并后台刷新
+        self._cache = TTLCache(API_CACHE_MAX_ENTRIES)
+        self._cache_ttls = {**CACHE_TTLS, **API_CACHE_TTLS} if API_CACHE_ENABLED else {}
+        self._cache_generation = 0
+        # Token symbol -> address 索引（持久化到磁盘，后台增量刷新）
+        self.token_index = TokenIndex(self)
+        # 共享的 vault 快照：后台服务和查询命令每个 tick 只拉取一次
+        self.snapshots = SnapshotHub(self, SNAPSHOT_INTERVAL)
+        # 熔断器：上游故障时快速失败，不让调用方挂在重试和超时上
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN)
+        # 令牌桶限流：用户命令优先于后台轮询，收到 429 时自动降速
+        self._limiter = RateLimiter(API_RATE_LIMIT, API_RATE_BURST, max_block=RETRY_AFTER_MAX_WAIT)
+        # 条件请求：按请求保存 ETag / Last-Modified 和上次的响应，304 时直接复用
+        self._validators = TTLCache(API_CACHE_MAX_ENTRIES)
+        self._response_version = 0
+        self.stats = {
+            "requests": 0,
+            "upstream": 0,
+            "coalesced": 0,
+            "cache_hits": 0,
+            "stale_hits": 0,
+            "retries": 0,
+            "short_circuited": 0,
+            "throttled": 0,
+            "not_modified": 0,
+        }
+
+    async def open(self) -> aiohttp.ClientSession:
+        """创建长连接 session（在 post_init 中调用）。
+
+        Returns:
+            共享的 aiohttp.ClientSession
+        """
+        return await self._get_session()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取或创建共享 session。
+
+        Session 绑定到创建它的事件循环；main.main 重启时会创建新的事件循环，
+        此时旧 session 已不可用，直接丢弃并重新创建。
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is not loop:
+            self._session = None
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trust_env=True, timeout=HTTP_TIMEOUT
+            )
+            self._session_loop = loop
+            logger.debug("Created pooled HTTP session")
+        return self._session
+
+    async def close(self):
+        """关闭共享 session（在 post_shutdown 中调用）。"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def discard_session(self):
+        """丢弃绑定到已关闭事件循环的 session，不做网络清理。
+
+        同时丢弃绑定在旧事件循环上的任务：进行中的请求、快照刷新和
+        token 索引刷新，否则重启后的调用方会等待一个永远不会完成的 future。
+        """
+        self._session = None
+        self._session_loop = None
+        self._inflight.clear()
+        self.snapshots.reset()
+        self.token_index.discard_refresh()
+
+    def get_stats(self) -> dict[str, int]:
+        """获取请求计数（总调用数、上游请求数、被合并的调用数）。"""
+        return dict(self.stats)
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        """获取 endpoint 对应的熔断器（按第一段路径，如 /positions）。"""
+        name = "/" + endpoint.split("/")[1]
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+            self._breakers[name] = breaker
+        return breaker
+
+    def _validator(self, key: tuple) -> _Validator | None:
+        entry = self._validators.get(key)
+        return entry.value if entry is not None else None
+
+    def _remember(self, key: tuple, headers, data: Any) -> Any:
+        """保存响应的校验信息，并标记内容相对上一次响应是否变化。
+
+        服务端不支持条件请求时，也会通过比较内容判断是否变化。
+        """
+        previous = self._validator(key)
+        if previous is not None and previous.body == data:
+            changed, version = False, previous.version
+        else:
+            self._response_version += 1
+            changed, version = True, self._response_version
+        data = _tag_response(data, changed, version)
+        validator = _Validator(headers.get("ETag"), headers.get("Last-Modified"), data, version)
+        self._validators.set(key, validator, ttl=math.inf)
+        return data
+
+    def get_breaker_states(self) -> dict[str, str]:
+        """获取未处于 closed 状态的熔断器 {endpoint: state}。"""
+        return {
+            name: breaker.state
+            for name, breaker in sorted(self._breakers.items())
+            if breaker.state != CLOSED
+        }
+
+    @staticmethod
+    def _request_key(endpoint: str, params: dict | None) -> tuple:
+        """生成请求去重 key（参数顺序无关）。"""
+        if not params:
+            return (endpoint, ())
+        return (endpoint, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+    def _cache_ttl(self, endpoint: str) -> float:
+        """获取 endpoint 的缓存 TTL（0 表示不缓存）。"""
+        return self._cache_ttls.get("/" + endpoint.split("/")[1], 0)
+
+    def invalidate(self, *prefixes: str) -> int:
+        """使缓存失效，并丢弃失效前已发出的请求结果。
+
+        Args:
+            prefixes: endpoint 前缀（如 "/positions"），不传则清空全部缓存
+
+        Returns:
+            删除的缓存条目数
+        """
+        self._cache_generation += 1
+        if not prefixes:
+            return self._cache.invalidate()
+        return self._cache.invalidate(lambda key: key[0].startswith(prefixes))
+
+    def invalidate_vault_data(self):
+        """合约写入成功后调用，使 vault 相关的缓存和共享快照失效。"""
+        removed = self.invalidate(*VAULT_WRITE_INVALIDATES)
+        self.snapshots.reset()
+        logger.debug("Invalidated %d cached vault responses after contract write", removed)
 
     async def _get(self, endpoint: str, params: dict = None) -> dict:
-        """发送 GET 请求，带重试机制。
+        """发送 GET 请求，优先使用缓存并合并相同的并发请求。
+
+        - 缓存新鲜：直接返回
+        - 缓存在宽限期内：返回旧值，同时在后台刷新
+        - 相同 endpoint 和 params 的请求正在进行中：等待该请求的结果
+
+        所有调用方拿到同一个结果对象，不应修改它。
+
+        Args:
+            endpoint: API 端点
+            params: 查询参数
+
+        Returns:
+            API 响应字典，或包含 "error" 键的错误字典
+        """
+        self.stats["requests"] += 1
+        key = self._request_key(endpoint, params)
+        ttl = self._cache_ttl(endpoint)
+
+        if ttl:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry.is_fresh(self._cache.now()):
+                    self.stats["cache_hits"] += 1
+                    return entry.value
+                self.stats["stale_hits"] += 1
+                self._launch(key, endpoint, params, ttl)
+                return entry.value
+
+        task = self._launch(key, endpoint, params, ttl)
+        # shield: 某个等待者被取消时不影响其他等待者
+        return await asyncio.shield(task)
+
+    def _launch(self, key: tuple, endpoint: str, params: dict | None, ttl: float) -> asyncio.Task:
+        """获取进行中的请求，没有则发起新的上游请求。"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return task
+
+        self.stats["upstream"] += 1
+        task = asyncio.ensure_future(
+            self._fetch_and_store(key, endpoint, params, ttl, self._cache_generation)
+        )
+        self._inflight[key] = task
+
+        def _release(done: asyncio.Task):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not done.cancelled() and done.exception() is not None:
+                logger.error("Request failed: %s - %s", endpoint, done.exception())
+
+        task.add_done_callback(_release)
+        return task
+
+    async def _fetch_and_store(
+        self, key: tuple, endpoint: str, params: dict | None, ttl: float, generation: int
+    ) -> dict:
+        """请求上游并缓存成功的结果。
+
+        请求发出后如果缓存被 invalidate（例如合约写入），结果不写入缓存。
+        """
+        result = await self._fetch(endpoint, params)
+        if ttl and generation == self._cache_generation:
+            if not (isinstance(result, dict) and "error" in result):
+                self._cache.set(key, result, ttl, ttl * CACHE_STALE_FACTOR)
+        return result
+
+    async def _fetch(self, endpoint: str, params: dict = None) -> dict:
+        """发送上游 GET 请求，带熔断和重试。
+
+        - 熔断器 open 时直接返回错误，不发请求
+        - 网络错误、超时和 5xx 计为失败；重试使用带抖动的指数退避，
+          并受全局重试预算限制
+        - 每次请求前从限流器取令牌；429 按 Retry-After 暂停限流器后重试
+        - 带上次响应的 ETag / Last-Modified 发条件请求，304 时返回上次的响应
 
         Args:
             endpoint: API 端点
@@ -57,18 +354,63 @@ class TerminalAPI:
             API 响应字典，或包含 "error" 键的错误字典
         """
         url = f"{self.base_url}{endpoint}"
+        key = self._request_key(endpoint, params)
+        validator = self._validator(key)
+        headers = {}
+        if validator is not None:
+            if validator.etag:
+                headers["If-None-Match"] = validator.etag
+            if validator.last_modified:
+                headers["If-Modified-Since"] = validator.last_modified
+        breaker = self._breaker(endpoint)
+        self._retry_budget.record_request()
         last_error = None
 
         for attempt in range(HTTP_MAX_RETRIES):
+            if not breaker.allow_request():
+                self.stats["short_circuited"] += 1
+                return {
+                    "error": f"Circuit open for {endpoint.split('?')[0]}, "
+                    f"retry in {breaker.retry_after():.0f}s"
+                }
+            await self._limiter.acquire()
             try:
-                async with aiohttp.ClientSession(trust_env=True, timeout=HTTP_TIMEOUT) as session:
-                    async with session.get(url, params=params) as resp:
+                session = await self._get_session()
+                async with session.get(url, params=params, headers=headers) as resp:
+                    if resp.status == 429:
+                        # 上游可达，只是被限流：不计为熔断失败
+                        breaker.record_success()
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        self._limiter.record_throttled(retry_after)
+                        self.stats["throttled"] += 1
+                        logger.warning(
+                            "Rate limited by upstream (Retry-After: %s): %s", retry_after, endpoint
+                        )
+                        last_error = "HTTP 429"
+                        if retry_after is not None and retry_after > RETRY_AFTER_MAX_WAIT:
+                            return {"error": "HTTP 429"}
+                    elif resp.status < 500:
+                        breaker.record_success()
+                        self._limiter.record_success()
                         if resp.status == 200:
-                            return await resp.json()
+                            return self._remember(key, resp.headers, await resp.json())
+                        if resp.status == 304 and validator is not None:
+                            self.stats["not_modified"] += 1
+                            body = validator.body
+                            if not isinstance(body, dict | list):
+                                return body
+                            # 复制一份，不修改之前返回给调用方的对象；已解析的模型可复用
+                            tagged = _tag_response(body.copy(), False, validator.version)
+                            tagged.model = body.model
+                            return tagged
+                        return {"error": f"HTTP {resp.status}"}
+                    else:
+                        breaker.record_failure()
                         return {"error": f"HTTP {resp.status}"}
 
             except aiohttp.ClientError as e:
                 last_error = e
+                breaker.record_failure()
                 logger.warning(
                     "HTTP request failed (attempt %d/%d): %s - %s",
                     attempt + 1,
@@ -76,21 +418,28 @@ class TerminalAPI:
                     endpoint,
                     e,
                 )
-                if attempt < HTTP_MAX_RETRIES - 1:
-                    await asyncio.sleep(HTTP_RETRY_DELAY * (attempt + 1))
 
             except TimeoutError:
                 last_error = "Request timeout"
+                breaker.record_failure()
                 logger.warning(
                     "HTTP request timeout (attempt %d/%d): %s",
                     attempt + 1,
                     HTTP_MAX_RETRIES,
                     endpoint,
                 )
-                if attempt < HTTP_MAX_RETRIES - 1:
-                    await asyncio.sleep(HTTP_RETRY_DELAY * (attempt + 1))
 
-        logger.error("HTTP request failed after %d retries: %s", HTTP_MAX_RETRIES, endpoint)
+            if attempt == HTTP_MAX_RETRIES - 1:
+                break
+            if not self._retry_budget.try_acquire():
+                logger.warning("Retry budget exhausted, not retrying: %s", endpoint)
+                break
+            self.stats["retries"] += 1
+            if last_error != "HTTP 429":
+                # 429 的等待由限流器按 Retry-After 处理
+                await asyncio.sleep(backoff_delay(attempt, HTTP_RETRY_DELAY, HTTP_RETRY_MAX_DELAY))
+
+        logger.error("HTTP request failed after %d attempts: %s", attempt + 1, endpoint)
         return {"error": f"Request failed: {last_error}"}
 
     async def get_vault(self) -> dict:
@@ -105,9 +454,17 @@ class TerminalAPI:
         """获取 PnL 历史"""
         return await self._get(f"/pnl-history/{self.vault}")
 
-    async def get_activity(self, limit: int = 10) -> dict:
-        """获取最近活动"""
-        return await self._get(f"/activity/{self.vault}", {"limit": limit, "order": "desc"})
+    async def get_activity(self, limit: int = 10, cursor: str | None = None) -> dict:
+        """获取最近活动（按时间倒序）。
+
+        Args:
+            limit: 每页条数
+            cursor: 分页游标，返回该游标之前（更早）的活动
+        """
+        params = {"limit": limit, "order": "desc"}
+        if cursor:
+            params["cursor"] = cursor
+        return await self._get(f"/activity/{self.vault}", params)
 
     async def get_strategies(self) -> list:
         """获取活跃策略"""
@@ -130,34 +487,35 @@ class TerminalAPI:
         return await self._get("/eth-price")
 
     async def get_tokens(self, page: int = 1, limit: int = 10) -> dict:
-        """Get tradeable tokens list."""
+        """Get tradeable tokens list.
+
+        Served from the local token index once it has been loaded or built;
+        falls back to the remote endpoint otherwise.
+        """
+        if self.token_index.listing:
+            return self.token_index.page(page, limit)
         return await self._get("/tokens", {"page": page, "limit": limit})
 
     async def get_token(self, address_or_symbol: str) -> dict:
         """Get token details by address or symbol.
 
         If the input looks like a contract address (starts with 0x), query directly.
-        Otherwise, use cache to find matching symbol.
+        Otherwise, use the token index to find the matching symbol. When there is
+        no exact match, the error dict carries "candidates" from a local search.
         """
-        global _token_cache, _token_cache_time
-
         # If it looks like a contract address, query directly
         if address_or_symbol.startswith("0x"):
             return await self._get(f"/token/{address_or_symbol}")
 
-        symbol = address_or_symbol.upper()
-
-        # Check cache (refresh if expired or empty)
-        now = time.time()
-        if not _token_cache or (now - _token_cache_time) > TOKEN_CACHE_TTL:
-            await _build_token_cache(self)
-
-        # Lookup in cache
-        token_address = _token_cache.get(symbol)
+        token_address = await self.token_index.lookup(address_or_symbol)
         if token_address:
             return await self._get(f"/token/{token_address}")
 
-        return {"error": f"Token '{address_or_symbol}' not found"}
+        error = {"error": f"Token '{address_or_symbol}' not found"}
+        candidates = self.token_index.search(address_or_symbol)
+        if candidates:
+            error["candidates"] = candidates
+        return error
 
     async def get_launch_schedule(self) -> list:
         """Get upcoming token launch schedule."""
@@ -0,0 +1,211 @@
+"""
+Candle Store
+
+Local OHLCV store for the advisor's technical analysis, keyed by
+(token address, timeframe). Each series keeps array-backed columns; once a
+series holds the requested window, later requests only fetch the bars newer
+than the last stored timestamp (plus the still-forming last bar) and merge
+them in, instead of re-downloading the whole window.
+
+Series keep up to MAX_BARS bars, so longer lookbacks need no extra requests
+once the store is warm.
+"""
+
+import logging
+import math
+import time
+from array import array
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from api import TerminalAPI
+
+logger = logging.getLogger(__name__)
+
+MAX_BARS = 500
+MAX_SERIES = 64
+
+TIMEFRAME_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+
+class CandleSeries:
+    """OHLCV columns for one (token, timeframe), oldest bar first."""
+
+    __slots__ = ("times", "opens", "highs", "lows", "closes", "volumes", "has_volume")
+
+    def __init__(self):
+        self.times = array("q")
+        self.opens = array("d")
+        self.highs = array("d")
+        self.lows = array("d")
+        self.closes = array("d")
+        self.volumes = array("d")
+        self.has_volume = False
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def last_time(self) -> int | None:
+        return self.times[-1] if self.times else None
+
+    def merge(self, data: dict, max_bars: int = MAX_BARS) -> int:
+        """Merge a UDF response into the series.
+
+        Bars newer than the last stored one are appended; a bar with the last
+        stored timestamp replaces it (it was still forming). Older bars are
+        already stored and are skipped.
+
+        Returns:
+            Number of bars appended
+        """
+        times = data.get("t") or []
+        columns = [data.get(key) or [] for key in ("o", "h", "l", "c")]
+        volumes = data.get("v") or []
+        self.has_volume = self.has_volume or bool(volumes)
+        appended = 0
+        for i, t in enumerate(times):
+            try:
+                t = int(t)
+                bar = [float(column[i]) for column in columns]
+                volume = float(volumes[i]) if i < len(volumes) else 0.0
+            except (IndexError, TypeError, ValueError):
+                continue
+            last = self.last_time
+            if last is not None and t < last:
+                continue
+            if last is not None and t == last:
+                self._pop()
+            else:
+                appended += 1
+            self.times.append(t)
+            for target, value in zip(
+                (self.opens, self.highs, self.lows, self.closes), bar, strict=True
+            ):
+                target.append(value)
+            self.volumes.append(volume)
+
+        overflow = len(self) - max_bars
+        if overflow > 0:
+            for column in self._columns():
+                del column[:overflow]
+        return appended
+
+    def _columns(self) -> tuple[array, ...]:
+        return (self.times, self.opens, self.highs, self.lows, self.closes, self.volumes)
+
+    def _pop(self):
+        for column in self._columns():
+            column.pop()
+
+    def to_udf(self, limit: int) -> dict[str, Any]:
+        """Latest limit bars as a UDF response (same shape as /candles)."""
+        start = max(len(self) - limit, 0)
+        data: dict[str, Any] = {
+            "s": "ok",
+            "t": self.times[start:].tolist(),
+            "o": self.opens[start:].tolist(),
+            "h": self.highs[start:].tolist(),
+            "l": self.lows[start:].tolist(),
+            "c": self.closes[start:].tolist(),
+        }
+        if self.has_volume:
+            data["v"] = self.volumes[start:].tolist()
+        return data
+
+
+def _failure(data: Any) -> str:
+    """Short description of a failed candles response."""
+    if isinstance(data, dict):
+        return str(data.get("error") or data.get("errmsg") or data.get("s") or "invalid response")
+    return "invalid response"
+
+
+class CandleStore:
+    """Incrementally updated candle series backed by TerminalAPI.get_candles.
+
+    Args:
+        api: TerminalAPI instance used to fetch candles
+        max_bars: Bars kept per series
+        max_series: Series kept (least recently used ones are dropped)
+        clock: Wall-clock time function (replaceable in tests)
+
+    Example:
+        store = CandleStore(api)
+        udf = await store.get(token_address, "1h", 24)
+    """
+
+    def __init__(
+        self,
+        api: "TerminalAPI",
+        max_bars: int = MAX_BARS,
+        max_series: int = MAX_SERIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.api = api
+        self.max_bars = max_bars
+        self._clock = clock
+        self._series = TTLCache(max_series)
+
+    def series(self, token_address: str, timeframe: str) -> CandleSeries | None:
+        entry = self._series.get((token_address.lower(), timeframe))
+        return entry.value if entry else None
+
+    def _countback(self, series: CandleSeries | None, timeframe: str, limit: int) -> int | None:
+        """Bars needed to bring a series up to date.
+
+        Returns:
+            Number of bars to request, or None if the whole window has to be
+            (re)fetched: cold series, or so many bars missing that a window
+            would not reach back to the stored ones
+        """
+        step = TIMEFRAME_SECONDS.get(timeframe)
+        if series is None or len(series) < limit or step is None:
+            return None
+        missing = math.ceil((self._clock() - series.last_time) / step)
+        # +1 re-fetches the last stored bar, which may still have been forming
+        countback = max(missing, 0) + 1
+        return countback if countback < limit else None
+
+    async def get(self, token_address: str, timeframe: str, limit: int) -> dict[str, Any]:
+        """Latest limit bars for a token, fetching only what the store is missing.
+
+        Returns:
+            UDF response with s == "ok", or the API response as-is when nothing
+            is stored yet and the request did not return candles. When the
+            request failed but bars are stored, those bars are returned with a
+            "stale" key holding the failure, so callers can report it.
+        """
+        key = (token_address.lower(), timeframe)
+        series = self.series(token_address, timeframe)
+        countback = self._countback(series, timeframe, limit)
+        data = await self.api.get_candles(token_address, timeframe, countback or limit)
+
+        if isinstance(data, dict) and data.get("s") == "ok":
+            if countback is None:
+                series = CandleSeries()
+            series.merge(data, self.max_bars)
+            self._series.set(key, series, ttl=math.inf)
+        elif series is None or not len(series):
+            return data
+        elif isinstance(data, dict) and data.get("s") == "no_data":
+            # Quiet market: the stored bars are current
+            logger.debug(f"No new {timeframe} candles for {token_address}, serving stored bars")
+        else:
+            logger.warning(
+                f"Failed to update {timeframe} candles for {token_address}, serving stored bars"
+            )
+            stale = series.to_udf(limit)
+            stale["stale"] = _failure(data)
+            return stale
+        return series.to_udf(limit)
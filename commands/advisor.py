@@ -5,11 +5,13 @@ Commands to control the AI strategy advisor service and handle callback queries.
 """
 
 import logging
+import time
 from datetime import datetime, timedelta
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
+import config
 from config import is_admin
 from utils.error_handler import safe_command
 
@@ -21,6 +23,8 @@ _advisor_monitor = None
 # Cooldown tracking for manual analysis (Story 8-5)
 _last_manual_analysis: dict[int, datetime] = {}
 MANUAL_ANALYSIS_COOLDOWN = timedelta(minutes=5)
+# Minimum seconds between progress edits of the status message (Telegram edit rate limits)
+PROGRESS_EDIT_INTERVAL = 2.0
 
 
 def set_advisor_monitor(monitor):
@@ -84,13 +88,20 @@ async def cmd_advisor_status(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     interval = _advisor_monitor.interval_seconds // 3600
     last = _advisor_monitor.last_analysis
     last_str = last.strftime("%Y-%m-%d %H:%M") if last else "Never"
-
-    await update.message.reply_text(
+    skipped = _advisor_monitor.advisor.memo.status()
+    queue = _advisor_monitor.advisor.scheduler.status()
+    text = (
         f"AI Strategy Advisor Status\n\n"
         f"State: {status}\n"
         f"Interval: {interval}h\n"
-        f"Last Analysis: {last_str}"
+        f"Last Analysis: {last_str}\n"
+        f"Skipped (unchanged market): {skipped}\n"
+        f"LLM Queue: {queue}"
     )
+    if config.ADVISOR_HISTORY_ENABLED:
+        text += f"\nHistory Page: {_advisor_monitor.advisor.publisher.status()}"
+
+    await update.message.reply_text(text)
 
 
 @safe_command
@@ -143,10 +154,18 @@ async def cmd_advisor_analyze(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
     # Send status message
     status_msg = await update.message.reply_text("Analyzing your portfolio...")
+    last_progress = time.monotonic()
+
+    async def show_progress(received: str):
+        nonlocal last_progress
+        if time.monotonic() - last_progress < PROGRESS_EDIT_INTERVAL:
+            return
+        last_progress = time.monotonic()
+        await status_msg.edit_text(f"Analyzing your portfolio... ({len(received)} chars received)")
 
     try:
-        # Execute analysis
-        suggestions = await _advisor_monitor.advisor.analyze()
+        # Execute analysis (streamed, with progress in the status message)
+        suggestions = await _advisor_monitor.advisor.analyze(on_progress=show_progress)
 
         # Handle no suggestions
         if not suggestions:
@@ -179,8 +198,6 @@ async def cmd_advisor_analyze(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         if collected.strategies and not (
             isinstance(collected.strategies, dict) and "error" in collected.strategies
         ):
-            import time
-
             current_time = int(time.time())
             active_strategies = [
                 s
@@ -14,6 +14,13 @@ logger = logging.getLogger(__name__)
 _monitor_instance = None
 
 
+def _get_api():
+    """Lazy import api to avoid circular imports."""
+    from main import api
+
+    return api
+
+
 def set_monitor_instance(instance):
     """Set monitor instance, called by main.py in post_init."""
     global _monitor_instance
@@ -37,12 +44,30 @@ async def cmd_monitor_status(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     status = "Running" if _monitor_instance.running else "Stopped"
     interval = _monitor_instance.poll_interval
     seen_count = len(_monitor_instance.seen_ids)
+    api = _get_api()
+    api_stats = api.get_stats()
+    breakers = api.get_breaker_states()
+    breaker_text = (
+        "\n".join(f"  {name}: {state}" for name, state in breakers.items())
+        if breakers
+        else "  All closed"
+    )
 
     await update.message.reply_text(
         f"Monitor Status\n\n"
         f"State: {status}\n"
         f"Poll Interval: {interval}s\n"
-        f"Activities Processed: {seen_count}"
+        f"Current Cadence: {_monitor_instance.cadence_status()}\n"
+        f"Activities Processed: {seen_count}\n\n"
+        f"API Requests: {api_stats['requests']}\n"
+        f"  Upstream: {api_stats['upstream']}\n"
+        f"  Coalesced: {api_stats['coalesced']}\n"
+        f"  Cache Hits: {api_stats.get('cache_hits', 0)} (stale: {api_stats.get('stale_hits', 0)})\n"
+        f"  Not Modified (304): {api_stats.get('not_modified', 0)}\n"
+        f"  Retries: {api_stats.get('retries', 0)}\n"
+        f"  Short-circuited: {api_stats.get('short_circuited', 0)}\n"
+        f"  Throttled (429): {api_stats.get('throttled', 0)}\n\n"
+        f"Circuit Breakers:\n{breaker_text}"
     )
 
 
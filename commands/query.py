@@ -5,11 +5,14 @@ from datetime import UTC, datetime
 from telegram import Update
 from telegram.ext import ContextTypes
 
+import models
+from snapshot_hub import latest_section
 from utils.error_handler import safe_command
 from utils.formatters import (
     format_eth,
     format_large_number,
     format_percent,
+    format_price,
     format_time,
     format_usd,
 )
@@ -75,15 +78,15 @@ async def cmd_balance(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     """Query balance."""
     if not authorized(update):
         return
-    api = _get_api()
-    data = await api.get_positions()
+    data = await latest_section(_get_api(), "positions")
     if "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
-    eth = format_eth(data.get("ethBalance", "0"))
-    value = format_usd(data.get("overallValueUsd", "0"))
-    pnl = format_usd(data.get("overallPnlUsd", "0"))
-    pct = format_percent(data.get("overallPnlPercent", "0"))
+    snapshot = models.positions_snapshot(data)
+    eth = format_eth(snapshot.eth_balance_wei)
+    value = format_usd(snapshot.overall_value_usd)
+    pnl = format_usd(snapshot.overall_pnl_usd)
+    pct = format_percent(snapshot.overall_pnl_percent)
     msg = f"""
 Balance Summary
 
@@ -99,22 +102,18 @@ async def cmd_positions(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     """Query positions."""
     if not authorized(update):
         return
-    api = _get_api()
-    data = await api.get_positions()
+    data = await latest_section(_get_api(), "positions")
     if "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
-    positions = data.get("positions", [])
+    positions = models.positions_snapshot(data).positions
     if not positions:
         await update.message.reply_text("No positions")
         return
     lines = ["Positions:\n"]
     for p in positions:
-        sym = p.get("tokenSymbol", "?")
-        val = format_usd(p.get("currentValueUsd", "0"))
-        pnl = format_usd(p.get("totalPnlUsd", "0"))
-        pct = format_percent(p.get("totalPnlPercent", "0"))
-        lines.append(f"{sym}: {val}")
+        pnl, pct = format_usd(p.total_pnl_usd), format_percent(p.total_pnl_percent)
+        lines.append(f"{p.symbol}: {format_usd(p.value_usd)}")
         lines.append(f"  PnL: {pnl} ({pct})\n")
     await update.message.reply_text("\n".join(lines))
 
@@ -124,25 +123,21 @@ async def cmd_pnl(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     """Query PnL."""
     if not authorized(update):
         return
-    api = _get_api()
-    data = await api.get_positions()
+    data = await latest_section(_get_api(), "positions")
     if "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
-    total = format_usd(data.get("overallPnlUsd", "0"))
-    pct = format_percent(data.get("overallPnlPercent", "0"))
-    eth = format_eth(data.get("overallPnlEth", "0"))
+    snapshot = models.positions_snapshot(data)
+    total = format_usd(snapshot.overall_pnl_usd)
+    pct = format_percent(snapshot.overall_pnl_percent)
+    eth = format_eth(snapshot.overall_pnl_eth_wei)
     lines = [f"PnL Summary\n\nTotal: {total} ({pct})\nETH: {eth}\n\nBreakdown:"]
-    for p in data.get("positions", []):
-        sym = p.get("tokenSymbol", "?")
-        pnl = format_usd(p.get("totalPnlUsd", "0"))
-        pnl_pct = format_percent(p.get("totalPnlPercent", "0"))
-        realized = format_usd(p.get("realizedPnlUsd", "0"))
-        unrealized = format_usd(p.get("unrealizedPnlUsd", "0"))
-        lines.append(f"\n{sym}:")
+    for p in snapshot.positions:
+        pnl, pnl_pct = format_usd(p.total_pnl_usd), format_percent(p.total_pnl_percent)
+        lines.append(f"\n{p.symbol}:")
         lines.append(f"  Total: {pnl} ({pnl_pct})")
-        lines.append(f"  Realized: {realized}")
-        lines.append(f"  Unrealized: {unrealized}")
+        lines.append(f"  Realized: {format_usd(p.realized_pnl_usd)}")
+        lines.append(f"  Unrealized: {format_usd(p.unrealized_pnl_usd)}")
     await update.message.reply_text("\n".join(lines))
 
 
@@ -156,29 +151,23 @@ async def cmd_activity(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
-    items = data.get("items", [])
+    items = models.activities(data)
     if not items:
         await update.message.reply_text("No recent activity")
         return
     lines = ["Recent Activity:\n"]
     for item in items[:5]:
-        t = item.get("type", "?")
-        ts = format_time(item.get("timestamp"))
-        if t == "swap":
-            s = item.get("swap", {})
-            sym = s.get("tokenSymbol", "?")
-            side = s.get("side", "?").upper()
-            eth = format_eth(s.get("ethAmount", "0"))
-            lines.append(f"[{ts}] Swap {side} {sym}: {eth} ETH")
-        elif t == "deposit":
-            d = item.get("deposit", {})
-            amt = format_eth(d.get("amountWei", "0"))
-            lines.append(f"[{ts}] Deposit {amt} ETH")
-        elif t == "withdrawal":
-            w = item.get("withdrawal", {})
-            amt = format_eth(w.get("amountWei", "0"))
-            lines.append(f"[{ts}] Withdraw {amt} ETH")
-        elif t == "vault_summary":
+        ts = format_time(item.timestamp)
+        if item.swap is not None:
+            s = item.swap
+            lines.append(
+                f"[{ts}] Swap {s.side} {s.token_symbol}: {format_eth(s.eth_amount_wei)} ETH"
+            )
+        elif item.type == "deposit":
+            lines.append(f"[{ts}] Deposit {format_eth(item.amount_wei)} ETH")
+        elif item.type == "withdrawal":
+            lines.append(f"[{ts}] Withdraw {format_eth(item.amount_wei)} ETH")
+        elif item.type == "vault_summary":
             lines.append(f"[{ts}] Vault Summary")
     await update.message.reply_text("\n".join(lines))
 
@@ -193,20 +182,15 @@ async def cmd_swaps(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
-    items = data.get("items", [])
+    items = models.swaps(data)
     if not items:
         await update.message.reply_text("No swaps")
         return
     lines = ["Recent Swaps:\n"]
     for s in items:
-        ts = format_time(s.get("timestamp"))
-        sym = s.get("tokenSymbol", "?")
-        side = s.get("side", "?").upper()
-        eth = format_eth(s.get("ethAmount", "0"))
-        price = s.get("effectivePriceUsd", "?")
-        lines.append(f"[{ts}] {side} {sym}")
-        lines.append(f"  ETH: {eth}")
-        lines.append(f"  Price: ${price}\n")
+        lines.append(f"[{format_time(s.timestamp)}] {s.side} {s.token_symbol}")
+        lines.append(f"  ETH: {format_eth(s.eth_amount_wei)}")
+        lines.append(f"  Price: {format_price(s.price_usd)}\n")
     await update.message.reply_text("\n".join(lines))
 
 
@@ -215,8 +199,7 @@ async def cmd_strategies(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     """Query active strategies."""
     if not authorized(update):
         return
-    api = _get_api()
-    data = await api.get_strategies()
+    data = await latest_section(_get_api(), "strategies")
     if isinstance(data, dict) and "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
@@ -224,12 +207,9 @@ async def cmd_strategies(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("No active strategies")
         return
     lines = ["Active Strategies:\n"]
-    for s in data:
-        sid = s.get("strategyId", "?")
-        prio = s.get("strategyPriority", "?").upper()
-        content = s.get("content", "")[:100]
-        lines.append(f"#{sid} [{prio}]")
-        lines.append(f"  {content}...\n")
+    for s in models.strategies(data):
+        lines.append(f"#{s.id} [{str(s.priority or '?').upper()}]")
+        lines.append(f"  {s.content[:100]}...\n")
     await update.message.reply_text("\n".join(lines))
 
 
@@ -238,8 +218,7 @@ async def cmd_vault(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     """Query Vault info."""
     if not authorized(update):
         return
-    api = _get_api()
-    data = await api.get_vault()
+    data = await latest_section(_get_api(), "vault")
     if "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
@@ -416,8 +395,7 @@ async def cmd_price(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     """Query ETH price."""
     if not authorized(update):
         return
-    api = _get_api()
-    data = await api.get_eth_price()
+    data = await latest_section(_get_api(), "eth_price")
     if "error" in data:
         await update.message.reply_text(f"Error: {data['error']}")
         return
@@ -498,8 +476,15 @@ async def cmd_token(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     api = _get_api()
     data = await api.get_token(address)
 
-    # Handle API error
+    # Handle API error (suggest close matches from the local token index)
     if "error" in data:
+        candidates = data.get("candidates") or []
+        if candidates:
+            lines = [f"Token '{address}' not found. Did you mean:\n"]
+            for token in candidates:
+                lines.append(f"${token.get('symbol', '?')} - {token.get('name', '?')}")
+            await update.message.reply_text("\n".join(lines))
+            return
         await update.message.reply_text(f"Error: {data['error']}")
         return
 
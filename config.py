@@ -15,6 +15,23 @@ ALLOWED_USERS = [int(x) for x in os.getenv("ALLOWED_USERS", "").split(",") if x.
 VAULT_ADDRESS = os.getenv("VAULT_ADDRESS", "0x933aafc9C5B1e0000E1dd77ac52D67b0E4e4997C")
 API_BASE_URL = os.getenv("API_BASE_URL", "https://api.terminal.markets/api/v1")
 
+# Terminal API Response Cache
+# API_CACHE_TTLS 覆盖默认 TTL，格式: "positions=15,vault=60" (秒, 0 = 不缓存)
+API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "true").lower() == "true"
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+API_CACHE_TTLS = {
+    f"/{k.strip().lstrip('/')}": float(v)
+    for k, _, v in (item.partition("=") for item in os.getenv("API_CACHE_TTLS", "").split(","))
+    if k.strip() and v.strip().replace(".", "", 1).isdigit()
+}
+
+# Terminal API client-side rate limit (shared by commands and background services)
+API_RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", "10"))  # requests per second
+API_RATE_BURST = int(os.getenv("API_RATE_BURST", "20"))
+
+# Shared vault snapshot (positions/strategies/vault/eth-price) refresh interval in seconds
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "15"))
+
 # Web3 Configuration
 RPC_URL = os.getenv("RPC_URL", "")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY", "")
@@ -45,17 +62,27 @@ LLM_API_KEY = os.getenv("LLM_API_KEY", "")
 LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://open.bigmodel.cn/api/paas/v4")
 LLM_MODEL = os.getenv("LLM_MODEL", "glm-4")
 LLM_TIMEOUT = int(os.getenv("LLM_TIMEOUT", "60"))
+LLM_FIRST_TOKEN_TIMEOUT = int(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", "20"))
+LLM_MAX_CONCURRENT = max(int(os.getenv("LLM_MAX_CONCURRENT", "1")), 1)
 
 # Advisor Configuration
 ADVISOR_ENABLED = os.getenv("ADVISOR_ENABLED", "true").lower() == "true"
 ADVISOR_INTERVAL_HOURS = int(os.getenv("ADVISOR_INTERVAL_HOURS", "2"))
 SUGGESTION_TTL_MINUTES = int(os.getenv("SUGGESTION_TTL_MINUTES", "30"))
+# Reuse an analysis while prices stay within the same bucket (relative width)
+ADVISOR_MEMO_PRICE_STEP = float(os.getenv("ADVISOR_MEMO_PRICE_STEP", "0.02"))
+ADVISOR_MEMO_TTL_HOURS = float(os.getenv("ADVISOR_MEMO_TTL_HOURS", "12"))
 
 # AI Advisor History (Story 8-6)
 ADVISOR_HISTORY_ENABLED = os.getenv("ADVISOR_HISTORY_ENABLED", "false").lower() == "true"
 ADVISOR_HISTORY_MAX = int(os.getenv("ADVISOR_HISTORY_MAX", "30"))
+# Records kept in the history database (ADVISOR_HISTORY_MAX of them are shown on the web page)
+ADVISOR_HISTORY_RETAIN = int(os.getenv("ADVISOR_HISTORY_RETAIN", "2000"))
 ADVISOR_SURGE_DOMAIN = os.getenv("ADVISOR_SURGE_DOMAIN", "dx-advisor.surge.sh")
 SURGE_TOKEN = os.getenv("SURGE_TOKEN", "")
+# Saves within this window are published to the history page in one upload
+ADVISOR_PUBLISH_DEBOUNCE_SECONDS = float(os.getenv("ADVISOR_PUBLISH_DEBOUNCE_SECONDS", "30"))
+ADVISOR_PUBLISH_TIMEOUT = int(os.getenv("ADVISOR_PUBLISH_TIMEOUT", "60"))
 
 
 def is_admin(user_id: int) -> bool:
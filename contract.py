@@ -5,15 +5,18 @@ This module provides the VaultContract class for interacting with
 the AgentVault smart contract on Ethereum-compatible networks.
 """
 
+import asyncio
+import functools
 import json
 import logging
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 from web3 import Web3
 from web3.contract import Contract
-from web3.exceptions import ContractLogicError
+from web3.exceptions import ContractLogicError, TimeExhausted
 
 from config import CHAIN_ID, PRIVATE_KEY, RPC_URL, VAULT_ADDRESS
 
@@ -29,14 +32,101 @@ ERROR_MESSAGES = {
     "unknown": "未知错误，请稍后重试",
 }
 
+# web3's HTTP provider is synchronous; its calls run on this pool so that RPC
+# round trips and receipt polling never block the event loop. Sized for a few
+# transactions waiting on confirmation at once.
+_web3_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="web3")
+
+
+async def _run_web3[T](fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking web3 call on the web3 thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_web3_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _validate_strategy(content: str, expiry: int, priority: int) -> str | None:
+    """Check addStrategy arguments; returns the error message, or None if valid."""
+    # Validate content
+    if not content or not content.strip():
+        return "Strategy content cannot be empty"
+
+    content_bytes = content.encode("utf-8")
+    if len(content_bytes) > 1024:
+        return f"Strategy too long (max 1024 bytes, got {len(content_bytes)})"
+
+    # Validate expiry (must be 0 or future timestamp)
+    import time
+
+    if expiry < 0:
+        return "Expiry must be non-negative"
+    if expiry > 0 and expiry <= int(time.time()):
+        return "Expiry must be a future timestamp"
+
+    # Validate priority (0=LOW, 1=MEDIUM, 2=HIGH)
+    if priority not in (0, 1, 2):
+        return "Priority must be 0 (Low), 1 (Medium), or 2 (High)"
+    return None
+
+
+class NonceManager:
+    """Local nonce counter for one signing account.
+
+    Transactions are signed and broadcast while holding `lock`, each taking
+    the next nonce with take(). The chain's pending count only moves the
+    counter forward (sync), so a lagging RPC node cannot hand out a nonce that
+    was already used, while transactions sent from elsewhere are picked up.
+
+    The lock belongs to one event loop. When the bot restarts on a new loop
+    the lock is re-created and the counter reset.
+    """
+
+    def __init__(self):
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._next: int | None = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Lock serializing nonce allocation (use inside a running loop)."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+            self._next = None
+        return self._lock
+
+    def sync(self, chain_nonce: int, force: bool = False):
+        """Catch up with the chain's pending nonce (force: also move backwards)."""
+        if force or self._next is None or chain_nonce > self._next:
+            self._next = chain_nonce
+
+    def take(self) -> int:
+        """Next nonce (call with lock held, after sync)."""
+        nonce = self._next
+        self._next += 1
+        return nonce
+
+    def give_back(self, nonce: int):
+        """Return the last taken nonce when its transaction was not broadcast."""
+        if self._next == nonce + 1:
+            self._next = nonce
+
+    def reset(self):
+        """Forget the counter; the next sync takes the chain's value."""
+        self._next = None
+
 
 class VaultContract:
     """Interface for interacting with AgentVault smart contract."""
 
-    def __init__(self):
+    def __init__(self, on_transaction: Callable[[], None] | None = None):
         """
         Initialize Web3 connection and contract instance.
 
+        Args:
+            on_transaction: Optional callback invoked after every successful
+                            transaction (e.g. to invalidate cached API data).
+
         Raises:
             ValueError: If required configuration is missing.
         """
@@ -59,6 +149,8 @@ class VaultContract:
         # Load contract
         self.contract: Contract = self._load_contract()
 
+        self.on_transaction = on_transaction
+
     def _load_contract(self) -> Contract:
         """
         Load contract instance from ABI file.
@@ -84,6 +176,11 @@ class VaultContract:
 
         return self.w3.eth.contract(address=self.address, abi=abi)
 
+    @functools.cached_property
+    def nonces(self) -> "NonceManager":
+        """Local nonce counter of the signing account."""
+        return NonceManager()
+
     async def _send_transaction(self, tx_func: Callable, value: int = 0) -> dict[str, Any]:
         """
         Sign, send, and wait for transaction confirmation.
@@ -94,6 +191,13 @@ class VaultContract:
         3. Send to network
         4. Wait for confirmation
 
+        Every web3 call runs on the web3 thread pool, so the event loop keeps
+        serving other tasks while the RPC node responds or the transaction is
+        being mined. Gas estimation, nonce and gas price are fetched concurrently.
+        The nonce comes from the chain's pending count and the local NonceManager,
+        taken while holding its lock, so concurrent calls on one instance never
+        sign with the same nonce.
+
         Args:
             tx_func: Callable that returns transaction builder (e.g., contract.functions.method())
             value: Amount of ETH to send with transaction (in Wei), for payable functions
@@ -106,71 +210,135 @@ class VaultContract:
                 - blockNumber: int - on success
                 - error: str - on failure (user-friendly message)
         """
-        try:
-            # Estimate gas
-            try:
-                gas_estimate = tx_func.estimate_gas(
-                    {
-                        "from": self.account.address,
-                        "value": value,
-                    }
-                )
-            except ContractLogicError as e:
-                logger.error(f"Contract logic error during gas estimation: {e}")
-                return {
-                    "success": False,
-                    "error": ERROR_MESSAGES["gas_estimation_failed"],
-                }
+        return (await self.send_batch([(tx_func, value)]))[0]
 
-            # Build transaction
-            tx = tx_func.build_transaction(
-                {
-                    "from": self.account.address,
-                    "nonce": self.w3.eth.get_transaction_count(self.account.address),
-                    "gas": int(gas_estimate * 1.2),  # Add 20% buffer
-                    "gasPrice": self.w3.eth.gas_price,
-                    "chainId": CHAIN_ID,
-                    "value": value,
-                }
-            )
+    async def send_batch(self, calls: list[tuple[Callable, int]]) -> list[dict[str, Any]]:
+        """
+        Send several transactions in one pipeline.
 
-            # Sign transaction
-            signed_tx = self.account.sign_transaction(tx)
+        1. Estimate gas for every call, fetch the pending nonce and gas price (concurrently)
+        2. Holding the nonce lock, sign and broadcast the calls back-to-back in
+           order, each with the next local nonce
+        3. Wait for all receipts concurrently
 
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        The transactions usually land in the same block. A call whose
+        estimation or broadcast fails gets an error result; its nonce goes to the
+        next call, so no gap is left behind it.
 
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        Args:
+            calls: (tx_func, value) pairs, see _send_transaction
 
-            # Check status
-            if receipt["status"] == 0:
+        Returns:
+            One result dict per call, in order (same keys as _send_transaction)
+        """
+        if not calls:
+            return []
+        results: list[dict[str, Any] | None] = [None] * len(calls)
+        address = self.account.address
+        try:
+            *estimates, chain_nonce, gas_price = await asyncio.gather(
+                *(
+                    _run_web3(tx_func.estimate_gas, {"from": address, "value": value})
+                    for tx_func, value in calls
+                ),
+                _run_web3(self.w3.eth.get_transaction_count, address, "pending"),
+                _run_web3(lambda: self.w3.eth.gas_price),
+                return_exceptions=True,
+            )
+            for prefetch in (chain_nonce, gas_price):
+                if isinstance(prefetch, BaseException):
+                    raise prefetch
+        except Exception as e:
+            return [self._failure(e) for _ in calls]
+
+        sent: dict[int, Any] = {}
+        async with self.nonces.lock:
+            self.nonces.sync(chain_nonce)
+            for i, ((tx_func, value), gas_estimate) in enumerate(
+                zip(calls, estimates, strict=True)
+            ):
+                if isinstance(gas_estimate, BaseException):
+                    results[i] = self._failure(gas_estimate, estimating=True)
+                    continue
+                nonce = self.nonces.take()
+                try:
+                    tx = await _run_web3(
+                        tx_func.build_transaction,
+                        {
+                            "from": address,
+                            "nonce": nonce,
+                            "gas": int(gas_estimate * 1.2),  # Add 20% buffer
+                            "gasPrice": gas_price,
+                            "chainId": CHAIN_ID,
+                            "value": value,
+                        },
+                    )
+                    signed_tx = await _run_web3(self.account.sign_transaction, tx)
+                    sent[i] = await _run_web3(
+                        self.w3.eth.send_raw_transaction, signed_tx.raw_transaction
+                    )
+                except Exception as e:
+                    self.nonces.give_back(nonce)
+                    results[i] = self._failure(e)
+                    if "nonce" in str(e).lower():
+                        # Counter out of step with the chain: resync before the next call
+                        try:
+                            chain_nonce = await _run_web3(
+                                self.w3.eth.get_transaction_count, address, "pending"
+                            )
+                        except Exception as resync_error:
+                            # Cannot tell which nonce is next; fail the rest of the batch
+                            self.nonces.reset()
+                            for j in range(i + 1, len(calls)):
+                                results[j] = self._failure(resync_error)
+                            break
+                        self.nonces.sync(chain_nonce, force=True)
+
+        # Wait for receipts (each polls in a pool thread until its block is mined)
+        receipts = await asyncio.gather(
+            *(_run_web3(self.w3.eth.wait_for_transaction_receipt, h) for h in sent.values()),
+            return_exceptions=True,
+        )
+        for (i, tx_hash), receipt in zip(sent.items(), receipts, strict=True):
+            if isinstance(receipt, TimeExhausted):
+                # Possibly dropped; later nonces would wait behind it, so resync
+                self.nonces.reset()
+            if isinstance(receipt, BaseException):
+                results[i] = self._failure(receipt)
+            elif receipt["status"] == 0:
                 logger.error("Transaction execution failed (status: 0)")
-                return {
-                    "success": False,
-                    "error": ERROR_MESSAGES["contract_reverted"],
+                results[i] = {"success": False, "error": ERROR_MESSAGES["contract_reverted"]}
+            else:
+                self._notify_transaction()
+                results[i] = {
+                    "success": True,
+                    "transactionHash": tx_hash.hex(),
+                    "status": receipt["status"],
+                    "blockNumber": receipt["blockNumber"],
+                    "receipt": dict(receipt),
                 }
-
-            return {
-                "success": True,
-                "transactionHash": tx_hash.hex(),
-                "status": receipt["status"],
-                "blockNumber": receipt["blockNumber"],
-                "receipt": dict(receipt),
-            }
-
-        except ConnectionError as e:
+        return results
+
+    @staticmethod
+    def _failure(e: BaseException, estimating: bool = False) -> dict[str, Any]:
+        """Result dict for a failed transaction step."""
+        if estimating and isinstance(e, ContractLogicError):
+            logger.error(f"Contract logic error during gas estimation: {e}")
+            return {"success": False, "error": ERROR_MESSAGES["gas_estimation_failed"]}
+        if isinstance(e, ConnectionError):
             logger.error(f"Network connection error: {e}")
-            return {
-                "success": False,
-                "error": ERROR_MESSAGES["network_error"],
-            }
+            return {"success": False, "error": ERROR_MESSAGES["network_error"]}
+        logger.error(f"Transaction failed: {e}")
+        return {"success": False, "error": f"{ERROR_MESSAGES['unknown']} ({str(e)})"}
+
+    def _notify_transaction(self):
+        """Invoke the on_transaction callback, never failing the transaction."""
+        if self.on_transaction is None:
+            return
+        try:
+            self.on_transaction()
         except Exception as e:
-            logger.error(f"Transaction failed: {e}")
-            return {
-                "success": False,
-                "error": f"{ERROR_MESSAGES['unknown']} ({str(e)})",
-            }
+            logger.warning(f"on_transaction callback failed: {e}")
 
     async def disable_strategy(self, strategy_id: int) -> dict[str, Any]:
         """
@@ -284,28 +452,9 @@ class VaultContract:
                 - blockNumber: int - on success
                 - error: str - on failure
         """
-        # Validate content
-        if not content or not content.strip():
-            return {"success": False, "error": "Strategy content cannot be empty"}
-
-        content_bytes = content.encode("utf-8")
-        if len(content_bytes) > 1024:
-            return {
-                "success": False,
-                "error": f"Strategy too long (max 1024 bytes, got {len(content_bytes)})",
-            }
-
-        # Validate expiry (must be 0 or future timestamp)
-        import time
-
-        if expiry < 0:
-            return {"success": False, "error": "Expiry must be non-negative"}
-        if expiry > 0 and expiry <= int(time.time()):
-            return {"success": False, "error": "Expiry must be a future timestamp"}
-
-        # Validate priority (0=LOW, 1=MEDIUM, 2=HIGH)
-        if priority not in (0, 1, 2):
-            return {"success": False, "error": "Priority must be 0 (Low), 1 (Medium), or 2 (High)"}
+        error = _validate_strategy(content, expiry, priority)
+        if error:
+            return {"success": False, "error": error}
 
         try:
             tx_func = self.contract.functions.addStrategy(content, expiry, priority)
@@ -320,6 +469,53 @@ class VaultContract:
             logger.error(f"Failed to add strategy: {e}")
             return {"success": False, "error": str(e)}
 
+    async def apply_strategy_changes(self, changes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Add and disable several strategies in one send_batch pipeline.
+
+        The transactions are broadcast back-to-back in the given order and
+        confirmed together, instead of one block per change.
+
+        Args:
+            changes: Dicts with "action" "add" (content, expiry, priority) or
+                     "disable" (strategy_id)
+
+        Returns:
+            One result dict per change, in order (keys as add_strategy /
+            disable_strategy; strategyId on successful adds)
+        """
+        results: list[dict[str, Any] | None] = [None] * len(changes)
+        calls, indices = [], []
+        for i, change in enumerate(changes):
+            try:
+                if change["action"] == "add":
+                    expiry = change.get("expiry", 0)
+                    priority = change.get("priority", 1)
+                    error = _validate_strategy(change["content"], expiry, priority)
+                    if error:
+                        results[i] = {"success": False, "error": error}
+                        continue
+                    tx_func = self.contract.functions.addStrategy(
+                        change["content"], expiry, priority
+                    )
+                elif change["action"] == "disable":
+                    tx_func = self.contract.functions.disableStrategy(change["strategy_id"])
+                else:
+                    results[i] = {"success": False, "error": f"Unknown action: {change['action']}"}
+                    continue
+            except Exception as e:
+                logger.error(f"Failed to prepare strategy change: {e}")
+                results[i] = {"success": False, "error": str(e)}
+                continue
+            calls.append((tx_func, 0))
+            indices.append(i)
+
+        for i, result in zip(indices, await self.send_batch(calls), strict=True):
+            if result.get("success") and changes[i]["action"] == "add":
+                result["strategyId"] = self._parse_strategy_id_from_logs(result.get("receipt", {}))
+            results[i] = result
+        return results
+
     def _parse_strategy_id_from_logs(self, receipt: dict) -> int | None:
         """Parse the newly added strategy ID from transaction receipt logs.
 
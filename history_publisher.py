@@ -0,0 +1,201 @@
+"""
+History Page Publisher
+
+Uploads the analysis history web page (advisor_history.WEB_DIR) in the
+background so saving an analysis never waits on the surge CLI:
+
+- request() only marks the page dirty; a worker task waits until no request
+  has arrived for the debounce window, so a burst of saves becomes one upload
+- the upload runs as an async subprocess with a timeout and retries
+- the uploaded files (minus .surgeignore patterns) are hashed, and an upload
+  whose content matches the last successful one is skipped
+
+status() summarizes uploads for /advisor_status.
+"""
+
+import asyncio
+import fnmatch
+import hashlib
+import logging
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+import advisor_history
+from config import ADVISOR_PUBLISH_DEBOUNCE_SECONDS, ADVISOR_PUBLISH_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(web_dir: Path) -> str:
+    """Hash of the files an upload of web_dir would contain."""
+    ignore_file = web_dir / ".surgeignore"
+    patterns = []
+    if ignore_file.exists():
+        lines = ignore_file.read_text(encoding="utf-8").splitlines()
+        patterns = [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+    digest = hashlib.sha256()
+    for path in sorted(p for p in web_dir.rglob("*") if p.is_file()):
+        rel = path.relative_to(web_dir).as_posix()
+        if any(fnmatch.fnmatch(rel, p) or fnmatch.fnmatch(path.name, p) for p in patterns):
+            continue
+        digest.update(rel.encode() + b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class HistoryPublisher:
+    """Debounced, deduplicated background upload of the history page.
+
+    Args:
+        command: Returns the upload command line (default: advisor_history.surge_command)
+        debounce: Seconds without a new request before uploading
+        timeout: Seconds one upload attempt may take
+        max_retries: Attempts per upload
+        retry_delay: Seconds between attempts
+
+    Example:
+        publisher = HistoryPublisher()
+        publisher.request()  # returns immediately
+    """
+
+    def __init__(
+        self,
+        command: Callable[[], list[str]] | None = None,
+        debounce: float = ADVISOR_PUBLISH_DEBOUNCE_SECONDS,
+        timeout: float = ADVISOR_PUBLISH_TIMEOUT,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+    ):
+        self._command = command or advisor_history.surge_command
+        self.debounce = debounce
+        self.timeout = timeout
+        self.max_retries = max(max_retries, 1)
+        self.retry_delay = retry_delay
+        self._task: asyncio.Task | None = None
+        self._pending = 0
+        self._last_request = 0.0
+        self._published_hash: str | None = None
+        self.publishing = False
+        self.requests = 0
+        self.coalesced = 0  # requests folded into another request's upload
+        self.uploads = 0
+        self.unchanged = 0
+        self.failures = 0
+        self.last_upload: datetime | None = None
+        self.last_error: str | None = None
+
+    def request(self):
+        """Schedule an upload of the current history; never blocks."""
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        self._pending += 1
+        self._last_request = loop.time()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._worker())
+
+    async def wait_idle(self):
+        """Wait until all requested uploads have been handled."""
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def close(self):
+        """Cancel the worker (and a running upload)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            # Debounce: wait until the requests stop arriving
+            while (remaining := self._last_request + self.debounce - loop.time()) > 0:
+                await asyncio.sleep(remaining)
+            self.coalesced += self._pending - 1
+            self._pending = 0
+            self.publishing = True
+            try:
+                await self._publish()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.error(f"History publish error: {e}")
+            finally:
+                self.publishing = False
+
+    async def _publish(self):
+        web_dir = advisor_history.WEB_DIR
+
+        def prepare() -> str:
+            advisor_history.export_history()
+            return content_hash(web_dir)
+
+        digest = await asyncio.to_thread(prepare)
+        if digest == self._published_hash:
+            self.unchanged += 1
+            logger.info("History page unchanged, skip upload")
+            return
+
+        if await self._upload():
+            self._published_hash = digest
+            self.uploads += 1
+            self.last_upload = datetime.now()
+            self.last_error = None
+            logger.info(f"Published history page: {advisor_history.get_view_url()}")
+        else:
+            self.failures += 1
+
+    async def _upload(self) -> bool:
+        cmd = self._command()
+        for attempt in range(self.max_retries):
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+                )
+            except FileNotFoundError:
+                self.last_error = f"{cmd[0]} not installed"
+                logger.warning(f"Upload command {cmd[0]} not installed, skip publish")
+                return False
+
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), self.timeout)
+            except (TimeoutError, asyncio.CancelledError) as e:
+                proc.kill()
+                await proc.wait()
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                error = f"timed out after {self.timeout}s"
+            else:
+                if proc.returncode == 0:
+                    return True
+                error = stderr.decode(errors="replace").strip()[-200:] or f"exit {proc.returncode}"
+
+            self.last_error = error
+            logger.warning(
+                f"History upload failed (attempt {attempt + 1}/{self.max_retries}): {error}"
+            )
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self.retry_delay)
+        return False
+
+    def status(self) -> str:
+        """One-line summary for /advisor_status."""
+        if self.publishing:
+            state = "uploading"
+        elif self._pending:
+            state = f"{self._pending} pending"
+        else:
+            state = "idle"
+        last = self.last_upload.strftime("%Y-%m-%d %H:%M") if self.last_upload else "never"
+        text = (
+            f"{state}, last upload {last}, {self.uploads} uploaded, "
+            f"{self.coalesced} coalesced, {self.unchanged} unchanged"
+        )
+        if self.last_error:
+            text += f", last error: {self.last_error}"
+        return text
@@ -0,0 +1,277 @@
+"""
+Technical Indicators
+
+Indicators for the advisor prompt (RSI, EMA crossover, ATR, VWAP, Bollinger
+width, max drawdown), computed for all held tokens and timeframes in one batch.
+
+NumPy stacks series of equal length into one matrix and evaluates each
+indicator with array operations over all series at once. The pure Python
+definitions (_compute_one) are only the reference the NumPy path is tested
+against.
+"""
+
+import math
+from collections.abc import Callable, Hashable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+RSI_PERIOD = 14
+EMA_FAST = 9
+EMA_SLOW = 21
+ATR_PERIOD = 14
+BB_PERIOD = 20
+BB_STDDEV = 2.0
+
+
+@dataclass(frozen=True, slots=True)
+class Indicators:
+    """Indicator values for one series; None where the series is too short.
+
+    ema_cross is "up" or "down" when the fast EMA crossed the slow one on the
+    last bar. atr_pct and bb_width_pct are relative to price; max_drawdown_pct
+    is the largest peak-to-trough drop within the series.
+    """
+
+    rsi: float | None = None
+    ema_fast: float | None = None
+    ema_slow: float | None = None
+    ema_cross: str | None = None
+    atr_pct: float | None = None
+    vwap: float | None = None
+    bb_width_pct: float | None = None
+    max_drawdown_pct: float | None = None
+
+
+def _columns(candles: Any) -> tuple[list, list, list, list | None]:
+    """Highs, lows, closes (and volumes, if complete) trimmed to a common length."""
+    highs, lows, closes = candles.highs, candles.lows, candles.closes
+    n = min(len(highs), len(lows), len(closes))
+    volumes = candles.volumes if len(candles.volumes) >= n else None
+    return (
+        list(highs[:n]),
+        list(lows[:n]),
+        list(closes[:n]),
+        list(volumes[:n]) if volumes is not None else None,
+    )
+
+
+def _finite(value: Any) -> float | None:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _cross(prev_fast, prev_slow, fast, slow) -> str | None:
+    if prev_fast <= prev_slow and fast > slow:
+        return "up"
+    if prev_fast >= prev_slow and fast < slow:
+        return "down"
+    return None
+
+
+def _rsi(avg_gain, avg_loss) -> float:
+    if avg_loss > 0:
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+    return 100.0 if avg_gain > 0 else 50.0
+
+
+# Pure Python -------------------------------------------------------------------
+
+
+def _ema(values: Sequence[float], period: int) -> float:
+    alpha = 2 / (period + 1)
+    ema = values[0]
+    for value in values[1:]:
+        ema = alpha * value + (1 - alpha) * ema
+    return ema
+
+
+def _wilder(values: Sequence[float], period: int) -> float:
+    avg = sum(values[:period]) / period
+    for value in values[period:]:
+        avg = (avg * (period - 1) + value) / period
+    return avg
+
+
+def _compute_one(candles: Any) -> Indicators:
+    """Reference definition for one series (not used at runtime)."""
+    highs, lows, closes, volumes = _columns(candles)
+    n = len(closes)
+    if n < 2:
+        return Indicators()
+    last = closes[-1]
+    values: dict[str, Any] = {}
+
+    deltas = [b - a for a, b in zip(closes, closes[1:], strict=False)]
+    if len(deltas) >= RSI_PERIOD:
+        gain = _wilder([max(d, 0.0) for d in deltas], RSI_PERIOD)
+        loss = _wilder([max(-d, 0.0) for d in deltas], RSI_PERIOD)
+        values["rsi"] = _rsi(gain, loss)
+
+    if n > EMA_SLOW:
+        fast, slow = _ema(closes, EMA_FAST), _ema(closes, EMA_SLOW)
+        values["ema_fast"], values["ema_slow"] = fast, slow
+        values["ema_cross"] = _cross(
+            _ema(closes[:-1], EMA_FAST), _ema(closes[:-1], EMA_SLOW), fast, slow
+        )
+
+    true_ranges = [
+        max(h - lo, abs(h - prev), abs(lo - prev))
+        for h, lo, prev in zip(highs[1:], lows[1:], closes, strict=False)
+    ]
+    if len(true_ranges) >= ATR_PERIOD and last > 0:
+        values["atr_pct"] = _wilder(true_ranges, ATR_PERIOD) / last * 100
+
+    if volumes is not None and sum(volumes) > 0:
+        typical = [(h + lo + c) / 3 for h, lo, c in zip(highs, lows, closes, strict=True)]
+        values["vwap"] = sum(t * v for t, v in zip(typical, volumes, strict=True)) / sum(volumes)
+
+    if n >= BB_PERIOD:
+        window = closes[-BB_PERIOD:]
+        mean = sum(window) / BB_PERIOD
+        std = math.sqrt(sum((c - mean) ** 2 for c in window) / BB_PERIOD)
+        if mean > 0:
+            values["bb_width_pct"] = 2 * BB_STDDEV * std / mean * 100
+
+    peak, drawdown = closes[0], 0.0
+    for close in closes:
+        peak = max(peak, close)
+        if peak > 0:
+            drawdown = max(drawdown, (peak - close) / peak)
+    values["max_drawdown_pct"] = drawdown * 100
+
+    return Indicators(**{k: _finite(v) if isinstance(v, float) else v for k, v in values.items()})
+
+
+# NumPy ---------------------------------------------------------------------------
+
+
+def _ema_weights(length: int, period: int):
+    """Weights w with X @ w == EMA of each row of X at its last bar (seeded with the first)."""
+    decay = 1 - 2 / (period + 1)
+    weights = (1 - decay) * decay ** np.arange(length - 1, -1, -1, dtype=float)
+    weights[0] = decay ** (length - 1)
+    return weights
+
+
+def _wilder_batch(values, period: int):
+    """Wilder average of each row at its last column (SMA seed over the first period)."""
+    rest = values[:, period:]
+    decay = 1 - 1 / period
+    weights = decay ** np.arange(rest.shape[1] - 1, -1, -1, dtype=float) / period
+    return values[:, :period].mean(axis=1) * decay ** rest.shape[1] + rest @ weights
+
+
+def _compute_batch(rows: list[tuple]) -> list[Indicators]:
+    """Indicators for series of equal length (>= 2), stacked as matrices."""
+    highs = np.array([r[0] for r in rows], dtype=float)
+    lows = np.array([r[1] for r in rows], dtype=float)
+    closes = np.array([r[2] for r in rows], dtype=float)
+    n = closes.shape[1]
+    last = closes[:, -1]
+    columns: dict[str, Any] = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deltas = np.diff(closes, axis=1)
+        if deltas.shape[1] >= RSI_PERIOD:
+            gain = _wilder_batch(np.clip(deltas, 0, None), RSI_PERIOD)
+            loss = _wilder_batch(np.clip(-deltas, 0, None), RSI_PERIOD)
+            columns["rsi"] = np.where(
+                loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0)
+            )
+
+        if n > EMA_SLOW:
+            fast = closes @ _ema_weights(n, EMA_FAST)
+            slow = closes @ _ema_weights(n, EMA_SLOW)
+            prev_fast = closes[:, :-1] @ _ema_weights(n - 1, EMA_FAST)
+            prev_slow = closes[:, :-1] @ _ema_weights(n - 1, EMA_SLOW)
+            columns["ema_fast"], columns["ema_slow"] = fast, slow
+            columns["ema_cross"] = [
+                _cross(*values) for values in zip(prev_fast, prev_slow, fast, slow, strict=True)
+            ]
+
+        prev = closes[:, :-1]
+        true_range = np.maximum.reduce(
+            [highs[:, 1:] - lows[:, 1:], abs(highs[:, 1:] - prev), abs(lows[:, 1:] - prev)]
+        )
+        if true_range.shape[1] >= ATR_PERIOD:
+            atr = _wilder_batch(true_range, ATR_PERIOD) / last * 100
+            columns["atr_pct"] = np.where(last > 0, atr, np.nan)
+
+        vwap = np.full(len(rows), np.nan)
+        with_volume = [i for i, r in enumerate(rows) if r[3] is not None]
+        if with_volume:
+            volumes = np.array([rows[i][3] for i in with_volume], dtype=float)
+            typical = (highs[with_volume] + lows[with_volume] + closes[with_volume]) / 3
+            total = volumes.sum(axis=1)
+            vwap[with_volume] = np.where(total > 0, (typical * volumes).sum(axis=1) / total, np.nan)
+        columns["vwap"] = vwap
+
+        if n >= BB_PERIOD:
+            window = closes[:, -BB_PERIOD:]
+            mean = window.mean(axis=1)
+            width = 2 * BB_STDDEV * window.std(axis=1) / mean * 100
+            columns["bb_width_pct"] = np.where(mean > 0, width, np.nan)
+
+        peak = np.maximum.accumulate(closes, axis=1)
+        drawdown = np.where(peak > 0, (peak - closes) / peak, 0.0).max(axis=1)
+        columns["max_drawdown_pct"] = drawdown * 100
+
+    return [
+        Indicators(
+            **{
+                name: (value[i] if name == "ema_cross" else _finite(value[i]))
+                for name, value in columns.items()
+            }
+        )
+        for i in range(len(rows))
+    ]
+
+
+def compute[K: Hashable](series: Mapping[K, Any]) -> dict[K, Indicators]:
+    """Indicators for every series in one batch.
+
+    Args:
+        series: Candle series (objects with highs/lows/closes/volumes sequences,
+            e.g. models.Candles) keyed by e.g. (symbol, timeframe)
+
+    Returns:
+        Indicators per key
+    """
+    results: dict[K, Indicators] = {}
+    by_length: dict[int, list[tuple[K, tuple]]] = {}
+    for key, candles in series.items():
+        columns = _columns(candles)
+        if len(columns[2]) < 2:
+            results[key] = Indicators()
+        else:
+            by_length.setdefault(len(columns[2]), []).append((key, columns))
+    for group in by_length.values():
+        computed = _compute_batch([columns for _, columns in group])
+        results.update((key, ind) for (key, _), ind in zip(group, computed, strict=True))
+    return {key: results[key] for key in series}
+
+
+def describe(ind: Indicators, format_price: Callable[[float], str]) -> list[str]:
+    """Prompt lines for one series' indicators (missing values are left out)."""
+    lines = []
+    if ind.rsi is not None:
+        zone = "Overbought" if ind.rsi >= 70 else "Oversold" if ind.rsi <= 30 else "Neutral"
+        lines.append(f"RSI({RSI_PERIOD}): {ind.rsi:.1f} ({zone})")
+    if ind.ema_fast is not None and ind.ema_slow is not None:
+        side = "above" if ind.ema_fast > ind.ema_slow else "below"
+        cross = f", crossed {ind.ema_cross} on last candle" if ind.ema_cross else ""
+        lines.append(
+            f"EMA{EMA_FAST}/EMA{EMA_SLOW}: {format_price(ind.ema_fast)} / "
+            f"{format_price(ind.ema_slow)} (fast {side} slow{cross})"
+        )
+    if ind.atr_pct is not None:
+        lines.append(f"ATR({ATR_PERIOD}): {ind.atr_pct:.2f}% of price")
+    if ind.vwap is not None:
+        lines.append(f"VWAP: {format_price(ind.vwap)}")
+    if ind.bb_width_pct is not None:
+        lines.append(f"Bollinger Width ({BB_PERIOD}, {BB_STDDEV:g}σ): {ind.bb_width_pct:.2f}%")
+    if ind.max_drawdown_pct is not None:
+        lines.append(f"Max Drawdown: {ind.max_drawdown_pct:.2f}%")
+    return lines
@@ -3,10 +3,17 @@ LLM Client Module for Story 8-0
 
 Provides OpenAI-compatible API client for LLM interactions.
 Supports GLM-4, OpenAI, and other compatible endpoints.
+
+Completions can also be streamed (server-sent events), with separate
+time-to-first-token and total deadlines, and stopped early once the answer is
+complete.
 """
 
+import asyncio
+import json
 import logging
 import os
+from collections.abc import AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
 
 import aiohttp
@@ -22,6 +29,41 @@ class LLMConfig:
     base_url: str
     model: str
     timeout: int
+    first_token_timeout: int = 20
+
+
+class LLMError(Exception):
+    """Streaming request failed; str(e) is the message chat() would return."""
+
+
+def json_object_complete(text: str, key: str = "suggestions") -> bool:
+    """Whether text contains a closed top-level JSON object mentioning key.
+
+    Used to stop reading a stream as soon as the suggestions JSON is complete,
+    without waiting for trailing prose or the end of the stream.
+    """
+    depth = 0
+    start = None
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = depth > 0
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth > 0:
+            depth -= 1
+            if depth == 0 and f'"{key}"' in text[start : i + 1]:
+                return True
+    return False
 
 
 class LLMClient:
@@ -59,6 +101,7 @@ class LLMClient:
             base_url=os.getenv("LLM_BASE_URL", "https://open.bigmodel.cn/api/paas/v4"),
             model=os.getenv("LLM_MODEL", "glm-4"),
             timeout=int(os.getenv("LLM_TIMEOUT", "60")),
+            first_token_timeout=int(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", "20")),
         )
 
     async def _get_session(self) -> aiohttp.ClientSession:
@@ -93,18 +136,7 @@ class LLMClient:
             logger.error("LLM_API_KEY not configured")
             return "Error: LLM API key not configured"
 
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json",
-        }
-
-        payload = {
-            "model": self.config.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-        }
+        headers, payload = self._build_request(system_prompt, user_message)
 
         try:
             session = await self._get_session()
@@ -125,16 +157,8 @@ class LLMClient:
                     else:
                         logger.error("No choices in LLM response: %s", data)
                         return "Error: Invalid LLM response format"
-                elif resp.status == 401:
-                    logger.error("LLM API authentication failed (401)")
-                    return "Error: LLM API authentication failed"
-                elif resp.status == 429:
-                    logger.error("LLM API rate limit exceeded (429)")
-                    return "Error: LLM API rate limit exceeded"
                 else:
-                    text = await resp.text()
-                    logger.error("LLM API error (%d): %s", resp.status, text[:200])
-                    return f"Error: LLM API returned status {resp.status}"
+                    return await self._status_error(resp)
 
         except TimeoutError:
             logger.error("LLM API request timed out after %ds", self.config.timeout)
@@ -146,5 +170,146 @@ class LLMClient:
             logger.error("LLM API unexpected error: %s", e)
             return f"Error: Unexpected error - {e}"
 
+    def _build_request(
+        self, system_prompt: str, user_message: str, stream: bool = False
+    ) -> tuple[dict, dict]:
+        """Headers and JSON payload for a chat completion request."""
+        headers = {
+            "Authorization": f"Bearer {self.config.api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": self.config.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message},
+            ],
+        }
+        if stream:
+            payload["stream"] = True
+        return headers, payload
+
+    async def _status_error(self, resp: aiohttp.ClientResponse) -> str:
+        """Error message for a non-200 response."""
+        if resp.status == 401:
+            logger.error("LLM API authentication failed (401)")
+            return "Error: LLM API authentication failed"
+        if resp.status == 429:
+            logger.error("LLM API rate limit exceeded (429)")
+            return "Error: LLM API rate limit exceeded"
+        text = await resp.text()
+        logger.error("LLM API error (%d): %s", resp.status, text[:200])
+        return f"Error: LLM API returned status {resp.status}"
+
+    async def stream_chat(self, system_prompt: str, user_message: str) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive.
+
+        The first token must arrive within first_token_timeout seconds and the
+        whole completion within timeout seconds. Closing the iterator early
+        (e.g. breaking out of the loop) closes the connection.
+
+        Raises:
+            LLMError: On configuration, HTTP, network or deadline errors
+        """
+        if not self.config.api_key:
+            logger.error("LLM_API_KEY not configured")
+            raise LLMError("Error: LLM API key not configured")
+
+        headers, payload = self._build_request(system_prompt, user_message, stream=True)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.timeout
+        first_token_deadline = min(loop.time() + self.config.first_token_timeout, deadline)
+        received = False
+
+        try:
+            session = await self._get_session()
+            url = f"{self.config.base_url}/chat/completions"
+
+            async with session.post(url, headers=headers, json=payload) as resp:
+                if resp.status != 200:
+                    raise LLMError(await self._status_error(resp))
+
+                while True:
+                    # Per-read deadline: a timeout spanning the yields would fire in the consumer
+                    remaining = (deadline if received else first_token_deadline) - loop.time()
+                    if remaining <= 0:
+                        raise TimeoutError
+                    line = await asyncio.wait_for(resp.content.readline(), remaining)
+                    if not line:
+                        return
+                    line = line.decode("utf-8", errors="replace").strip()
+                    if not line.startswith("data:"):
+                        continue  # blank separators, comments, event/id fields
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        return
+                    try:
+                        choices = json.loads(data).get("choices") or [{}]
+                    except (json.JSONDecodeError, AttributeError):
+                        logger.warning("Skipping malformed LLM stream chunk: %s", data[:200])
+                        continue
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        received = True
+                        yield delta
+
+        except TimeoutError:
+            if received:
+                logger.error("LLM stream exceeded %ds total", self.config.timeout)
+                raise LLMError(
+                    f"Error: LLM request timed out after {self.config.timeout}s"
+                ) from None
+            logger.error("No LLM token within %ds", self.config.first_token_timeout)
+            raise LLMError(
+                f"Error: No response from LLM within {self.config.first_token_timeout}s"
+            ) from None
+        except aiohttp.ClientError as e:
+            logger.error("LLM API network error: %s", e)
+            raise LLMError(f"Error: Network error - {e}") from e
+
+    async def chat_streaming(
+        self,
+        system_prompt: str,
+        user_message: str,
+        on_progress: Callable[[str], Awaitable[None]] | None = None,
+        stop: Callable[[str], bool] | None = json_object_complete,
+    ) -> str:
+        """Like chat(), but streams the completion.
+
+        Args:
+            system_prompt: System message to set the AI's behavior
+            user_message: User's input message
+            on_progress: Awaited with the text received so far after each delta
+            stop: Predicate on the text so far; reading stops once it returns True
+                (default: the suggestions JSON object is complete)
+
+        Returns:
+            The assistant's response text, or error message string
+        """
+        text = ""
+        stream = self.stream_chat(system_prompt, user_message)
+        try:
+            async for delta in stream:
+                text += delta
+                if on_progress is not None:
+                    try:
+                        await on_progress(text)
+                    except Exception as e:
+                        logger.warning("LLM progress callback failed: %s", e)
+                if stop is not None and stop(text):
+                    break
+        except LLMError as e:
+            return str(e)
+        except Exception as e:
+            logger.error("LLM API unexpected error: %s", e)
+            return f"Error: Unexpected error - {e}"
+        finally:
+            await stream.aclose()
+
+        if not text:
+            logger.error("Empty content in LLM response")
+            return "Error: Empty response from LLM"
+        return text
+
     def __repr__(self) -> str:
         return f"LLMClient(model={self.config.model}, base_url={self.config.base_url})"
@@ -0,0 +1,201 @@
+"""
+LLM Job Scheduler
+
+Queues LLM completions so that periodic advisor runs and manual
+/advisor_analyze triggers do not all hit the endpoint at once:
+
+- at most max_concurrent completions run at a time
+- queued jobs start by priority lane (interactive before background, see
+  utils.rate_limiter), then in arrival order
+- a job whose key (by default a hash of the prompt; callers whose prompts
+  embed volatile text such as a timestamp pass their own input fingerprint)
+  matches one already queued or running shares its result instead of making
+  a second call; an interactive duplicate of a queued background job
+  promotes it to the interactive lane
+
+Queue depth and wait times are tracked so the limit can be sized.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from utils.rate_limiter import request_priority
+
+if TYPE_CHECKING:
+    from llm import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    __slots__ = ("key", "run", "priority", "seq", "enqueued_at", "started", "slot", "future")
+
+    def __init__(self, key: str, run: Callable[[], Awaitable[Any]], priority: int, seq: int):
+        self.key = key
+        self.run = run
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = 0.0
+        self.started = False
+        self.slot: asyncio.Future | None = None
+        self.future: asyncio.Future | None = None
+
+
+class LLMScheduler:
+    """Bounded, prioritized, deduplicating queue in front of an LLMClient.
+
+    Args:
+        llm: LLMClient the completions are sent to
+        max_concurrent: Completions allowed in flight at once
+        clock: Monotonic time function (replaceable in tests)
+
+    Example:
+        scheduler = LLMScheduler(llm, max_concurrent=1)
+        response = await scheduler.chat(system_prompt, user_message)
+    """
+
+    def __init__(
+        self,
+        llm: "LLMClient",
+        max_concurrent: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.llm = llm
+        self.max_concurrent = max(max_concurrent, 1)
+        self._clock = clock
+        self._jobs: dict[str, _Job] = {}
+        self._queue: list[tuple[int, int, _Job]] = []
+        self._seq = itertools.count()
+        self.running = 0
+        self.submitted = 0
+        self.started = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.started)
+
+    async def chat(
+        self,
+        system_prompt: str,
+        user_message: str,
+        on_progress: Callable[[str], Awaitable[None]] | None = None,
+        priority: int | None = None,
+        key: str | None = None,
+    ) -> str:
+        """Queue a completion; same contract as LLMClient.chat().
+
+        With on_progress the completion is streamed (LLMClient.chat_streaming).
+        A caller that joins a duplicate job gets no progress callbacks.
+
+        Args:
+            priority: Lane (default: the calling context's request_priority)
+            key: Dedup key (default: hash of system_prompt and user_message)
+        """
+        if key is None:
+            key = hashlib.sha256(f"{system_prompt}\0{user_message}".encode()).hexdigest()
+        if on_progress is not None:
+            return await self.submit(
+                key,
+                lambda: self.llm.chat_streaming(
+                    system_prompt, user_message, on_progress=on_progress
+                ),
+                priority,
+            )
+        return await self.submit(key, lambda: self.llm.chat(system_prompt, user_message), priority)
+
+    async def submit(
+        self, key: str, run: Callable[[], Awaitable[Any]], priority: int | None = None
+    ) -> Any:
+        """Queue run() under key, or join the queued / running job with the same key."""
+        if priority is None:
+            priority = request_priority.get()
+        self.submitted += 1
+
+        job = self._jobs.get(key)
+        if job is not None:
+            self.deduplicated += 1
+            if priority < job.priority and not job.started:
+                job.priority = priority
+                if job.slot is not None:
+                    # Re-queue in the higher lane; the stale heap entry is skipped when popped
+                    heapq.heappush(self._queue, (priority, job.seq, job))
+            logger.info("LLM job %s already queued, sharing its result", key[:8])
+        else:
+            job = _Job(key, run, priority, next(self._seq))
+            job.enqueued_at = self._clock()
+            self._jobs[key] = job
+            # Runs detached from the caller, so a cancelled caller does not cancel a shared job
+            job.future = asyncio.ensure_future(self._run(job))
+        return await asyncio.shield(job.future)
+
+    async def _acquire(self, job: _Job):
+        """Wait until the job is handed a concurrency slot."""
+        job.slot = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (job.priority, job.seq, job))
+        self._start_next()
+        waiting = {j.seq for _, _, j in self._queue if not j.slot.done()}
+        self.max_depth = max(self.max_depth, len(waiting))
+        try:
+            await job.slot
+        except asyncio.CancelledError:
+            if job.slot.done() and not job.slot.cancelled():
+                self.running -= 1  # slot was handed over just before the cancellation
+            raise
+
+    async def _run(self, job: _Job) -> Any:
+        try:
+            await self._acquire(job)
+            job.started = True
+            self.started += 1
+            waited = self._clock() - job.enqueued_at
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            try:
+                return await job.run()
+            finally:
+                self.running -= 1
+                self.completed += 1
+        finally:
+            self._jobs.pop(job.key, None)
+            self._start_next()
+
+    def _start_next(self):
+        while self.running < self.max_concurrent and self._queue:
+            _, _, job = heapq.heappop(self._queue)
+            if job.slot.done():
+                continue  # stale entry of a promoted or cancelled job
+            self.running += 1
+            job.slot.set_result(None)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue statistics for sizing max_concurrent."""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_depth": self.max_depth,
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "avg_wait": self.total_wait / self.started if self.started else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+    def status(self) -> str:
+        """One-line summary for /advisor_status."""
+        s = self.stats()
+        return (
+            f"{s['running']}/{s['max_concurrent']} running, {s['queue_depth']} queued "
+            f"(peak {s['max_depth']}), wait avg {s['avg_wait']:.1f}s / max {s['max_wait']:.1f}s, "
+            f"{s['deduplicated']} deduplicated"
+        )
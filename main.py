@@ -78,7 +78,7 @@ def get_contract():
     """获取或创建合约实例。"""
     global _contract_instance
     if _contract_instance is None:
-        _contract_instance = VaultContract()
+        _contract_instance = VaultContract(on_transaction=api.invalidate_vault_data)
     return _contract_instance
 
 
@@ -146,6 +146,8 @@ async def post_init(app: Application):
     ]
     await app.bot.set_my_commands(commands)
     logger.info("Commands menu set")
+    await api.open()
+    api.token_index.warm_up()
     global \
         _notifier_instance, \
         _monitor_instance, \
@@ -200,6 +202,12 @@ async def post_init(app: Application):
     logger.info("Polling health monitor started")
 
 
+async def post_shutdown(app: Application):
+    """应用关闭时释放共享 HTTP 连接池。"""
+    await api.close()
+    logger.info("Terminal API session closed")
+
+
 async def _on_new_activity(activity: dict):
     """ActivityMonitor 回调 - 发送 TG 通知。"""
     if _notifier_instance:
@@ -231,13 +239,21 @@ def create_app():
             Application.builder()
             .token(TELEGRAM_BOT_TOKEN)
             .post_init(post_init)
+            .post_shutdown(post_shutdown)
             .request(request)
             .build()
         )
         logger.info(f"Using proxy: {proxy_url}")
     else:
         request = HTTPXRequest(**request_kwargs)
-        app = Application.builder().token(TELEGRAM_BOT_TOKEN).post_init(post_init).request(request).build()
+        app = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .post_init(post_init)
+            .post_shutdown(post_shutdown)
+            .request(request)
+            .build()
+        )
         logger.info("Using HTTPXRequest with extended timeouts (read=30s, connect=15s, pool=30s)")
     register_handlers(app)
 
@@ -265,6 +281,7 @@ def main():
             except RuntimeError:
                 pass
             asyncio.set_event_loop(asyncio.new_event_loop())
+            api.discard_session()  # 旧 session 绑定在已关闭的事件循环上
             app = create_app()
             logger.info(f"Bot starting... (attempt {retry_count + 1})")
             app.run_polling(allowed_updates=Update.ALL_TYPES)
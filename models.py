@@ -0,0 +1,216 @@
+"""
+Response Models
+
+Typed, compact views over the hot Terminal API payloads (positions, activity,
+swaps, strategies, candles). Each payload is decoded once into `__slots__`
+objects with pre-parsed numerics, so consumers no longer repeat `.get()`
+fallback chains and `float(str)` conversions.
+
+Parsed models are memoized on TerminalAPI response objects (ApiDict/ApiList),
+so every consumer of a cached response shares one decoded model. Plain dicts
+(e.g. in tests) are parsed on each call.
+"""
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+def to_float(value: Any, default: float | None = 0.0) -> float | None:
+    """Parse an API numeric (often a decimal string) to float.
+
+    Missing values (None) map to default; unparseable values map to None.
+    """
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _first(data: dict, keys: Iterable[str], default: Any = None) -> Any:
+    """First present (non-None) value among keys."""
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return default
+
+
+def _floats(values: Iterable[Any]) -> tuple[float, ...]:
+    """Parse a numeric column; missing or invalid cells become 0.0."""
+    return tuple(to_float(v) or 0.0 for v in values)
+
+
+def _memoized[T](data: Any, parse: Callable[[Any], T]) -> T:
+    """Parse data once and cache the model on TerminalAPI response objects."""
+    cached = getattr(data, "model", None)
+    if cached is not None and cached[0] is parse:
+        return cached[1]
+    model = parse(data)
+    try:
+        data.model = (parse, model)
+    except AttributeError:
+        pass  # plain dict/list
+    return model
+
+
+class Position:
+    """A held token position."""
+
+    __slots__ = (
+        "symbol",
+        "token_address",
+        "value_usd",
+        "total_pnl_usd",
+        "total_pnl_percent",
+        "realized_pnl_usd",
+        "unrealized_pnl_usd",
+    )
+
+    def __init__(self, data: dict):
+        # API uses tokenSymbol/currentValueUsd; older fixtures use symbol/valueUsd/balance
+        self.symbol: str = _first(data, ("tokenSymbol", "symbol"), "?")
+        self.token_address: str | None = data.get("tokenAddress")
+        self.value_usd = to_float(_first(data, ("currentValueUsd", "valueUsd", "value", "balance")))
+        self.total_pnl_usd = to_float(data.get("totalPnlUsd"))
+        self.total_pnl_percent = to_float(data.get("totalPnlPercent"))
+        self.realized_pnl_usd = to_float(data.get("realizedPnlUsd"))
+        self.unrealized_pnl_usd = to_float(_first(data, ("unrealizedPnlUsd", "pnlUsd")))
+
+
+class PositionsSnapshot:
+    """Vault balance, overall PnL and held positions from /positions."""
+
+    __slots__ = (
+        "eth_balance_wei",
+        "overall_value_usd",
+        "overall_pnl_usd",
+        "overall_pnl_percent",
+        "overall_pnl_eth_wei",
+        "positions",
+    )
+
+    def __init__(self, data: dict):
+        self.eth_balance_wei = to_float(data.get("ethBalance"))
+        self.overall_value_usd = to_float(data.get("overallValueUsd"))
+        self.overall_pnl_usd = to_float(_first(data, ("overallPnlUsd", "totalPnlUsd")))
+        self.overall_pnl_percent = to_float(data.get("overallPnlPercent"))
+        self.overall_pnl_eth_wei = to_float(data.get("overallPnlEth"))
+        items = _first(data, ("positions", "tokens"), [])
+        self.positions: tuple[Position, ...] = (
+            tuple(Position(p) for p in items if isinstance(p, dict))
+            if isinstance(items, list)
+            else ()
+        )
+
+
+class Swap:
+    """A swap, either from /swaps or embedded in an activity."""
+
+    __slots__ = ("side", "token_symbol", "eth_amount_wei", "price_usd", "token_amount", "timestamp")
+
+    def __init__(self, data: dict):
+        self.side: str = str(data.get("side", "?")).upper()
+        self.token_symbol: str = data.get("tokenSymbol", "?")
+        self.eth_amount_wei = to_float(data.get("ethAmount"))
+        self.price_usd = to_float(
+            data.get("effectivePriceUsd") or data.get("priceUsd") or data.get("avgPriceUsd")
+        )
+        # Kept raw: formatted with token decimals by the notifier
+        self.token_amount: str | None = data.get("tokenAmount") or data.get("quantity")
+        self.timestamp = data.get("timestamp")
+
+
+class Activity:
+    """One /activity item (swap, deposit, withdrawal or vault summary)."""
+
+    __slots__ = ("id", "cursor", "type", "timestamp", "swap", "amount_wei")
+
+    def __init__(self, data: dict):
+        self.id = data.get("id")
+        self.cursor = data.get("cursor")
+        self.type: str = data.get("type", "unknown")
+        self.timestamp = data.get("timestamp")
+        self.swap: Swap | None = Swap(data.get("swap") or {}) if self.type == "swap" else None
+        transfer = data.get(self.type) if self.type in ("deposit", "withdrawal") else None
+        self.amount_wei = to_float((transfer or {}).get("amountWei"))
+
+
+class Strategy:
+    """An active vault strategy."""
+
+    __slots__ = ("id", "content", "priority", "expiry", "active")
+
+    def __init__(self, data: dict):
+        self.id = _first(data, ("strategyId", "id"), "?")
+        self.content: str = data.get("content", "")
+        self.priority = _first(data, ("strategyPriority", "priority"))
+        self.expiry = int(to_float(data.get("expiry")) or 0)
+        self.active: bool = bool(data.get("active", True))
+
+    def is_live(self, now: float) -> bool:
+        """Not expired (expiry 0 means no expiry)."""
+        return self.expiry == 0 or self.expiry > now
+
+
+class Candles:
+    """Candlestick series from a UDF /candles response, as float columns."""
+
+    __slots__ = ("times", "opens", "highs", "lows", "closes", "volumes")
+
+    def __init__(self, data: dict):
+        self.times = tuple(int(to_float(t) or 0) for t in data.get("t", []))
+        self.opens = _floats(data.get("o", []))
+        self.highs = _floats(data.get("h", []))
+        self.lows = _floats(data.get("l", []))
+        self.closes = _floats(data.get("c", []))
+        self.volumes = _floats(data.get("v", []))
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+
+def _items(data: Any, *keys: str) -> list:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return _first(data, keys, [])
+    return []
+
+
+def _parse_activities(data: Any) -> tuple[Activity, ...]:
+    return tuple(Activity(a) for a in _items(data, "items", "activities") if isinstance(a, dict))
+
+
+def _parse_swaps(data: Any) -> tuple[Swap, ...]:
+    return tuple(Swap(s) for s in _items(data, "items") if isinstance(s, dict))
+
+
+def _parse_strategies(data: Any) -> tuple[Strategy, ...]:
+    return tuple(Strategy(s) for s in _items(data, "strategies", "items") if isinstance(s, dict))
+
+
+def positions_snapshot(data: dict) -> PositionsSnapshot:
+    """Decode a /positions response."""
+    return _memoized(data, PositionsSnapshot)
+
+
+def activities(data: Any) -> tuple[Activity, ...]:
+    """Decode an /activity response."""
+    return _memoized(data, _parse_activities)
+
+
+def swaps(data: Any) -> tuple[Swap, ...]:
+    """Decode a /swaps response."""
+    return _memoized(data, _parse_swaps)
+
+
+def strategies(data: Any) -> tuple[Strategy, ...]:
+    """Decode a /strategies response (list, or dict with strategies/items)."""
+    return _memoized(data, _parse_strategies)
+
+
+def candles(data: dict) -> Candles:
+    """Decode a UDF /candles response."""
+    return _memoized(data, Candles)
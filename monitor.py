@@ -2,18 +2,70 @@
 Activity Monitor Service for Story 4-1
 
 Monitors Agent trading activity and triggers callbacks for new activities.
+
+Dedup state (high-water-mark cursor + a bounded ring of recent IDs) is
+persisted to disk so restarts resume where they left off.
 """
 
 import asyncio
+import json
 import logging
 import os
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, MutableSet
+from pathlib import Path
 from typing import Any
 
 from api import TerminalAPI
+from utils.json_file import write_json_atomic
+from utils.rate_limiter import use_background_priority
 
 logger = logging.getLogger(__name__)
 
+MONITOR_STATE_FILE = Path(os.getenv("MONITOR_STATE_FILE", "data/monitor_state.json"))
+RECENT_IDS_SIZE = 500
+
+
+class RecentIds(MutableSet):
+    """有界的已处理 ID 集合：只保留最近 maxlen 个，超出后淘汰最早加入的。
+
+    去重主要依赖高水位 cursor，这里只兜底最近一段时间内乱序或重复返回的活动，
+    所以内存占用恒定，不随运行时间增长。
+
+    Args:
+        ids: 初始 ID（按从旧到新的顺序）
+        maxlen: 最多保留的 ID 数
+    """
+
+    def __init__(self, ids: Iterable[str] = (), maxlen: int = RECENT_IDS_SIZE):
+        self._order: deque[str] = deque()
+        self._ids: set[str] = set()
+        self.maxlen = maxlen
+        for activity_id in ids:
+            self.add(activity_id)
+
+    def __contains__(self, activity_id: object) -> bool:
+        return activity_id in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, activity_id: str):
+        if activity_id in self._ids:
+            return
+        self._order.append(activity_id)
+        self._ids.add(activity_id)
+        if len(self._order) > self.maxlen:
+            self._ids.discard(self._order.popleft())
+
+    def discard(self, activity_id: str):
+        if activity_id in self._ids:
+            self._ids.discard(activity_id)
+            self._order.remove(activity_id)
+
 
 class ActivityMonitor:
     """监控 Agent 活动并触发回调处理新活动。
@@ -33,19 +85,37 @@ class ActivityMonitor:
         await monitor.start()
     """
 
-    def __init__(self, api: TerminalAPI, callback: Callable[[dict[str, Any]], Any]):
+    def __init__(
+        self,
+        api: TerminalAPI,
+        callback: Callable[[dict[str, Any]], Any],
+        state_path: Path | None = None,
+    ):
         """初始化活动监控器。
 
         Args:
             api: TerminalAPI 实例
             callback: 新活动回调函数 (async function)
+            state_path: 去重状态文件，默认 MONITOR_STATE_FILE
         """
         self.api = api
         self.callback = callback
-        self.seen_ids: set[str] = set()
+        self.state_path = state_path or MONITOR_STATE_FILE
+        self.seen_ids = RecentIds()
         self.poll_interval = self._get_poll_interval()
+        # 自适应轮询：有新 swap 时收紧到 min_interval，空闲时按 BACKOFF_FACTOR 放宽到 max_interval
+        self.min_interval = self._get_interval_bound("POLL_INTERVAL_MIN", 10)
+        self.max_interval = max(
+            self._get_interval_bound("POLL_INTERVAL_MAX", 300), self.min_interval
+        )
+        self.current_interval: float = self.poll_interval
+        self.quiet_polls = 0
         self.running: bool = False
         self._task: asyncio.Task | None = None
+        # 上一次处理的活动列表版本（TerminalAPI 响应的 version），未变化时跳过过滤
+        self._last_version: int | None = None
+        # 高水位：已处理过的最新活动的 cursor，翻页追赶时以它为终点
+        self._last_cursor: str | None = None
 
     def _get_poll_interval(self) -> int:
         """从环境变量获取轮询间隔，默认 30 秒。
@@ -60,9 +130,54 @@ class ActivityMonitor:
             interval = 30
         return max(interval, 10)  # 最小 10 秒
 
+    def _get_interval_bound(self, name: str, default: int) -> int:
+        """从环境变量获取自适应轮询的上下限（秒），最小 5 秒。"""
+        try:
+            return max(int(os.getenv(name, str(default))), 5)
+        except ValueError:
+            logger.warning(f"Invalid {name} value, using default {default}s")
+            return default
+
+    # 每次空闲轮询后间隔放大的倍数
+    BACKOFF_FACTOR = 1.5
+
+    def _update_cadence(self, new_swaps: bool):
+        """根据本次轮询结果调整下一次轮询间隔。
+
+        Args:
+            new_swaps: 本次轮询是否发现了新 swap
+        """
+        if new_swaps:
+            self.quiet_polls = 0
+            self.current_interval = min(self.min_interval, self.poll_interval)
+        else:
+            self.quiet_polls += 1
+            self.current_interval = min(
+                self.current_interval * self.BACKOFF_FACTOR, self.max_interval
+            )
+
+    def cadence_status(self) -> str:
+        """当前轮询节奏的描述（用于 /monitor_status）。"""
+        return (
+            f"{self.current_interval:.0f}s "
+            f"(range {min(self.min_interval, self.poll_interval)}-{self.max_interval}s, "
+            f"quiet polls: {self.quiet_polls})"
+        )
+
     # Activity types that should trigger notifications
     NOTIFY_TYPES = {"swap", "deposit", "withdrawal", "vault_summary"}
 
+    # 每次轮询先取一页；没有碰到高水位时说明两次轮询间活动超过一页，
+    # 进入追赶模式用更大的页继续向前翻，最多翻 MAX_CATCHUP_PAGES 页
+    PAGE_SIZE = 10
+    CATCHUP_PAGE_SIZE = 50
+    MAX_CATCHUP_PAGES = 20
+
+    @staticmethod
+    def _activity_key(activity: dict[str, Any]) -> str | None:
+        # API 返回 cursor 作为唯一标识
+        return activity.get("cursor") or activity.get("id")
+
     def _filter_new(self, activities: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """过滤出新活动。
 
@@ -77,13 +192,47 @@ class ActivityMonitor:
             # Skip activity types that don't need notifications
             if activity.get("type") not in self.NOTIFY_TYPES:
                 continue
-            # API 返回 cursor 作为唯一标识
-            activity_id = activity.get("cursor") or activity.get("id")
+            activity_id = self._activity_key(activity)
             if activity_id and activity_id not in self.seen_ids:
                 new_items.append(activity)
                 self.seen_ids.add(activity_id)
         return new_items
 
+    def _load_state(self) -> bool:
+        """加载上次运行保存的去重状态。
+
+        Returns:
+            True 表示已恢复高水位，可以跳过预加载
+        """
+        if not self.state_path.exists():
+            return False
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                data = json.load(f)
+            last_cursor = data.get("last_cursor")
+            recent_ids = [str(i) for i in data.get("recent_ids", [])]
+        except (OSError, json.JSONDecodeError, AttributeError, TypeError) as e:
+            logger.warning(f"Failed to load monitor state: {e}")
+            return False
+        if not last_cursor or data.get("vault") != self.api.vault:
+            return False
+        self._last_cursor = last_cursor
+        self.seen_ids = RecentIds(recent_ids)
+        logger.info(f"Resumed activity monitor from cursor {last_cursor}")
+        return True
+
+    def _save_state(self):
+        """原子地保存去重状态（先写临时文件再重命名）。"""
+        payload = {
+            "vault": self.api.vault,
+            "last_cursor": self._last_cursor,
+            "recent_ids": list(self.seen_ids),
+        }
+        try:
+            write_json_atomic(self.state_path, payload)
+        except OSError as e:
+            logger.warning(f"Failed to save monitor state: {e}")
+
     async def _preload_existing_activities(self):
         """预加载已存在的活动 ID，避免启动时发送历史通知。
 
@@ -94,13 +243,66 @@ class ActivityMonitor:
             if "error" not in result:
                 activities = result.get("items", result.get("activities", []))
                 for activity in activities:
-                    activity_id = activity.get("cursor") or activity.get("id")
+                    activity_id = self._activity_key(activity)
                     if activity_id:
                         self.seen_ids.add(activity_id)
+                if activities:
+                    self._last_cursor = self._activity_key(activities[0])
+                    self._save_state()
                 logger.info(f"Preloaded {len(self.seen_ids)} existing activity IDs")
         except Exception as e:
             logger.warning(f"Failed to preload activities: {e}")
 
+    def _reached_mark(self, activity: dict[str, Any]) -> bool:
+        activity_id = self._activity_key(activity)
+        return activity_id is not None and (
+            activity_id == self._last_cursor or activity_id in self.seen_ids
+        )
+
+    async def _collect_since_mark(self, first_page: dict) -> list[dict[str, Any]] | None:
+        """从最新一页开始向前翻页，直到碰到高水位（已处理过的活动）。
+
+        Args:
+            first_page: 本次轮询已取到的第一页
+
+        Returns:
+            高水位之后的全部活动（按时间倒序）；翻页失败时返回 None，
+            本次轮询作废，下次从同一高水位重新追赶，避免漏掉中间的活动
+        """
+        collected: list[dict[str, Any]] = []
+        page, limit = first_page, self.PAGE_SIZE
+        for pages in range(1, self.MAX_CATCHUP_PAGES + 1):
+            items = page.get("items", page.get("activities", []))
+            for activity in items:
+                if self._reached_mark(activity):
+                    return collected
+                collected.append(activity)
+
+            # 首次启动（没有高水位）或已翻到最早的活动
+            if self._last_cursor is None and not self.seen_ids:
+                return collected
+            if len(items) < limit:
+                return collected
+            cursor = page.get("nextCursor") or (items[-1].get("cursor") if items else None)
+            if not cursor:
+                return collected
+            if pages == self.MAX_CATCHUP_PAGES:
+                break
+
+            if pages == 1:
+                logger.info("Activity backlog exceeds one page, catching up")
+            limit = self.CATCHUP_PAGE_SIZE
+            page = await self.api.get_activity(limit, cursor=cursor)
+            if "error" in page:
+                logger.error(f"Failed to fetch activity page: {page['error']}")
+                return None
+
+        logger.warning(
+            f"Activity catch-up stopped after {self.MAX_CATCHUP_PAGES} pages, "
+            "older activities will not be notified"
+        )
+        return collected
+
     async def start(self):
         """启动监控循环。
 
@@ -108,28 +310,38 @@ class ActivityMonitor:
         建议在后台任务中运行: asyncio.create_task(monitor.start())
         """
         self.running = True
-        logger.info(f"Activity monitor started (interval: {self.poll_interval}s)")
+        use_background_priority()
+        self.current_interval = self.poll_interval
+        logger.info(
+            f"Activity monitor started (interval: {self.poll_interval}s, "
+            f"adaptive {self.min_interval}-{self.max_interval}s)"
+        )
 
-        # 预加载已存在的活动，避免启动时发送历史通知
-        await self._preload_existing_activities()
+        # 恢复上次的去重状态；没有时预加载已存在的活动，避免启动时发送历史通知
+        if not self._load_state():
+            await self._preload_existing_activities()
 
         while self.running:
             try:
                 # 获取活动
-                result = await self.api.get_activity(10)
+                result = await self.api.get_activity(self.PAGE_SIZE)
 
+                version = getattr(result, "version", None)
                 if "error" in result:
                     logger.error(f"Failed to fetch activity: {result['error']}")
-                else:
-                    # API 返回 items 而不是 activities
-                    activities = result.get("items", result.get("activities", []))
+                elif version is not None and version == self._last_version:
+                    logger.debug("Activity feed unchanged since last poll")
+                    self._update_cadence(new_swaps=False)
+                elif (activities := await self._collect_since_mark(result)) is not None:
+                    self._last_version = version
                     if activities:
+                        self._last_cursor = self._activity_key(activities[0])
                         logger.debug(
-                            f"Fetched {len(activities)} activities, latest: {activities[0].get('cursor', 'unknown')}"
+                            f"Fetched {len(activities)} activities, latest: {self._last_cursor}"
                         )
 
-                    # 过滤新活动
-                    new_items = self._filter_new(activities)
+                    # 过滤新活动，按时间顺序通知
+                    new_items = self._filter_new(list(reversed(activities)))
 
                     if new_items:
                         logger.info(f"Found {len(new_items)} new activities to notify")
@@ -141,11 +353,16 @@ class ActivityMonitor:
                         except Exception as e:
                             logger.error(f"Callback error for activity {item.get('cursor')}: {e}")
 
+                    # 回调完成后再落盘，进程在中途退出时重启会重新通知而不是漏掉
+                    if activities:
+                        self._save_state()
+                    self._update_cadence(any(item.get("type") == "swap" for item in new_items))
+
             except Exception as e:
                 logger.error(f"Monitor loop error: {e}")
 
-            # 等待下一次轮询
-            await asyncio.sleep(self.poll_interval)
+            # 等待下一次轮询（请求失败时保持当前间隔）
+            await asyncio.sleep(self.current_interval)
 
         logger.info("Activity monitor stopped")
 
@@ -11,6 +11,7 @@ from typing import Any
 from telegram import Bot
 
 from config import ADMIN_USERS, ALLOWED_USERS, CHAIN_ID, NOTIFY_USERS
+from models import Activity
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,7 @@ def format_eth(wei: str) -> str:
         Formatted ETH string (6 decimal places)
     """
     try:
-        return f"{float(wei) / 1e18:.6f}"
+        return f"{float(0 if wei is None else wei) / 1e18:.6f}"
     except (ValueError, TypeError):
         return wei
 
@@ -47,7 +48,7 @@ def format_usd(value: str | float) -> str:
         Formatted USD string (with appropriate decimal places)
     """
     try:
-        num = float(value)
+        num = float(0 if value is None else value)
         # For very small values, use more decimal places or scientific notation
         if num == 0:
             return "$0.00"
@@ -147,7 +148,8 @@ def format_activity_message(activity: dict[str, Any]) -> str:
     Returns:
         Formatted Telegram message string
     """
-    activity_type = activity.get("type", "unknown")
+    parsed = Activity(activity)
+    activity_type = parsed.type
     timestamp = format_timestamp(activity.get("timestamp", ""))
     activity_id = activity.get("id", "")
 
@@ -157,26 +159,17 @@ def format_activity_message(activity: dict[str, Any]) -> str:
         f"Time: {timestamp}",
     ]
 
-    if activity_type == "swap":
-        swap = activity.get("swap", {})
-        side = swap.get("side", "?").upper()
-        token = swap.get("tokenSymbol", "?")
-        eth_amt = format_eth(swap.get("ethAmount", "0"))
-
-        # Try multiple price fields: effectivePriceUsd, priceUsd, avgPriceUsd
-        price_val = (
-            swap.get("effectivePriceUsd") or swap.get("priceUsd") or swap.get("avgPriceUsd") or "0"
-        )
-        price = format_usd(price_val)
-
-        # Try to get token quantity if available
-        token_qty_raw = swap.get("tokenAmount") or swap.get("quantity")
-        token_qty = format_token_amount(token_qty_raw) if token_qty_raw else None
+    if parsed.swap is not None:
+        swap = parsed.swap
+        eth_amt = format_eth(swap.eth_amount_wei)
+        # Price falls back through effectivePriceUsd, priceUsd, avgPriceUsd
+        price = format_usd(swap.price_usd)
+        token_qty = format_token_amount(swap.token_amount) if swap.token_amount else None
 
         lines.extend(
             [
-                f"Side: {side}",
-                f"Token: {token}",
+                f"Side: {swap.side}",
+                f"Token: {swap.token_symbol}",
                 f"ETH Amount: {eth_amt} ETH",
             ]
         )
@@ -187,15 +180,8 @@ def format_activity_message(activity: dict[str, Any]) -> str:
 
         lines.append(f"Price: {price}")
 
-    elif activity_type == "deposit":
-        deposit = activity.get("deposit", {})
-        amt = format_eth(deposit.get("amountWei", "0"))
-        lines.append(f"Amount: {amt} ETH")
-
-    elif activity_type == "withdrawal":
-        withdrawal = activity.get("withdrawal", {})
-        amt = format_eth(withdrawal.get("amountWei", "0"))
-        lines.append(f"Amount: {amt} ETH")
+    elif activity_type in ("deposit", "withdrawal"):
+        lines.append(f"Amount: {format_eth(parsed.amount_wei)} ETH")
 
     elif activity_type == "vault_summary":
         vault_summary = activity.get("vaultSummary", {})
@@ -11,7 +11,10 @@ from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from api import TerminalAPI
+from models import positions_snapshot, strategies
 from notifier import TelegramNotifier, format_eth, format_usd
+from snapshot_hub import latest_snapshot
+from utils.rate_limiter import use_background_priority
 
 logger = logging.getLogger(__name__)
 
@@ -81,16 +84,17 @@ class DailyReporter:
             Dictionary containing balance, pnl, positions, and strategies data
         """
         data = {}
+        snapshot = await latest_snapshot(self.api)
 
         # Get positions (includes balance info)
-        positions = await self.api.get_positions()
+        positions = snapshot.positions
         if isinstance(positions, dict) and "error" in positions:
             logger.warning(f"Failed to get positions: {positions.get('error')}")
         else:
             data["positions"] = positions
 
         # Get strategies
-        strategies = await self.api.get_strategies()
+        strategies = snapshot.strategies
         if isinstance(strategies, dict) and "error" in strategies:
             logger.warning(f"Failed to get strategies: {strategies.get('error')}")
         elif isinstance(strategies, list):
@@ -113,33 +117,21 @@ class DailyReporter:
         lines = [f"Daily Report - {today}\n"]
 
         # Balance section (from positions data)
-        positions_data = data.get("positions", {})
-        eth_balance = positions_data.get("ethBalance", "0")
-        usd_value = positions_data.get("overallValueUsd", "0")
-        lines.append(f"Available: {format_eth(eth_balance)} ETH")
-        lines.append(f"Total Value: {format_usd(usd_value)}")
+        snapshot = positions_snapshot(data.get("positions", {}))
+        lines.append(f"Available: {format_eth(snapshot.eth_balance_wei)} ETH")
+        lines.append(f"Total Value: {format_usd(snapshot.overall_value_usd)}")
 
         # PnL section (from positions data)
-        pnl_usd = positions_data.get("overallPnlUsd", "0")
-        pnl_pct = positions_data.get("overallPnlPercent", "0")
-        try:
-            pnl_num = float(pnl_usd)
-            sign = "+" if pnl_num >= 0 else ""
-        except (ValueError, TypeError):
-            sign = ""
-        lines.append(f"24h PnL: {sign}{format_usd(pnl_usd)} ({sign}{pnl_pct}%)")
+        pnl_usd = snapshot.overall_pnl_usd
+        pnl_pct = snapshot.overall_pnl_percent or 0.0
+        sign = "+" if pnl_usd is not None and pnl_usd >= 0 else ""
+        lines.append(f"24h PnL: {sign}{format_usd(pnl_usd)} ({sign}{pnl_pct:.2f}%)")
 
         # Positions section
-        pos_items = positions_data.get("positions", [])
-        lines.append(f"Positions: {len(pos_items)}")
+        lines.append(f"Positions: {len(snapshot.positions)}")
 
         # Strategies section
-        strategies = data.get("strategies", [])
-        if isinstance(strategies, dict):
-            strat_items = strategies.get("strategies", strategies.get("items", []))
-        else:
-            strat_items = strategies
-        active_count = sum(1 for s in strat_items if s.get("active", True))
+        active_count = sum(1 for s in strategies(data.get("strategies", [])) if s.active)
         lines.append(f"Active Strategies: {active_count}")
 
         return "\n".join(lines)
@@ -171,6 +163,7 @@ class DailyReporter:
             return
 
         self.running = True
+        use_background_priority()
         logger.info(
             f"Daily reporter started (scheduled for {self.report_time[0]:02d}:{self.report_time[1]:02d} UTC)"
         )
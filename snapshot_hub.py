@@ -0,0 +1,169 @@
+"""
+Vault Snapshot Hub
+
+Fetches the vault state shared by the background services and query commands
+(positions, strategies, vault settings, ETH price) once per tick and publishes
+it as an immutable snapshot. Consumers that ask within the same tick share the
+snapshot instead of each polling the API on their own timer, and all of them
+see one consistent view of the vault.
+
+Refreshes are single-flight: concurrent callers that find the snapshot expired
+wait for the same refresh. A refresh fetches all four sections; consumers that
+need only one (e.g. /price) use section() / latest_section(), which read the
+current snapshot while it is fresh and otherwise fetch just that endpoint.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from api import TerminalAPI
+
+logger = logging.getLogger(__name__)
+
+# Deadline for each section's request; a slow section does not hold up the others
+SECTION_TIMEOUT = 15.0
+
+# Snapshot section -> TerminalAPI method
+SECTIONS = {
+    "positions": "get_positions",
+    "strategies": "get_strategies",
+    "vault": "get_vault",
+    "eth_price": "get_eth_price",
+}
+
+
+def _describe(error: Exception) -> str:
+    return "timed out" if isinstance(error, TimeoutError) else str(error)
+
+
+@dataclass(frozen=True, slots=True)
+class VaultSnapshot:
+    """Vault state captured in one tick.
+
+    Each section holds the TerminalAPI response, or an {"error": ...} dict if
+    the request raised or timed out. Every failed section, including one whose
+    response was an {"error": ...} dict, is listed in errors.
+    """
+
+    positions: Any
+    strategies: Any
+    vault: Any
+    eth_price: Any
+    tick: int = 0
+    taken_at: float = 0.0
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+class SnapshotHub:
+    """Publishes a VaultSnapshot refreshed at most once per interval.
+
+    Args:
+        api: TerminalAPI instance the sections are fetched from
+        interval: Seconds a snapshot is served before the next tick refreshes it
+        timeout: Deadline per section request (default: SECTION_TIMEOUT)
+        clock: Monotonic time function (replaceable in tests)
+
+    Example:
+        hub = SnapshotHub(api, interval=15)
+        snapshot = await hub.get()
+        positions = snapshot.positions
+    """
+
+    def __init__(
+        self,
+        api: "TerminalAPI",
+        interval: float = 15.0,
+        timeout: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.api = api
+        self.interval = interval
+        self.timeout = SECTION_TIMEOUT if timeout is None else timeout
+        self._clock = clock
+        self.latest: VaultSnapshot | None = None
+        self.ticks = 0
+        self._refreshing: asyncio.Future | None = None
+        self._generation = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.latest is not None and self._clock() - self.latest.taken_at < self.interval
+
+    async def get(self) -> VaultSnapshot:
+        """Return the current snapshot, refreshing it first if the tick has passed."""
+        if self.is_fresh:
+            return self.latest
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh(self._generation))
+            self._refreshing.add_done_callback(self._refresh_done)
+        # shield: a cancelled consumer must not cancel the refresh others wait on
+        return await asyncio.shield(self._refreshing)
+
+    async def section(self, name: str) -> Any:
+        """One section of the vault state, without refreshing the others.
+
+        Served from the current snapshot while it is fresh; otherwise only the
+        section's endpoint is fetched (through the TerminalAPI response cache)
+        and no snapshot is published.
+        """
+        if self.is_fresh:
+            return getattr(self.latest, name)
+        try:
+            return await self._fetch(SECTIONS[name])
+        except Exception as e:
+            logger.warning(f"Snapshot section {name} failed: {_describe(e)}")
+            return {"error": _describe(e)}
+
+    def reset(self):
+        """Drop the current snapshot and forget a running refresh.
+
+        The next get() fetches a new snapshot; a refresh started before the
+        reset does not publish its (older) result.
+        """
+        self._generation += 1
+        self.latest = None
+        self._refreshing = None
+
+    def _refresh_done(self, future: asyncio.Future):
+        if self._refreshing is future:
+            self._refreshing = None
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Snapshot refresh failed: {future.exception()}")
+
+    async def _fetch(self, method: str) -> Any:
+        return await asyncio.wait_for(getattr(self.api, method)(), self.timeout)
+
+    async def _refresh(self, generation: int) -> VaultSnapshot:
+        results = await asyncio.gather(
+            *(self._fetch(method) for method in SECTIONS.values()), return_exceptions=True
+        )
+        sections: dict[str, Any] = {}
+        errors: dict[str, str] = {}
+        for name, result in zip(SECTIONS, results, strict=True):
+            if isinstance(result, Exception):
+                result = {"error": _describe(result)}
+            if isinstance(result, dict) and "error" in result:
+                logger.warning(f"Snapshot section {name} failed: {result['error']}")
+                errors[name] = str(result["error"])
+            sections[name] = result
+
+        self.ticks += 1
+        snapshot = VaultSnapshot(**sections, tick=self.ticks, taken_at=self._clock(), errors=errors)
+        if generation == self._generation:
+            self.latest = snapshot
+        return snapshot
+
+
+async def latest_snapshot(api: "TerminalAPI") -> VaultSnapshot:
+    """Snapshot from the api's shared hub (all four sections)."""
+    return await api.snapshots.get()
+
+
+async def latest_section(api: "TerminalAPI", name: str) -> Any:
+    """One snapshot section (a SECTIONS key) from the api's shared hub."""
+    return await api.snapshots.section(name)
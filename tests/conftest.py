@@ -7,6 +7,7 @@ and Terminal Markets API integration.
 
 import asyncio
 import os
+import sys
 from collections.abc import AsyncGenerator, Generator
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -133,6 +134,73 @@ def mock_api_response_vault() -> dict:
     }
 
 
+# ============================================================================
+# Clock Fixtures
+# ============================================================================
+
+
+class FakeClock:
+    """Manually advanced clock for components that take a `clock` callable."""
+
+    def __init__(self):
+        self.value = 1000.0
+
+    def __call__(self) -> float:
+        return self.value
+
+    def advance(self, seconds: float):
+        self.value += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Provide a FakeClock starting at t=1000."""
+    return FakeClock()
+
+
+# ============================================================================
+# Runtime State Isolation
+# ============================================================================
+
+
+@pytest.fixture(autouse=True)
+def isolated_monitor_state(tmp_path, monkeypatch):
+    """Keep ActivityMonitor dedup state out of the working tree's data/ dir."""
+    import monitor
+
+    monkeypatch.setattr(monitor, "MONITOR_STATE_FILE", tmp_path / "monitor_state.json")
+
+
+@pytest.fixture(autouse=True)
+def isolated_advisor_history(tmp_path, monkeypatch):
+    """Keep the advisor history database and its JSON export out of data/."""
+    import advisor_history
+
+    monkeypatch.setattr(advisor_history, "HISTORY_DB", tmp_path / "advisor_history.db")
+    monkeypatch.setattr(advisor_history, "HISTORY_FILE", tmp_path / "advisor_history.json")
+
+
+@pytest.fixture(autouse=True)
+def isolated_advisor_memo(tmp_path, monkeypatch):
+    """Keep the advisor analysis memo out of the working tree's data/ dir."""
+    import advisor_memo
+
+    monkeypatch.setattr(advisor_memo, "MEMO_FILE", tmp_path / "advisor_memo.json")
+
+
+@pytest.fixture(autouse=True)
+def isolated_token_index(tmp_path, monkeypatch):
+    """Keep the persisted token index out of the working tree's data/ dir."""
+    import token_index
+
+    index_file = tmp_path / "token_index.json"
+    monkeypatch.setattr(token_index, "INDEX_FILE", index_file)
+    # The bot's shared client was created (with the default path) at import time
+    main = sys.modules.get("main")
+    if main is not None:
+        monkeypatch.setattr(main.api.token_index, "path", index_file)
+
+
 # ============================================================================
 # API Mock Patches
 # ============================================================================
@@ -8,6 +8,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # =============================================================================
 # Tests for cmd_balance (AC 3, AC 8)
 # =============================================================================
@@ -33,7 +35,7 @@ class TestCmdBalanceRefactored:
             "overallPnlUsd": "300.00",
             "overallPnlPercent": "4.5",
         }
-        mock_api = MagicMock()
+        mock_api = with_snapshot_hub(MagicMock())
         mock_api.get_positions = AsyncMock(return_value=mock_api_response)
 
         with (
@@ -61,7 +63,7 @@ class TestCmdBalanceRefactored:
         from commands.query import cmd_balance
 
         mock_api_response = {"error": "Connection timeout"}
-        mock_api = MagicMock()
+        mock_api = with_snapshot_hub(MagicMock())
         mock_api.get_positions = AsyncMock(return_value=mock_api_response)
 
         with (
@@ -123,7 +125,7 @@ class TestCmdPositionsRefactored:
                 }
             ]
         }
-        mock_api = MagicMock()
+        mock_api = with_snapshot_hub(MagicMock())
         mock_api.get_positions = AsyncMock(return_value=mock_api_response)
 
         with (
@@ -163,7 +165,7 @@ class TestCmdPnlRefactored:
             "overallPnlPercent": "4.5",
             "positions": [],
         }
-        mock_api = MagicMock()
+        mock_api = with_snapshot_hub(MagicMock())
         mock_api.get_positions = AsyncMock(return_value=mock_api_response)
 
         with (
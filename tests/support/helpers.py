@@ -18,3 +18,11 @@ def assert_valid_activity(activity: dict) -> None:
     assert "type" in activity, "Activity must have 'type' field"
     activity_type = activity["type"]
     assert activity_type in activity, f"Activity must have '{activity_type}' details"
+
+
+def with_snapshot_hub(api):
+    """Attach a real, non-caching SnapshotHub to a mock TerminalAPI (as TerminalAPI has)."""
+    from snapshot_hub import SnapshotHub
+
+    api.snapshots = SnapshotHub(api, interval=0)
+    return api
@@ -0,0 +1,206 @@
+"""
+Unit tests for concurrent StrategyDataCollector collection
+
+Tests for: StrategyDataCollector.collect fan-out (concurrency limit,
+per-call and per-section deadlines, partial-failure accounting in
+CollectedData.errors, including {"error": ...} responses)
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import snapshot_hub
+from advisor import StrategyDataCollector
+from tests.support.helpers import with_snapshot_hub
+
+OK_CANDLES = {"s": "ok", "t": [1], "o": [1], "h": [1], "l": [1], "c": [1], "v": [1]}
+
+
+class InFlightGauge:
+    """Tracks how many fake API calls run at the same time."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.current = 0
+        self.peak = 0
+
+    async def call(self, result):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        try:
+            await asyncio.sleep(self.delay)
+            return result
+        finally:
+            self.current -= 1
+
+
+def _returning(gauge: InFlightGauge, result):
+    async def call(*args, **kwargs):
+        return await gauge.call(result)
+
+    return call
+
+
+def _api(gauge: InFlightGauge, tokens: int = 5):
+    positions = {
+        "positions": [
+            {"tokenSymbol": f"T{i}", "tokenAddress": f"0x{i}", "currentValueUsd": "1"}
+            for i in range(tokens)
+        ]
+    }
+    api = MagicMock()
+    api.get_positions = AsyncMock(side_effect=_returning(gauge, positions))
+    api.get_strategies = AsyncMock(side_effect=_returning(gauge, []))
+    api.get_vault = AsyncMock(side_effect=_returning(gauge, {}))
+    api.get_eth_price = AsyncMock(side_effect=_returning(gauge, {"priceUsd": "3000"}))
+    api.get_tokens = AsyncMock(side_effect=_returning(gauge, {"items": []}))
+    api.get_candles = AsyncMock(side_effect=_returning(gauge, OK_CANDLES))
+    return with_snapshot_hub(api)
+
+
+class TestConcurrentCollection:
+    """Tests for the fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_requests_overlap_within_limit(self):
+        gauge = InFlightGauge()
+        collector = StrategyDataCollector(_api(gauge))
+
+        data = await collector.collect()
+
+        assert len(data.candles) == 5
+        assert all(len(frames) == 3 for frames in data.candles.values())
+        assert 1 < gauge.peak <= collector.FETCH_CONCURRENCY + 4  # + snapshot sections
+        assert data.errors == []
+
+    @pytest.mark.asyncio
+    async def test_candle_fan_out_bounded(self):
+        gauge = InFlightGauge()
+        api = _api(gauge)
+        collector = StrategyDataCollector(api)
+        collector.FETCH_CONCURRENCY = 2
+        candle_gauge = InFlightGauge()
+        api.get_candles = AsyncMock(side_effect=_returning(candle_gauge, OK_CANDLES))
+
+        await collector.collect()
+
+        assert candle_gauge.peak == 2
+        assert api.get_candles.await_count == 15
+
+    @pytest.mark.asyncio
+    async def test_wall_clock_close_to_slowest_stage(self):
+        gauge = InFlightGauge(delay=0.05)
+        collector = StrategyDataCollector(_api(gauge, tokens=2))
+        collector.FETCH_CONCURRENCY = 10
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        await collector.collect()
+        elapsed = loop.time() - started
+
+        # snapshot, then one wave of 6 candle calls; sequential would be 11 x 0.05s
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_timeframe_order_stable(self):
+        gauge = InFlightGauge()
+        api = _api(gauge, tokens=1)
+        delays = {"1h": 0.03, "4h": 0.02, "1d": 0.0}
+
+        async def candles(addr, tf, limit):
+            await asyncio.sleep(delays[tf])
+            return OK_CANDLES
+
+        api.get_candles = AsyncMock(side_effect=candles)
+
+        data = await StrategyDataCollector(api).collect()
+
+        assert list(data.candles["T0"]) == ["1h", "4h", "1d"]
+
+
+class TestPartialFailures:
+    """Tests for deadlines and error accounting."""
+
+    @pytest.mark.asyncio
+    async def test_slow_candle_times_out(self):
+        gauge = InFlightGauge()
+        api = _api(gauge, tokens=1)
+
+        async def candles(addr, tf, limit):
+            if tf == "4h":
+                await asyncio.sleep(10)
+            return OK_CANDLES
+
+        api.get_candles = AsyncMock(side_effect=candles)
+        collector = StrategyDataCollector(api)
+        collector.CALL_TIMEOUT = 0.05
+
+        data = await collector.collect()
+
+        assert data.candles["T0"]["4h"] == {}
+        assert data.candles["T0"]["1h"] == OK_CANDLES
+        assert "candles T0 4h: timed out" in data.errors
+
+    @pytest.mark.asyncio
+    async def test_failed_candle_recorded(self):
+        api = _api(InFlightGauge(), tokens=1)
+        api.get_candles = AsyncMock(return_value={"error": "HTTP 502"})
+
+        data = await StrategyDataCollector(api).collect()
+
+        assert "candles T0 1h: HTTP 502" in data.errors
+        assert data.candles == {"T0": {"1h": {}, "4h": {}, "1d": {}}}
+
+    @pytest.mark.asyncio
+    async def test_raised_candle_error_recorded(self):
+        api = _api(InFlightGauge(), tokens=1)
+        api.get_candles = AsyncMock(side_effect=RuntimeError("bad gateway"))
+
+        data = await StrategyDataCollector(api).collect()
+
+        assert "candles T0 4h: bad gateway" in data.errors
+
+    @pytest.mark.asyncio
+    async def test_snapshot_section_timeout_only_marks_that_section(self, monkeypatch):
+        monkeypatch.setattr(snapshot_hub, "SECTION_TIMEOUT", 0.05)
+        api = _api(InFlightGauge())
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        api.get_positions = AsyncMock(side_effect=hang)
+
+        data = await StrategyDataCollector(api).collect()
+
+        assert data.errors == ["positions: timed out"]
+        assert data.positions == {}
+        assert data.eth_price == {"priceUsd": "3000"}
+        assert data.candles == {}
+        assert data.tokens == {"items": []}
+
+    @pytest.mark.asyncio
+    async def test_snapshot_error_responses_recorded(self):
+        api = _api(InFlightGauge(), tokens=1)
+        api.get_vault = AsyncMock(return_value={"error": "HTTP 500"})
+        api.get_strategies = AsyncMock(return_value={"error": "Circuit open for /strategies"})
+
+        data = await StrategyDataCollector(api).collect()
+
+        assert "vault: HTTP 500" in data.errors
+        assert "strategies: Circuit open for /strategies" in data.errors
+        assert data.vault == {}
+        assert data.strategies == []
+        assert data.candles["T0"]["1h"] == OK_CANDLES
+
+    @pytest.mark.asyncio
+    async def test_tokens_failure_does_not_block_candles(self):
+        api = _api(InFlightGauge(), tokens=1)
+        api.get_tokens = AsyncMock(return_value={"error": "HTTP 503"})
+
+        data = await StrategyDataCollector(api).collect()
+
+        assert "tokens: HTTP 503" in data.errors
+        assert data.tokens == {}
+        assert data.candles["T0"]["1d"] == OK_CANDLES
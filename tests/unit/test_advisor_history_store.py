@@ -0,0 +1,317 @@
+"""
+Unit tests for the SQLite-backed advisor history store
+
+Tests for: advisor_history.HistoryStore (WAL mode, append/paged reads,
+retention compaction, chunk deduplication and compression, migration of
+inline records, legacy JSON import), export_history manifest and shards
+for the web page, history writes running off the event loop
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import advisor_history
+from advisor_history import HistoryStore
+
+
+def _record(i: int) -> dict:
+    return {
+        "id": f"rec{i:05d}",
+        "timestamp": f"2026-01-01T00:00:{i % 60:02d}",
+        "request": f"prompt {i}",
+        "response": f"response {i}",
+        "suggestions": [{"action": "add", "content": f"s{i}"}],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(tmp_path / "history.db")
+
+
+class TestHistoryStore:
+    """Tests for the append-only store."""
+
+    def test_wal_mode(self, store):
+        with sqlite3.connect(store.path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_pages_newest_first(self, store):
+        for i in range(5):
+            store.append(_record(i))
+
+        assert [r["id"] for r in store.page(2)] == ["rec00004", "rec00003"]
+        assert [r["id"] for r in store.page(2, offset=4)] == ["rec00000"]
+        assert store.page(1)[0] == _record(4)
+
+    def test_get_by_id(self, store):
+        store.append(_record(1))
+
+        assert store.get("rec00001")["request"] == "prompt 1"
+        assert store.get("missing") is None
+
+    def test_duplicate_id_rejected(self, store):
+        assert store.append(_record(1))
+        assert not store.append(_record(1))
+        assert store.count() == 1
+
+    def test_retention_compacts(self, store):
+        for i in range(200):
+            store.append({**_record(i), "request": "x" * 5000}, keep=10)
+
+        with sqlite3.connect(store.path) as conn:
+            freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            pages = conn.execute("PRAGMA page_count").fetchone()[0]
+
+        assert store.count() == 10
+        assert store.page(1)[0]["id"] == "rec00199"
+        assert freelist == 0
+        assert pages < 60  # ~10 records of 5 KB, not 200
+
+    def test_imports_legacy_json_once(self, tmp_path):
+        legacy = tmp_path / "advisor_history.json"
+        legacy.write_text(json.dumps([_record(2), _record(1)]))
+
+        store = HistoryStore(tmp_path / "history.db", legacy_file=legacy)
+        reopened = HistoryStore(tmp_path / "history.db", legacy_file=legacy)
+
+        assert [r["id"] for r in reopened.page()] == ["rec00002", "rec00001"]
+        assert store.count() == 2
+
+    def test_corrupt_legacy_json_ignored(self, tmp_path):
+        legacy = tmp_path / "advisor_history.json"
+        legacy.write_text("not json")
+
+        assert HistoryStore(tmp_path / "history.db", legacy_file=legacy).count() == 0
+
+
+def _prompt(i: int, changed: int = 0) -> str:
+    """Advisor-style prompt where only the section of token `changed` varies."""
+    sections = "".join(
+        f"### TOKEN{t}\nclose {i if t == changed else t} " + "candle data " * 40 + "\n\n"
+        for t in range(5)
+    )
+    return (
+        "You are a strategy advisor.\n" + "rules " * 200 + "\n\n# Data Collection Report\n\n"
+        "## Supported Tokens\n" + "token list " * 50 + "\n\n"
+        "## Token Price Charts & Technical Analysis\n\n" + sections
+    )
+
+
+class TestChunkStore:
+    """Tests for deduplicated, compressed prompt / response storage."""
+
+    def test_round_trip_exact(self, store):
+        record = {**_record(1), "request": _prompt(1), "response": ""}
+        store.append(record)
+        store.append({**_record(2), "request": "no headings\n#only one", "response": "#"})
+
+        assert store.get("rec00001") == record
+        assert store.get("rec00002")["request"] == "no headings\n#only one"
+        assert store.get("rec00002")["response"] == "#"
+
+    def test_shared_sections_stored_once(self, store):
+        raw = 0
+        for i in range(100):
+            record = {**_record(i), "request": _prompt(i), "response": f'{{"n": {i}}}'}
+            raw += len(record["request"]) + len(record["response"])
+            store.append(record)
+
+        stats = store.stats()
+        # system prompt, 3 report headings, 4 unchanged token sections, then one
+        # changed section and one response per record
+        assert stats["chunks"] == 8 + 200
+        assert stats["stored_bytes"] < raw / 20
+        assert store.get("rec00042")["request"] == _prompt(42)
+
+    def test_trim_drops_unshared_chunks(self, store):
+        for i in range(10):
+            store.append({**_record(i), "request": _prompt(i), "response": "same"}, keep=3)
+
+        assert store.stats() == {
+            "records": 3,
+            "chunks": 8 + 3 + 1,
+            "stored_bytes": store.stats()["stored_bytes"],
+        }
+        assert [r["request"] for r in store.page()] == [_prompt(9), _prompt(8), _prompt(7)]
+
+    def test_migrates_inline_records(self, tmp_path):
+        path = tmp_path / "history.db"
+        with closing(sqlite3.connect(path)) as conn:
+            conn.executescript(
+                "CREATE TABLE analyses (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "id TEXT NOT NULL UNIQUE, timestamp TEXT NOT NULL, request TEXT NOT NULL, "
+                "response TEXT NOT NULL, suggestions TEXT NOT NULL);"
+                "CREATE INDEX analyses_timestamp ON analyses (timestamp);"
+            )
+            for i in range(3):
+                r = _record(i)
+                conn.execute(
+                    "INSERT INTO analyses (id, timestamp, request, response, suggestions) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (r["id"], r["timestamp"], r["request"], r["response"], '[{"action": "add"}]'),
+                )
+            conn.commit()
+
+        store = HistoryStore(path)
+        HistoryStore(path)  # second open does not migrate again
+
+        assert [r["id"] for r in store.page()] == ["rec00002", "rec00001", "rec00000"]
+        assert store.get("rec00001")["request"] == "prompt 1"
+        assert store.get("rec00001")["suggestions"] == [{"action": "add"}]
+        with closing(sqlite3.connect(path)) as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert "analyses_inline" not in tables
+
+    def test_retains_more_than_shown(self, monkeypatch):
+        monkeypatch.setattr(advisor_history, "ADVISOR_HISTORY_RETAIN", 4)
+        monkeypatch.setattr(advisor_history, "ADVISOR_HISTORY_MAX", 2)
+        for i in range(6):
+            advisor_history.save_analysis(f"p{i}", "r", [])
+
+        assert advisor_history._store().count() == 4
+        assert [r["request"] for r in advisor_history.load_history()] == ["p5", "p4"]
+        assert len(advisor_history.load_history(limit=10)) == 4
+
+
+class TestExport:
+    """Tests for the manifest / shard export read by data/index.html."""
+
+    @pytest.fixture
+    def shards(self):
+        return advisor_history.HISTORY_FILE.parent / advisor_history.EXPORT_DIR_NAME
+
+    def _manifest(self) -> dict:
+        return json.loads(advisor_history.HISTORY_FILE.read_text(encoding="utf-8"))
+
+    def test_manifest_holds_first_page_of_summaries(self, monkeypatch, shards):
+        monkeypatch.setattr(advisor_history, "EXPORT_PAGE_SIZE", 2)
+        ids = [advisor_history.save_analysis(f"p{i}", "r" * 1000, [{}] * i) for i in range(5)]
+
+        advisor_history.export_history()
+
+        manifest = self._manifest()
+        assert manifest["total"] == 5
+        assert manifest["pages"] == 3
+        assert manifest["records"] == [
+            {"id": ids[4], "timestamp": manifest["records"][0]["timestamp"], "count": 4},
+            {"id": ids[3], "timestamp": manifest["records"][1]["timestamp"], "count": 3},
+        ]
+        assert "request" not in advisor_history.HISTORY_FILE.read_text()
+        page2 = json.loads((shards / "index-2.json").read_text())
+        assert [r["id"] for r in page2] == [ids[0]]
+        assert json.loads((shards / f"{ids[0]}.json").read_text())["request"] == "p0"
+
+    def test_manifest_size_independent_of_depth(self, monkeypatch):
+        monkeypatch.setattr(advisor_history, "ADVISOR_HISTORY_MAX", 500)
+        for i in range(200):
+            advisor_history.save_analysis(f"prompt {i}", "x" * 2000, [{"action": "add"}])
+
+        advisor_history.export_history()
+
+        assert advisor_history.HISTORY_FILE.stat().st_size < 4096
+        assert self._manifest()["pages"] == 10
+
+    def test_trimmed_records_removed_and_shards_reused(self, monkeypatch, shards):
+        monkeypatch.setattr(advisor_history, "ADVISOR_HISTORY_MAX", 2)
+        first = advisor_history.save_analysis("p0", "r", [])
+        second = advisor_history.save_analysis("p1", "r", [])
+        advisor_history.export_history()
+        kept_shard = shards / f"{second}.json"
+        kept_shard.write_text('{"marker": true}')  # unchanged shards are not rewritten
+
+        third = advisor_history.save_analysis("p2", "r", [])
+        advisor_history.export_history()
+
+        assert sorted(p.name for p in shards.iterdir()) == sorted(
+            [f"{second}.json", f"{third}.json"]
+        )
+        assert not (shards / f"{first}.json").exists()
+        assert json.loads(kept_shard.read_text()) == {"marker": True}
+
+    def test_empty_history(self):
+        advisor_history.export_history()
+
+        assert self._manifest()["total"] == 0
+        assert self._manifest()["records"] == []
+
+    def test_manifest_not_imported_as_legacy_history(self, tmp_path):
+        advisor_history.save_analysis("p", "r", [])
+        advisor_history.export_history()
+
+        store = HistoryStore(tmp_path / "fresh.db", legacy_file=advisor_history.HISTORY_FILE)
+
+        assert store.count() == 0
+
+    def test_web_page_loads_shards_lazily(self):
+        html = (advisor_history.WEB_DIR / "index.html").read_text()
+
+        assert "manifest.shards+id+'.json'" in html
+        assert "'index-'+nextPage" in html
+
+
+class TestModuleFunctions:
+    """Tests for save_analysis / load_history / export_history on the store."""
+
+    def test_load_history_paged(self):
+        for i in range(4):
+            advisor_history.save_analysis(f"prompt {i}", "r", [])
+
+        page = advisor_history.load_history(limit=2, offset=1)
+
+        assert [r["request"] for r in page] == ["prompt 2", "prompt 1"]
+
+    def test_sync_exports_before_upload(self):
+        advisor_history.save_analysis("prompt", "response", [])
+        exported = []
+
+        def run(cmd, **kwargs):
+            exported.append(advisor_history.HISTORY_FILE.exists())
+            return MagicMock(returncode=0)
+
+        with patch("advisor_history.subprocess.run", side_effect=run):
+            advisor_history.sync_to_surge()
+
+        assert exported == [True]
+
+    def test_web_dir_ignores_database(self):
+        ignored = (advisor_history.WEB_DIR / ".surgeignore").read_text().splitlines()
+
+        assert "*.db" in ignored
+        assert "*.db-wal" in ignored
+
+    @pytest.mark.asyncio
+    async def test_analyze_writes_history_off_event_loop(self):
+        from advisor import CollectedData, StrategyAdvisor
+
+        threads = []
+
+        def save_analysis(**kwargs):
+            threads.append(threading.current_thread())
+            return "rec1"
+
+        llm = MagicMock()
+        llm.chat = AsyncMock(return_value='{"suggestions": []}')
+        advisor = StrategyAdvisor(llm, MagicMock())
+        advisor.collector.collect = AsyncMock(return_value=CollectedData())
+
+        with patch("advisor_history.save_analysis", save_analysis):
+            await advisor.analyze()
+
+        assert advisor.last_record_id == "rec1"
+        assert threads and threads[0] is not threading.main_thread()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_saves_from_threads(self):
+        ids = await asyncio.gather(
+            *(asyncio.to_thread(advisor_history.save_analysis, f"p{i}", "r", []) for i in range(8))
+        )
+
+        assert len(set(ids)) == 8
+        assert len(advisor_history.load_history()) == 8
@@ -0,0 +1,266 @@
+"""
+Unit tests for advisor analysis memoization
+
+Tests for: advisor_memo (fingerprint quantization, AnalysisMemo persistence,
+expiry and skip statistics), StrategyAdvisor.analyze reusing memoized
+results, AdvisorMonitor not re-pushing them, skip ratio in /advisor_status
+"""
+
+import asyncio
+import json
+from dataclasses import replace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from advisor import CollectedData
+from advisor_memo import AnalysisMemo, fingerprint, is_partial
+
+LLM_RESPONSE = json.dumps(
+    {"suggestions": [{"action": "add", "content": "Buy ABC dips", "reason": "trend"}]}
+)
+
+
+def _candles(close: float) -> dict:
+    return {"s": "ok", "t": [1, 2], "o": [1, 1], "h": [1, 1], "l": [1, 1], "c": [1, close]}
+
+
+def _data(price: float = 1.0, value: str = "100", strategies=None, **kwargs) -> CollectedData:
+    fields = {
+        "positions": {
+            "ethBalance": "1",
+            "positions": [
+                {"tokenSymbol": "ABC", "tokenAddress": "0xAbC", "currentValueUsd": value}
+            ],
+        },
+        "strategies": [{"strategyId": 1, "content": "Hold", "strategyPriority": 1}]
+        if strategies is None
+        else strategies,
+        "vault": {"paused": False},
+        "eth_price": {"priceUsd": "3000"},
+        "candles": {"ABC": {"1h": _candles(price), "4h": {}, "1d": {}}},
+    }
+    fields.update(kwargs)
+    return CollectedData(**fields)
+
+
+class TestFingerprint:
+    """Tests for market-state fingerprints."""
+
+    def test_small_moves_share_fingerprint(self):
+        assert fingerprint(_data(price=1.0)) == fingerprint(_data(price=1.002))
+        assert fingerprint(_data(value="100")) == fingerprint(_data(value="100.3"))
+
+    def test_material_moves_change_fingerprint(self):
+        assert fingerprint(_data(price=1.0)) != fingerprint(_data(price=1.1))
+        assert fingerprint(_data(value="100")) != fingerprint(_data(value="150"))
+
+    def test_eth_price_and_pause_change_fingerprint(self):
+        base = fingerprint(_data())
+
+        assert fingerprint(_data(eth_price={"priceUsd": "3600"})) != base
+        assert fingerprint(_data(vault={"paused": True})) != base
+
+    def test_strategy_set_changes_fingerprint(self):
+        base = _data()
+        added = _data(strategies=base.strategies + [{"strategyId": 2, "content": "Sell"}])
+        expired = _data(strategies=[{"strategyId": 1, "content": "Hold", "expiry": 1}])
+
+        assert fingerprint(added) != fingerprint(base)
+        assert fingerprint(expired) != fingerprint(base)
+
+    def test_order_insensitive(self):
+        a = {"strategyId": 1, "content": "Hold"}
+        b = {"strategyId": "?", "content": "Sell"}
+
+        assert fingerprint(_data(strategies=[a, b])) == fingerprint(_data(strategies=[b, a]))
+
+    def test_price_step_configurable(self):
+        assert fingerprint(_data(price=1.0), 0.5) == fingerprint(_data(price=1.1), 0.5)
+
+
+class TestAnalysisMemo:
+    """Tests for the persisted memo."""
+
+    def test_lookup_within_ttl(self, tmp_path, clock):
+        memo = AnalysisMemo(tmp_path / "memo.json", ttl_hours=1, clock=clock)
+        memo.store("fp", [{"action": "add"}], "rec1")
+
+        clock.advance(3599)
+        assert memo.lookup("fp")["record_id"] == "rec1"
+        clock.advance(1)
+        assert memo.lookup("fp") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "memo.json"
+        memo = AnalysisMemo(path)
+        memo.store("fp", [], "rec1")
+        memo.record_run(skipped=False)
+        memo.record_run(skipped=True)
+
+        restored = AnalysisMemo(path)
+
+        assert restored.lookup("fp")["record_id"] == "rec1"
+        assert restored.status() == "1/2 runs (50%)"
+        assert not path.with_suffix(".json.tmp").exists()
+
+    def test_oldest_entries_evicted(self, tmp_path):
+        memo = AnalysisMemo(tmp_path / "memo.json", max_entries=2)
+        for fp in ("a", "b", "a", "c"):
+            memo.store(fp, [], None)
+
+        assert list(memo.entries) == ["a", "c"]
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        path = tmp_path / "memo.json"
+        path.write_text("{not json")
+
+        memo = AnalysisMemo(path)
+
+        assert memo.entries == {}
+        assert memo.status() == "0/0 runs (0%)"
+
+
+@pytest.fixture
+def advisor():
+    from advisor import StrategyAdvisor
+
+    llm = AsyncMock()
+    llm.chat.return_value = LLM_RESPONSE
+    advisor = StrategyAdvisor(llm, MagicMock())
+    advisor.collector.collect = AsyncMock(return_value=_data())
+    with patch("advisor_history.save_analysis", return_value="rec1"):
+        yield advisor
+
+
+class TestAnalyzeReuse:
+    """Tests for StrategyAdvisor.analyze skipping the LLM."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_market_reuses_result(self, advisor):
+        first = await advisor.analyze()
+        advisor.collector.collect.return_value = _data(price=1.001)
+        second = await advisor.analyze()
+
+        advisor.llm.chat.assert_awaited_once()
+        assert second == first
+        assert advisor.last_run_reused
+        assert advisor.last_record_id == "rec1"
+        assert advisor.memo.status() == "1/2 runs (50%)"
+
+    @pytest.mark.asyncio
+    async def test_material_change_calls_llm(self, advisor):
+        await advisor.analyze()
+        advisor.collector.collect.return_value = _data(price=1.5)
+        await advisor.analyze()
+
+        assert advisor.llm.chat.await_count == 2
+        assert not advisor.last_run_reused
+
+    @pytest.mark.asyncio
+    async def test_partial_data_never_memoized(self, advisor):
+        advisor.collector.collect.return_value = replace(_data(), errors=["vault: down"])
+
+        await advisor.analyze()
+        await advisor.analyze()
+
+        assert advisor.llm.chat.await_count == 2
+        assert advisor.memo.entries == {}
+
+    @pytest.mark.asyncio
+    async def test_error_response_sections_never_memoized(self, advisor):
+        advisor.collector.collect.return_value = _data(positions={"error": "HTTP 502"})
+
+        await advisor.analyze()
+        await advisor.analyze()
+
+        assert advisor.llm.chat.await_count == 2
+        assert advisor.memo.entries == {}
+
+    def test_error_responses_are_partial(self):
+        failed_candles = {"ABC": {"1h": {"error": "HTTP 504"}}}
+
+        assert not is_partial(_data())
+        assert is_partial(_data(eth_price={"error": "Circuit open for /eth-price"}))
+        assert is_partial(_data(candles=failed_candles))
+
+    @pytest.mark.asyncio
+    async def test_api_error_dict_not_memoized_end_to_end(self):
+        from advisor import StrategyAdvisor
+
+        api = MagicMock()
+        api.get_positions = AsyncMock(return_value={"error": "HTTP 502"})
+        api.get_strategies = AsyncMock(return_value=[])
+        api.get_vault = AsyncMock(return_value={"paused": False})
+        api.get_eth_price = AsyncMock(return_value={"priceUsd": "3000"})
+        api.get_tokens = AsyncMock(return_value={"items": []})
+        llm = AsyncMock()
+        llm.chat.return_value = LLM_RESPONSE
+        advisor = StrategyAdvisor(llm, api)
+
+        with patch("advisor_history.save_analysis", return_value="rec1"):
+            await advisor.analyze()
+            await advisor.analyze()
+
+        assert llm.chat.await_count == 2
+        assert advisor.memo.entries == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_llm_call_not_memoized(self, advisor):
+        advisor.llm.chat.return_value = "Error: timeout"
+
+        assert await advisor.analyze() == []
+        assert advisor.memo.entries == {}
+
+    @pytest.mark.asyncio
+    async def test_memo_survives_restart(self, advisor):
+        from advisor import StrategyAdvisor
+
+        await advisor.analyze()
+        restarted = StrategyAdvisor(advisor.llm, MagicMock())
+        restarted.collector.collect = AsyncMock(return_value=_data())
+
+        await restarted.analyze()
+
+        advisor.llm.chat.assert_awaited_once()
+        assert restarted.last_run_reused
+
+
+class TestMonitorAndStatus:
+    """Tests for the background loop and /advisor_status."""
+
+    @pytest.mark.asyncio
+    async def test_reused_result_not_pushed_again(self, advisor):
+        from advisor_monitor import AdvisorMonitor
+
+        callback = AsyncMock()
+        monitor = AdvisorMonitor(advisor, MagicMock(), callback, 1, MagicMock())
+        monitor._build_context = AsyncMock(return_value={})
+        runs = 0
+
+        async def tick(seconds):
+            nonlocal runs
+            runs += 1
+            if runs > 2:
+                monitor.stop()
+
+        with patch("advisor_monitor.asyncio.sleep", tick):
+            await asyncio.create_task(monitor.start())
+
+        callback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_status_shows_skip_ratio(self, mock_telegram_update, mock_telegram_context):
+        from commands.advisor import cmd_advisor_status
+
+        monitor = MagicMock(running=True, interval_seconds=7200, last_analysis=None)
+        monitor.advisor.memo.status.return_value = "3/4 runs (75%)"
+
+        with (
+            patch("commands.advisor._advisor_monitor", monitor),
+            patch("commands.advisor.is_admin", return_value=True),
+        ):
+            await cmd_advisor_status(mock_telegram_update, mock_telegram_context)
+
+        text = mock_telegram_update.message.reply_text.call_args[0][0]
+        assert "Skipped (unchanged market): 3/4 runs (75%)" in text
@@ -0,0 +1,260 @@
+"""
+Unit tests for TerminalAPI circuit breaker and retry budget
+
+Tests for: utils.circuit_breaker (CircuitBreaker, RetryBudget, backoff_delay),
+TerminalAPI._fetch failure handling, breaker state in /monitor_status
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+from utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    RetryBudget,
+    backoff_delay,
+)
+
+
+class TestCircuitBreaker:
+    """Tests for closed/open/half-open transitions."""
+
+    def test_opens_after_threshold(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+
+        for _ in range(3):
+            assert breaker.allow_request()
+            breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+        assert breaker.rejected == 1
+
+    def test_success_resets_failure_count(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CLOSED
+
+    def test_half_open_allows_single_probe(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.advance(10)
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+    def test_probe_success_closes(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.advance(10)
+        breaker.allow_request()
+
+        breaker.record_success()
+
+        assert breaker.state == CLOSED
+        assert breaker.allow_request()
+
+    def test_probe_failure_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.advance(10)
+        breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == 10
+
+    def test_lost_probe_replaced_after_timeout(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.advance(10)
+        breaker.allow_request()  # probe never reports back (cancelled)
+        clock.advance(10)
+
+        assert breaker.allow_request()
+
+
+class TestRetryBudget:
+    """Tests for the sliding-window retry budget."""
+
+    def test_minimum_retries_allowed(self, clock):
+        budget = RetryBudget(ratio=0.1, min_retries=2, window=10, clock=clock)
+
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        assert budget.exhausted == 1
+
+    def test_budget_scales_with_requests(self, clock):
+        budget = RetryBudget(ratio=0.5, min_retries=0, window=10, clock=clock)
+        for _ in range(4):
+            budget.record_request()
+
+        assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+
+    def test_budget_refills_after_window(self, clock):
+        budget = RetryBudget(ratio=0, min_retries=1, window=10, clock=clock)
+        budget.try_acquire()
+        clock.advance(11)
+
+        assert budget.try_acquire()
+
+
+class TestBackoff:
+    """Tests for full-jitter exponential backoff."""
+
+    def test_grows_exponentially(self):
+        assert backoff_delay(0, base=1, cap=100, rand=lambda: 0.999) < 1
+        assert 3 < backoff_delay(2, base=1, cap=100, rand=lambda: 0.999) < 4
+
+    def test_capped(self):
+        assert backoff_delay(10, base=1, cap=8, rand=lambda: 1.0) == 8
+
+    def test_jitter_can_be_zero(self):
+        assert backoff_delay(3, rand=lambda: 0.0) == 0
+
+
+class FailingResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, **kwargs):
+        return {"ok": True}
+
+
+@pytest.fixture
+def api():
+    """TerminalAPI with caching disabled and a fake session."""
+    from api import TerminalAPI
+
+    client = TerminalAPI()
+    client._cache_ttls = {}
+    client.session = MagicMock()
+    client._get_session = AsyncMock(return_value=client.session)
+    return client
+
+
+class TestFetchWithBreaker:
+    """Tests for breaker and budget integration in TerminalAPI._fetch."""
+
+    @pytest.mark.asyncio
+    async def test_network_errors_open_breaker(self, api):
+        api.session.get = MagicMock(side_effect=aiohttp.ClientError("down"))
+
+        with (
+            patch("api.BREAKER_FAILURE_THRESHOLD", 3),
+            patch("api.asyncio.sleep", AsyncMock()),
+        ):
+            first = await api.get_positions()
+            second = await api.get_positions()
+
+        assert "Request failed" in first["error"]
+        assert "Circuit open for /positions" in second["error"]
+        assert api.session.get.call_count == 3
+        assert api.get_stats()["short_circuited"] == 1
+        assert api.get_breaker_states() == {"/positions": OPEN}
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_isolated_per_endpoint(self, api):
+        for _ in range(10):
+            api._breaker("/positions/0x1").record_failure()
+        api.session.get = MagicMock(return_value=FailingResponse(200))
+        result = await api.get_vault()
+
+        assert result == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_server_error_counts_as_failure_without_retry(self, api):
+        api.session.get = MagicMock(return_value=FailingResponse(503))
+
+        result = await api.get_positions()
+
+        assert result == {"error": "HTTP 503"}
+        assert api.session.get.call_count == 1
+        assert api._breaker("/positions").failures == 1
+
+    @pytest.mark.asyncio
+    async def test_client_error_status_keeps_breaker_closed(self, api):
+        api.session.get = MagicMock(return_value=FailingResponse(404))
+        api._breaker("/positions").record_failure()
+
+        await api.get_positions()
+
+        assert api._breaker("/positions").failures == 0
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_stops_retries(self, api):
+        api.session.get = MagicMock(side_effect=TimeoutError())
+        api._retry_budget = RetryBudget(ratio=0, min_retries=0)
+
+        with patch("api.asyncio.sleep", AsyncMock()) as sleep:
+            result = await api.get_positions()
+
+        assert "timeout" in result["error"]
+        assert api.session.get.call_count == 1
+        sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_retries_use_jittered_backoff(self, api):
+        api.session.get = MagicMock(
+            side_effect=[aiohttp.ClientError("x"), aiohttp.ClientError("x"), FailingResponse(200)]
+        )
+
+        with (
+            patch("api.asyncio.sleep", AsyncMock()) as sleep,
+            patch("utils.circuit_breaker.random.random", return_value=0.5),
+        ):
+            result = await api.get_positions()
+
+        assert result == {"ok": True}
+        assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0]
+        assert api.get_stats()["retries"] == 2
+
+
+class TestMonitorStatusBreakers:
+    """Tests for breaker state in /monitor_status."""
+
+    @pytest.mark.asyncio
+    async def test_open_breakers_listed(self):
+        from commands.monitor import cmd_monitor_status
+
+        update = MagicMock()
+        update.effective_user.id = 1
+        update.message = AsyncMock()
+        monitor = MagicMock(running=True, poll_interval=30, seen_ids=set())
+        api = MagicMock()
+        api.get_stats.return_value = {
+            "requests": 10,
+            "upstream": 7,
+            "coalesced": 3,
+            "short_circuited": 4,
+        }
+        api.get_breaker_states.return_value = {"/positions": OPEN}
+
+        with (
+            patch("commands.monitor._monitor_instance", monitor),
+            patch("commands.monitor.is_admin", return_value=True),
+            patch("commands.monitor._get_api", return_value=api),
+        ):
+            await cmd_monitor_status(update, MagicMock())
+
+        text = update.message.reply_text.call_args[0][0]
+        assert "Short-circuited: 4" in text
+        assert "/positions: open" in text
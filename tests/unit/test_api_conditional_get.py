@@ -0,0 +1,194 @@
+"""
+Unit tests for TerminalAPI conditional GET support
+
+Tests for: TerminalAPI._fetch ETag / Last-Modified validators, 304 handling,
+changed/version flags, ThresholdAlerter and ActivityMonitor skipping
+unchanged responses
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.support.helpers import with_snapshot_hub
+
+
+@pytest.fixture
+async def etag_server():
+    """Local server that honours If-None-Match on /positions."""
+    state = {"body": {"ethBalance": "1", "positions": []}, "etag": '"v1"', "requests": []}
+
+    async def handle_positions(request):
+        state["requests"].append(dict(request.headers))
+        if request.headers.get("If-None-Match") == state["etag"]:
+            return web.Response(status=304)
+        return web.json_response(state["body"], headers={"ETag": state["etag"]})
+
+    async def handle_vault(request):
+        state["requests"].append(dict(request.headers))
+        return web.json_response({"name": "vault"})
+
+    app = web.Application()
+    app.router.add_get("/positions/{vault}", handle_positions)
+    app.router.add_get("/vault", handle_vault)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+@pytest.fixture
+async def api_client(etag_server):
+    from api import TerminalAPI
+
+    server, _ = etag_server
+    client = TerminalAPI()
+    client.base_url = str(server.make_url("")).rstrip("/")
+    client._cache_ttls = {}
+    yield client
+    await client.close()
+
+
+class TestConditionalRequests:
+    """Tests for validators and 304 handling."""
+
+    @pytest.mark.asyncio
+    async def test_second_request_sends_if_none_match(self, api_client, etag_server):
+        _, state = etag_server
+
+        await api_client.get_positions()
+        await api_client.get_positions()
+
+        assert "If-None-Match" not in state["requests"][0]
+        assert state["requests"][1]["If-None-Match"] == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_304_returns_previous_body_unchanged(self, api_client):
+        first = await api_client.get_positions()
+        second = await api_client.get_positions()
+
+        assert second == {"ethBalance": "1", "positions": []}
+        assert first.changed is True
+        assert second.changed is False
+        assert second.version == first.version
+        assert second is not first
+        assert first.changed is True  # earlier result not mutated
+        assert api_client.get_stats()["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_new_etag_marks_changed(self, api_client, etag_server):
+        _, state = etag_server
+        first = await api_client.get_positions()
+        state["body"] = {"ethBalance": "2", "positions": []}
+        state["etag"] = '"v2"'
+
+        second = await api_client.get_positions()
+
+        assert second["ethBalance"] == "2"
+        assert second.changed is True
+        assert second.version != first.version
+
+    @pytest.mark.asyncio
+    async def test_identical_body_without_validators_unchanged(self, api_client):
+        first = await api_client.get_vault()
+        second = await api_client.get_vault()
+
+        assert second.changed is False
+        assert second.version == first.version
+
+    @pytest.mark.asyncio
+    async def test_versions_distinct_across_endpoints(self, api_client):
+        positions = await api_client.get_positions()
+        vault = await api_client.get_vault()
+
+        assert positions.version != vault.version
+
+
+class TestAlerterSkipsUnchanged:
+    """Tests for ThresholdAlerter skipping unchanged positions."""
+
+    def _positions(self, version):
+        from api import ApiDict
+
+        positions = ApiDict({"overallPnlUsd": "100", "positions": []})
+        positions.changed = True
+        positions.version = version
+        return positions
+
+    @pytest.mark.asyncio
+    async def test_unchanged_version_skips_checks(self):
+        from alerter import ThresholdAlerter
+
+        api = with_snapshot_hub(MagicMock())
+        api.get_positions = AsyncMock(return_value=self._positions(7))
+        alerter = ThresholdAlerter(api, MagicMock(notify_users=[]))
+
+        await alerter._send_alerts()
+        calls_after_first = api.get_positions.await_count
+        await alerter._send_alerts()
+
+        assert api.get_positions.await_count == calls_after_first + 1
+        assert alerter._positions_version == 7
+
+    @pytest.mark.asyncio
+    async def test_new_version_rechecks(self):
+        from alerter import ThresholdAlerter
+
+        api = with_snapshot_hub(MagicMock())
+        api.get_positions = AsyncMock(return_value=self._positions(1))
+        alerter = ThresholdAlerter(api, MagicMock(notify_users=[]))
+        await alerter._send_alerts()
+
+        api.get_positions.return_value = self._positions(2)
+        with patch.object(alerter, "_check_pnl_threshold", AsyncMock(return_value=None)) as check:
+            await alerter._send_alerts()
+
+        check.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_plain_dict_never_skipped(self):
+        from alerter import ThresholdAlerter
+
+        api = with_snapshot_hub(MagicMock())
+        api.get_positions = AsyncMock(return_value={"overallPnlUsd": "1", "positions": []})
+        alerter = ThresholdAlerter(api, MagicMock(notify_users=[]))
+
+        with patch.object(alerter, "_check_pnl_threshold", AsyncMock(return_value=None)) as check:
+            await alerter._send_alerts()
+            await alerter._send_alerts()
+
+        assert check.await_count == 2
+
+
+class TestActivityMonitorSkipsUnchanged:
+    """Tests for ActivityMonitor skipping unchanged activity feeds."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_feed_not_filtered(self):
+        from api import ApiDict
+        from monitor import ActivityMonitor
+
+        feed = ApiDict({"items": [{"id": "a1"}]})
+        feed.changed, feed.version = True, 3
+        polls = []
+        api = MagicMock()
+
+        async def get_activity(*args, **kwargs):
+            polls.append(1)
+            if len(polls) == 2:
+                monitor.stop()
+            return feed
+
+        api.get_activity = get_activity
+        monitor = ActivityMonitor(api, AsyncMock())
+        monitor._preload_existing_activities = AsyncMock()
+        monitor._filter_new = MagicMock(return_value=[])
+
+        with patch("monitor.asyncio.sleep", AsyncMock()):
+            await asyncio.create_task(monitor.start())
+
+        assert len(polls) == 2
+        monitor._filter_new.assert_called_once()
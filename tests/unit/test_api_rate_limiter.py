@@ -0,0 +1,229 @@
+"""
+Unit tests for the Terminal API client-side rate limiter
+
+Tests for: utils.rate_limiter (RateLimiter, parse_retry_after, priority lanes),
+TerminalAPI._fetch 429 handling, background priority in services
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from utils.rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimiter,
+    parse_retry_after,
+    request_priority,
+)
+
+
+class TestParseRetryAfter:
+    """Tests for Retry-After header parsing."""
+
+    def test_seconds(self):
+        assert parse_retry_after("5") == 5.0
+
+    def test_http_date(self):
+        # 2015-10-21 07:28:10 UTC
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480) == 10.0
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestTokenBucket:
+    """Tests for token bucket accounting."""
+
+    def test_burst_then_wait(self, clock):
+        limiter = RateLimiter(rate=2, burst=2, clock=clock)
+
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() == pytest.approx(0.5)
+
+    def test_refills_over_time(self, clock):
+        limiter = RateLimiter(rate=2, burst=2, clock=clock)
+        limiter.try_acquire()
+        limiter.try_acquire()
+        clock.advance(0.5)
+
+        assert limiter.try_acquire() == 0
+
+    def test_background_yields_to_waiting_interactive(self, clock):
+        limiter = RateLimiter(rate=2, burst=2, clock=clock)
+        limiter._waiting[INTERACTIVE] = 1
+
+        assert limiter.try_acquire(BACKGROUND) > 0
+        assert limiter.try_acquire(INTERACTIVE) == 0
+
+    def test_throttle_blocks_until_retry_after(self, clock):
+        limiter = RateLimiter(rate=10, burst=10, clock=clock)
+
+        limiter.record_throttled(retry_after=3)
+
+        assert limiter.try_acquire() == pytest.approx(3)
+        assert limiter.rate == 5
+        assert limiter.throttled == 1
+
+    def test_throttle_block_capped(self, clock):
+        limiter = RateLimiter(rate=10, burst=10, max_block=60, clock=clock)
+
+        limiter.record_throttled(retry_after=3600)
+
+        assert limiter.try_acquire() == pytest.approx(60)
+        clock.advance(60)
+        assert limiter.try_acquire() == 0
+
+    def test_rate_recovers_after_success(self, clock):
+        limiter = RateLimiter(rate=10, burst=10, clock=clock)
+        limiter.record_throttled()
+
+        for _ in range(20):
+            limiter.record_success()
+
+        assert limiter.rate == 10
+
+    def test_rate_never_below_minimum(self, clock):
+        limiter = RateLimiter(rate=4, min_rate=1, clock=clock)
+
+        for _ in range(10):
+            limiter.record_throttled()
+
+        assert limiter.rate == 1
+
+
+class TestPriorityLanes:
+    """Tests for interactive requests preempting background ones."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_served_before_background(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        limiter.try_acquire()  # empty the bucket
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        background = asyncio.create_task(request("background", BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("interactive", INTERACTIVE))
+        await asyncio.gather(background, interactive)
+
+        assert order == ["interactive", "background"]
+        assert limiter.waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_priority_taken_from_context(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        limiter.try_acquire()
+        limiter.try_acquire = MagicMock(side_effect=[0.001, 0])
+
+        async def background_caller():
+            request_priority.set(BACKGROUND)
+            await limiter.acquire()
+
+        await asyncio.create_task(background_caller())
+
+        limiter.try_acquire.assert_called_with(BACKGROUND)
+        assert request_priority.get() == INTERACTIVE
+
+
+class ThrottledResponse:
+    def __init__(self, status: int, headers: dict | None = None):
+        self.status = status
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, **kwargs):
+        return {"ok": True}
+
+
+@pytest.fixture
+def api():
+    """TerminalAPI with caching disabled and a fake session."""
+    from api import TerminalAPI
+
+    client = TerminalAPI()
+    client._cache_ttls = {}
+    client.session = MagicMock()
+    client._get_session = AsyncMock(return_value=client.session)
+    return client
+
+
+class TestFetch429:
+    """Tests for 429 handling in TerminalAPI._fetch."""
+
+    @pytest.mark.asyncio
+    async def test_429_waits_retry_after_then_retries(self, api):
+        api.session.get = MagicMock(
+            side_effect=[ThrottledResponse(429, {"Retry-After": "0"}), ThrottledResponse(200)]
+        )
+
+        result = await api.get_positions()
+
+        assert result == {"ok": True}
+        assert api.get_stats()["throttled"] == 1
+        assert api._limiter.throttled == 1
+        assert api._breaker("/positions").failures == 0
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_returns_error(self, api):
+        api.session.get = MagicMock(return_value=ThrottledResponse(429, {"Retry-After": "3600"}))
+
+        result = await api.get_positions()
+
+        assert result == {"error": "HTTP 429"}
+        assert api.session.get.call_count == 1
+        assert api._limiter.blocked_until > 0
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_does_not_block_later_requests(self, api):
+        from api import RETRY_AFTER_MAX_WAIT
+
+        api.session.get = MagicMock(return_value=ThrottledResponse(429, {"Retry-After": "3600"}))
+        await api.get_positions()
+
+        assert api._limiter.try_acquire(INTERACTIVE) <= RETRY_AFTER_MAX_WAIT
+
+    @pytest.mark.asyncio
+    async def test_each_attempt_acquires_token(self, api):
+        api.session.get = MagicMock(return_value=ThrottledResponse(200))
+        api._limiter.acquire = AsyncMock()
+
+        await api.get_positions()
+
+        api._limiter.acquire.assert_awaited_once()
+
+
+class TestBackgroundServices:
+    """Tests that background loops mark their requests as background."""
+
+    @pytest.mark.asyncio
+    async def test_activity_monitor_uses_background_priority(self):
+        from monitor import ActivityMonitor
+
+        seen = []
+        api = MagicMock()
+
+        async def get_activity(*args, **kwargs):
+            seen.append(request_priority.get())
+            monitor.stop()
+            return {"items": []}
+
+        api.get_activity = get_activity
+        monitor = ActivityMonitor(api, AsyncMock())
+        monitor._preload_existing_activities = AsyncMock()
+
+        with patch("monitor.asyncio.sleep", AsyncMock()):
+            await asyncio.create_task(monitor.start())
+
+        assert seen == [BACKGROUND]
@@ -0,0 +1,134 @@
+"""
+Unit tests for TerminalAPI single-flight request coalescing
+
+Tests for: TerminalAPI._get, TerminalAPI.get_stats, /monitor_status counters
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+def _slow_fetch(result, calls: list, delay: float = 0.05):
+    """Build a fake _fetch that records calls and resolves after a delay."""
+
+    async def fetch(endpoint, params=None):
+        calls.append((endpoint, params))
+        await asyncio.sleep(delay)
+        return result
+
+    return fetch
+
+
+class TestSingleFlight:
+    """Tests for coalescing identical in-flight GETs."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_upstream(self):
+        """Identical concurrent GETs should trigger a single upstream fetch."""
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+        calls = []
+        payload = {"positions": []}
+
+        with patch.object(api, "_fetch", side_effect=_slow_fetch(payload, calls)):
+            results = await asyncio.gather(*(api.get_positions() for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(r is payload for r in results)
+        stats = api.get_stats()
+        assert stats["requests"] == 5
+        assert stats["upstream"] == 1
+        assert stats["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_param_order_does_not_matter(self):
+        """Params in different order should map to the same request."""
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+        calls = []
+
+        with patch.object(api, "_fetch", side_effect=_slow_fetch({}, calls)):
+            await asyncio.gather(
+                api._get("/swaps", {"a": 1, "b": 2}),
+                api._get("/swaps", {"b": 2, "a": 1}),
+            )
+
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_different_params_not_coalesced(self):
+        """Requests with different params should each hit upstream."""
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+        calls = []
+
+        with patch.object(api, "_fetch", side_effect=_slow_fetch({}, calls)):
+            await asyncio.gather(api.get_activity(10), api.get_activity(50))
+
+        assert len(calls) == 2
+        assert api.get_stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_requests_not_coalesced(self):
+        """Once a request completes, the next one should fetch again."""
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+        calls = []
+
+        with patch.object(api, "_fetch", side_effect=_slow_fetch({}, calls, delay=0)):
+            await api.get_activity(10)
+            await api.get_activity(10)
+
+        assert len(calls) == 2
+        assert api._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        """Cancelling one waiter should leave the shared request running."""
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+        calls = []
+
+        with patch.object(api, "_fetch", side_effect=_slow_fetch({"ok": True}, calls, 0.05)):
+            first = asyncio.create_task(api.get_vault())
+            second = asyncio.create_task(api.get_vault())
+            await asyncio.sleep(0.01)
+            first.cancel()
+            result = await second
+
+        assert result == {"ok": True}
+        assert len(calls) == 1
+
+
+class TestMonitorStatusCounters:
+    """Tests for request counters in /monitor_status."""
+
+    @pytest.mark.asyncio
+    async def test_monitor_status_shows_coalesced_count(self):
+        """/monitor_status should report upstream and coalesced counts."""
+        from commands.monitor import cmd_monitor_status
+
+        update = MagicMock()
+        update.effective_user.id = 1
+        update.message = AsyncMock()
+        monitor = MagicMock(running=True, poll_interval=30, seen_ids=set())
+        api = MagicMock()
+        api.get_stats.return_value = {"requests": 10, "upstream": 7, "coalesced": 3}
+
+        with (
+            patch("commands.monitor._monitor_instance", monitor),
+            patch("commands.monitor.is_admin", return_value=True),
+            patch("commands.monitor._get_api", return_value=api),
+        ):
+            await cmd_monitor_status(update, MagicMock())
+
+        text = update.message.reply_text.call_args[0][0]
+        assert "Upstream: 7" in text
+        assert "Coalesced: 3" in text
@@ -0,0 +1,216 @@
+"""
+Unit tests for TerminalAPI response cache
+
+Tests for: utils.ttl_cache.TTLCache, TerminalAPI._get caching,
+stale-while-revalidate, invalidation after contract writes
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def api(clock):
+    """TerminalAPI with a controllable cache clock and a counting _fetch."""
+    from api import TerminalAPI
+
+    client = TerminalAPI()
+    client._cache = TTLCache(max_entries=16, clock=clock)
+    client._cache_ttls = {"/positions": 10, "/vault": 10}
+    client.fetch_calls = []
+    client.next_result = {"value": 1}
+
+    async def fake_fetch(endpoint, params=None):
+        client.fetch_calls.append(endpoint)
+        return client.next_result
+
+    client._fetch = fake_fetch
+    return client
+
+
+class TestTTLCache:
+    """Tests for the TTLCache primitive."""
+
+    def test_fresh_entry_returned(self, clock):
+        cache = TTLCache(clock=clock)
+        cache.set("k", "v", ttl=10)
+
+        entry = cache.get("k")
+
+        assert entry.value == "v"
+        assert entry.is_fresh(clock())
+
+    def test_stale_entry_usable_within_grace(self, clock):
+        cache = TTLCache(clock=clock)
+        cache.set("k", "v", ttl=10, stale_ttl=20)
+        clock.advance(15)
+
+        entry = cache.get("k")
+
+        assert entry is not None
+        assert not entry.is_fresh(clock())
+
+    def test_expired_entry_removed(self, clock):
+        cache = TTLCache(clock=clock)
+        cache.set("k", "v", ttl=10, stale_ttl=5)
+        clock.advance(16)
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, clock):
+        cache = TTLCache(max_entries=2, clock=clock)
+        cache.set("a", 1, ttl=10)
+        cache.set("b", 2, ttl=10)
+        cache.get("a")  # a becomes most recently used
+        cache.set("c", 3, ttl=10)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.evictions == 1
+
+    def test_invalidate_with_predicate(self, clock):
+        cache = TTLCache(clock=clock)
+        cache.set(("/positions/0x1", ()), 1, ttl=10)
+        cache.set(("/eth-price", ()), 2, ttl=10)
+
+        removed = cache.invalidate(lambda key: key[0].startswith("/positions"))
+
+        assert removed == 1
+        assert ("/eth-price", ()) in cache
+
+
+class TestResponseCaching:
+    """Tests for cache integration in TerminalAPI._get."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_hit_skips_upstream(self, api):
+        first = await api.get_positions()
+        second = await api.get_positions()
+
+        assert first is second
+        assert len(api.fetch_calls) == 1
+        assert api.get_stats()["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_uncached_endpoint_always_fetches(self, api):
+        await api.get_activity(10)
+        await api.get_activity(10)
+
+        assert len(api.fetch_calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_returned_and_revalidated(self, api, clock):
+        old = await api.get_positions()
+        clock.advance(15)  # past TTL, within stale window
+        api.next_result = {"value": 2}
+
+        stale = await api.get_positions()
+        await asyncio.sleep(0)  # let background refresh run
+        await asyncio.sleep(0)
+        fresh = await api.get_positions()
+
+        assert stale is old
+        assert fresh == {"value": 2}
+        assert len(api.fetch_calls) == 2
+        assert api.get_stats()["stale_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_error_responses_not_cached(self, api):
+        api.next_result = {"error": "HTTP 500"}
+        await api.get_positions()
+        api.next_result = {"value": 1}
+
+        result = await api.get_positions()
+
+        assert result == {"value": 1}
+        assert len(api.fetch_calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_vault_data_forces_refetch(self, api):
+        await api.get_positions()
+        await api.get_vault()
+
+        api.invalidate_vault_data()
+        await api.get_positions()
+        await api.get_vault()
+
+        assert len(api.fetch_calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_inflight_result_dropped_after_invalidation(self, api):
+        """A response fetched before a write must not repopulate the cache."""
+        gate = asyncio.Event()
+
+        async def slow_fetch(endpoint, params=None):
+            api.fetch_calls.append(endpoint)
+            await gate.wait()
+            return {"value": "before-write"}
+
+        api._fetch = slow_fetch
+        pending = asyncio.create_task(api.get_positions())
+        await asyncio.sleep(0)
+        api.invalidate_vault_data()
+        gate.set()
+        await pending
+
+        assert len(api._cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_when_no_ttls(self, api):
+        api._cache_ttls = {}
+
+        await api.get_positions()
+        await api.get_positions()
+
+        assert len(api.fetch_calls) == 2
+
+
+class TestContractWriteInvalidation:
+    """Tests for the VaultContract on_transaction hook."""
+
+    @pytest.mark.asyncio
+    async def test_successful_transaction_triggers_callback(self):
+        import contract
+
+        vault = contract.VaultContract.__new__(contract.VaultContract)
+        vault.on_transaction = MagicMock()
+        vault.account = MagicMock()
+        vault.w3 = MagicMock()
+        vault.w3.eth.wait_for_transaction_receipt.return_value = {"status": 1, "blockNumber": 1}
+        tx_func = MagicMock()
+        tx_func.estimate_gas.return_value = 21000
+
+        result = await vault._send_transaction(tx_func)
+
+        assert result["success"] is True
+        vault.on_transaction.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_reverted_transaction_skips_callback(self):
+        import contract
+
+        vault = contract.VaultContract.__new__(contract.VaultContract)
+        vault.on_transaction = MagicMock()
+        vault.account = MagicMock()
+        vault.w3 = MagicMock()
+        vault.w3.eth.wait_for_transaction_receipt.return_value = {"status": 0, "blockNumber": 1}
+        tx_func = MagicMock()
+        tx_func.estimate_gas.return_value = 21000
+
+        result = await vault._send_transaction(tx_func)
+
+        assert result["success"] is False
+        vault.on_transaction.assert_not_called()
+
+    def test_callback_failure_is_swallowed(self):
+        import contract
+
+        vault = contract.VaultContract.__new__(contract.VaultContract)
+        vault.on_transaction = MagicMock(side_effect=RuntimeError("boom"))
+
+        vault._notify_transaction()  # should not raise
@@ -0,0 +1,171 @@
+"""
+Unit tests for TerminalAPI pooled HTTP session
+
+Tests for: TerminalAPI.open/close/_get_session, shared session in _get,
+discard_session dropping tasks of a closed event loop (main.main restart)
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+@pytest.fixture
+async def local_api_server():
+    """Start a local aiohttp server that mimics the Terminal API."""
+    hits = {"count": 0}
+
+    async def handle_positions(request):
+        hits["count"] += 1
+        return web.json_response({"ethBalance": "1000", "positions": []})
+
+    app = web.Application()
+    app.router.add_get("/positions/{vault}", handle_positions)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, hits
+    await server.close()
+
+
+@pytest.fixture
+async def api_client(local_api_server):
+    """Create TerminalAPI pointed at the local server."""
+    from api import TerminalAPI
+
+    server, _ = local_api_server
+    client = TerminalAPI()
+    client.base_url = str(server.make_url("")).rstrip("/")
+    client._cache_ttls = {}  # every call should reach the server
+    yield client
+    await client.close()
+
+
+class TestSessionLifecycle:
+    """Tests for session creation, reuse and close."""
+
+    @pytest.mark.asyncio
+    async def test_open_creates_pooled_session(self, api_client):
+        """open() should create a ClientSession with a pooled connector."""
+        session = await api_client.open()
+
+        assert isinstance(session, aiohttp.ClientSession)
+        assert not session.closed
+        assert session.connector.limit_per_host > 0
+
+    @pytest.mark.asyncio
+    async def test_session_reused_across_calls(self, api_client):
+        """Repeated _get_session calls should return the same session."""
+        first = await api_client._get_session()
+        second = await api_client._get_session()
+
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_close_closes_session(self, api_client):
+        """close() should close and release the session."""
+        session = await api_client.open()
+
+        await api_client.close()
+
+        assert session.closed
+        assert api_client._session is None
+
+    @pytest.mark.asyncio
+    async def test_session_recreated_after_close(self, api_client):
+        """A closed session should be replaced on next use."""
+        first = await api_client.open()
+        await api_client.close()
+
+        second = await api_client._get_session()
+
+        assert second is not first
+        assert not second.closed
+
+    @pytest.mark.asyncio
+    async def test_session_from_other_loop_discarded(self, api_client):
+        """A session bound to another event loop should not be reused."""
+        stale = await api_client.open()
+        other_loop = asyncio.new_event_loop()
+        api_client._session_loop = other_loop
+
+        fresh = await api_client._get_session()
+
+        assert fresh is not stale
+        other_loop.close()
+        await stale.close()
+
+    def test_discard_session_drops_reference(self):
+        """discard_session() should forget the session without awaiting."""
+        from api import TerminalAPI
+
+        client = TerminalAPI()
+        client._session = object()
+
+        client.discard_session()
+
+        assert client._session is None
+
+    def test_restart_does_not_await_tasks_of_closed_loop(self):
+        """After a restart, callers must not join requests pending on the old loop."""
+        from api import TerminalAPI
+
+        client = TerminalAPI()
+        client._cache_ttls = {}
+        hang = True
+
+        async def fetch(endpoint, params=None):
+            while hang:
+                await asyncio.sleep(1)
+            return {"endpoint": endpoint}
+
+        async def start_requests():
+            asyncio.ensure_future(client.get_positions())
+            asyncio.ensure_future(client.snapshots.get())
+            client.token_index.tokens = {"PEPE": {"symbol": "PEPE"}}
+            client.token_index.refresh_background()
+            await asyncio.sleep(0.01)
+
+        with patch.object(client, "_fetch", side_effect=fetch):
+            old_loop = asyncio.new_event_loop()
+            old_loop.run_until_complete(start_requests())
+            old_loop.close()  # restart: pending tasks are never finished
+
+            client.discard_session()
+            hang = False
+
+            async def after_restart():
+                assert not client.token_index.refreshing
+                positions = await asyncio.wait_for(client.get_positions(), 1)
+                snapshot = await asyncio.wait_for(client.snapshots.get(), 1)
+                return positions, snapshot
+
+            new_loop = asyncio.new_event_loop()
+            try:
+                positions, snapshot = new_loop.run_until_complete(after_restart())
+            finally:
+                new_loop.close()
+
+        assert positions["endpoint"].startswith("/positions/")
+        assert snapshot.errors == {}
+
+
+class TestSharedSessionRequests:
+    """Tests that _get goes through the shared session."""
+
+    @pytest.mark.asyncio
+    async def test_get_uses_shared_session(self, api_client, local_api_server):
+        """Multiple requests should reuse one session."""
+        _, hits = local_api_server
+
+        first = await api_client.get_positions()
+        session = api_client._session
+        second = await api_client.get_positions()
+
+        assert first["ethBalance"] == "1000"
+        assert second["ethBalance"] == "1000"
+        assert api_client._session is session
+        assert hits["count"] == 2
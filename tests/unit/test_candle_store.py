@@ -0,0 +1,239 @@
+"""
+Unit tests for the incremental candle store
+
+Tests for: candle_store (CandleSeries merge/trim/UDF output, CandleStore
+incremental countback, serving stored bars, stale bars after a failed update),
+StrategyDataCollector reusing the store across runs and reporting stale bars
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from candle_store import CandleSeries, CandleStore
+from tests.support.helpers import with_snapshot_hub
+
+HOUR = 3600
+NOW = 100 * HOUR
+
+
+def _udf(times, close=1.0, volume=True):
+    data = {
+        "s": "ok",
+        "t": list(times),
+        "o": [close] * len(times),
+        "h": [close] * len(times),
+        "l": [close] * len(times),
+        "c": [close] * len(times),
+    }
+    if volume:
+        data["v"] = [10.0] * len(times)
+    return data
+
+
+def _store(*responses, **kwargs):
+    api = MagicMock()
+    api.get_candles = AsyncMock(side_effect=list(responses))
+    return CandleStore(api, clock=lambda: NOW, **kwargs)
+
+
+def _countbacks(store):
+    return [call.args[2] for call in store.api.get_candles.await_args_list]
+
+
+class TestCandleSeries:
+    """Tests for merging UDF responses."""
+
+    def test_merge_replaces_forming_bar_and_appends(self):
+        series = CandleSeries()
+        series.merge(_udf([1, 2, 3], close=1.0))
+
+        appended = series.merge(_udf([3, 4], close=2.0))
+
+        assert appended == 1
+        assert series.times.tolist() == [1, 2, 3, 4]
+        assert series.closes.tolist() == [1.0, 1.0, 2.0, 2.0]
+
+    def test_older_bars_skipped(self):
+        series = CandleSeries()
+        series.merge(_udf([5, 6]))
+
+        assert series.merge(_udf([3, 4])) == 0
+        assert series.times.tolist() == [5, 6]
+
+    def test_trims_to_max_bars(self):
+        series = CandleSeries()
+
+        series.merge(_udf(range(10)), max_bars=4)
+
+        assert series.times.tolist() == [6, 7, 8, 9]
+        assert len(series.volumes) == 4
+
+    def test_malformed_bars_skipped(self):
+        series = CandleSeries()
+        data = _udf([1, 2, 3])
+        data["c"] = [1.0, "bad"]
+
+        series.merge(data)
+
+        assert series.times.tolist() == [1]
+
+    def test_to_udf_latest_bars(self):
+        series = CandleSeries()
+        series.merge(_udf([1, 2, 3]))
+
+        assert series.to_udf(2) == _udf([2, 3])
+
+    def test_volume_omitted_when_absent(self):
+        series = CandleSeries()
+        series.merge(_udf([1], volume=False))
+
+        assert "v" not in series.to_udf(10)
+
+
+class TestCandleStore:
+    """Tests for incremental fetching."""
+
+    @pytest.mark.asyncio
+    async def test_cold_fetch_requests_full_window(self):
+        store = _store(_udf([NOW - HOUR * i for i in range(23, -1, -1)]))
+
+        data = await store.get("0xABC", "1h", 24)
+
+        assert _countbacks(store) == [24]
+        assert len(data["t"]) == 24
+        assert store.series("0xabc", "1h") is not None
+
+    @pytest.mark.asyncio
+    async def test_warm_fetch_requests_missing_bars_only(self):
+        window = [NOW - HOUR * i for i in range(26, 2, -1)]  # last bar 3h ago
+        store = _store(_udf(window), _udf([window[-1], NOW - 2 * HOUR, NOW - HOUR, NOW]))
+
+        await store.get("0xabc", "1h", 24)
+        data = await store.get("0xabc", "1h", 24)
+
+        assert _countbacks(store) == [24, 4]
+        assert data["t"][-1] == NOW
+        assert len(data["t"]) == 24
+
+    @pytest.mark.asyncio
+    async def test_long_gap_refetches_window(self):
+        window = [NOW - HOUR * i for i in range(100, 76, -1)]
+        fresh = [NOW - HOUR * i for i in range(23, -1, -1)]
+        store = _store(_udf(window), _udf(fresh))
+
+        await store.get("0xabc", "1h", 24)
+        data = await store.get("0xabc", "1h", 24)
+
+        assert _countbacks(store) == [24, 24]
+        assert data["t"] == fresh
+        assert len(store.series("0xabc", "1h")) == 24
+
+    @pytest.mark.asyncio
+    async def test_no_data_serves_stored_bars(self):
+        window = [NOW - HOUR * i for i in range(24, 0, -1)]
+        store = _store(_udf(window), {"s": "no_data"})
+
+        await store.get("0xabc", "1h", 24)
+        data = await store.get("0xabc", "1h", 24)
+
+        assert data == _udf(window)
+
+    @pytest.mark.asyncio
+    async def test_failed_update_serves_stored_bars_marked_stale(self):
+        window = [NOW - HOUR * i for i in range(24, 0, -1)]
+        store = _store(_udf(window), {"error": "HTTP 503"})
+
+        await store.get("0xabc", "1h", 24)
+        data = await store.get("0xabc", "1h", 24)
+
+        assert data["s"] == "ok"
+        assert data["t"] == window
+        assert data["stale"] == "HTTP 503"
+
+    @pytest.mark.asyncio
+    async def test_cold_error_returned_as_is(self):
+        store = _store({"error": "HTTP 500"})
+
+        assert await store.get("0xabc", "1h", 24) == {"error": "HTTP 500"}
+        assert store.series("0xabc", "1h") is None
+
+    @pytest.mark.asyncio
+    async def test_series_keyed_by_timeframe(self):
+        store = _store(_udf([1]), _udf([2]))
+
+        await store.get("0xabc", "1h", 24)
+        await store.get("0xabc", "4h", 24)
+
+        assert store.series("0xabc", "1h").times.tolist() == [1]
+        assert store.series("0xabc", "4h").times.tolist() == [2]
+
+    @pytest.mark.asyncio
+    async def test_least_recent_series_evicted(self):
+        store = _store(_udf([1]), _udf([1]), _udf([1]), max_series=2)
+
+        for addr in ("0xa", "0xb", "0xc"):
+            await store.get(addr, "1h", 24)
+
+        assert store.series("0xa", "1h") is None
+        assert store.series("0xc", "1h") is not None
+
+
+class TestCollectorUsesStore:
+    """Tests for StrategyDataCollector keeping candles between runs."""
+
+    @pytest.mark.asyncio
+    async def test_second_collect_fetches_only_new_bars(self):
+        from advisor import StrategyDataCollector
+
+        api = with_snapshot_hub(MagicMock())
+        api.get_positions = AsyncMock(
+            return_value={"positions": [{"tokenSymbol": "T", "tokenAddress": "0xt"}]}
+        )
+        api.get_strategies = AsyncMock(return_value=[])
+        api.get_vault = AsyncMock(return_value={})
+        api.get_eth_price = AsyncMock(return_value={})
+        api.get_tokens = AsyncMock(return_value={"items": []})
+
+        async def candles(addr, tf, limit):
+            return _udf([NOW - HOUR * i for i in range(limit - 1, -1, -1)])
+
+        api.get_candles = AsyncMock(side_effect=candles)
+        collector = StrategyDataCollector(api)
+        collector.candle_store._clock = lambda: NOW
+
+        await collector.collect()
+        api.get_candles.reset_mock()
+        data = await collector.collect()
+
+        assert {call.args[2] for call in api.get_candles.await_args_list} == {1}
+        assert len(data.candles["T"]["1h"]["t"]) == 24
+
+    @pytest.mark.asyncio
+    async def test_failed_update_recorded_as_partial(self):
+        from advisor import StrategyDataCollector
+        from advisor_memo import is_partial
+
+        api = with_snapshot_hub(MagicMock())
+        api.get_positions = AsyncMock(
+            return_value={"positions": [{"tokenSymbol": "T", "tokenAddress": "0xt"}]}
+        )
+        api.get_strategies = AsyncMock(return_value=[])
+        api.get_vault = AsyncMock(return_value={})
+        api.get_eth_price = AsyncMock(return_value={})
+        api.get_tokens = AsyncMock(return_value={"items": []})
+
+        async def candles(addr, tf, limit):
+            return _udf([NOW - HOUR * i for i in range(limit - 1, -1, -1)])
+
+        api.get_candles = AsyncMock(side_effect=candles)
+        collector = StrategyDataCollector(api)
+        collector.candle_store._clock = lambda: NOW
+        await collector.collect()
+        api.get_candles = AsyncMock(return_value={"error": "HTTP 503"})
+
+        data = await collector.collect()
+
+        assert "candles T 1h: stale (HTTP 503)" in data.errors
+        assert len(data.candles["T"]["1h"]["t"]) == 24
+        assert is_partial(data)
@@ -8,6 +8,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # =============================================================================
 # Tests for cmd_balance
 # =============================================================================
@@ -35,7 +37,7 @@ class TestCmdBalance:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_balance
@@ -70,7 +72,7 @@ class TestCmdBalance:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_balance
@@ -83,6 +85,35 @@ class TestCmdBalance:
         assert "$-150.00" in call_args
         assert "-5.00%" in call_args
 
+    @pytest.mark.asyncio
+    async def test_balance_missing_and_invalid_fields_show_zero(
+        self,
+        mock_telegram_update: MagicMock,
+        mock_telegram_context: MagicMock,
+    ) -> None:
+        """Test /balance renders missing or unparseable amounts as zero."""
+        # Given
+        mock_api_response = {"overallValueUsd": "n/a"}
+
+        with (
+            patch("commands.query.authorized", return_value=True),
+            patch("commands.query._get_api") as mock_get_api,
+        ):
+            mock_api = with_snapshot_hub(MagicMock())
+            mock_api.get_positions = AsyncMock(return_value=mock_api_response)
+            mock_get_api.return_value = mock_api
+            from commands.query import cmd_balance
+
+            # When
+            await cmd_balance(mock_telegram_update, mock_telegram_context)
+
+        # Then
+        call_args = mock_telegram_update.message.reply_text.call_args[0][0]
+        assert "ETH: 0.000000 ETH" in call_args
+        assert "Total Value: $0.00" in call_args
+        assert "Total PnL: $0.00 (0.00%)" in call_args
+        assert "?" not in call_args
+
     @pytest.mark.asyncio
     async def test_balance_api_error(
         self,
@@ -97,7 +128,7 @@ class TestCmdBalance:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_balance
@@ -143,7 +174,7 @@ class TestCmdBalance:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_balance
@@ -194,7 +225,7 @@ class TestCmdPositions:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_positions
@@ -223,7 +254,7 @@ class TestCmdPositions:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_positions
@@ -248,7 +279,7 @@ class TestCmdPositions:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_positions
@@ -293,7 +324,7 @@ class TestCmdPositions:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_positions
@@ -349,7 +380,7 @@ class TestCmdPnl:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_pnl
@@ -394,7 +425,7 @@ class TestCmdPnl:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_pnl
@@ -421,7 +452,7 @@ class TestCmdPnl:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_pnl
@@ -469,7 +500,7 @@ class TestCmdPnl:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_positions = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_pnl
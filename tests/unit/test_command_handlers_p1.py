@@ -8,6 +8,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # =============================================================================
 # Tests for cmd_activity
 # =============================================================================
@@ -402,7 +404,7 @@ class TestCmdStrategies:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_strategies = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_strategies
@@ -432,7 +434,7 @@ class TestCmdStrategies:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_strategies = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_strategies
@@ -457,7 +459,7 @@ class TestCmdStrategies:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_strategies = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_strategies
@@ -518,7 +520,7 @@ class TestCmdVault:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_vault = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_vault
@@ -562,7 +564,7 @@ class TestCmdVault:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_vault = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_vault
@@ -589,7 +591,7 @@ class TestCmdVault:
             patch("commands.query.authorized", return_value=True),
             patch("commands.query._get_api") as mock_get_api,
         ):
-            mock_api = MagicMock()
+            mock_api = with_snapshot_hub(MagicMock())
             mock_api.get_vault = AsyncMock(return_value=mock_api_response)
             mock_get_api.return_value = mock_api
             from commands.query import cmd_vault
@@ -0,0 +1,215 @@
+"""
+Unit tests for the background history page publisher
+
+Tests for: history_publisher (debounced coalescing of uploads, skipping
+unchanged content, async subprocess failures / timeouts / cancellation,
+.surgeignore-aware content hash), StrategyAdvisor requesting a publish
+instead of uploading inline, publisher status in /advisor_status
+"""
+
+import asyncio
+import json
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import advisor_history
+from history_publisher import HistoryPublisher, content_hash
+
+# Fake upload command: records each run; exit code / delay come from argv
+FAKE_UPLOAD = """
+import sys, time
+log, code, delay = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+time.sleep(delay)
+open(log, "a").write("upload\\n")
+if code:
+    sys.stderr.write("upload rejected")
+sys.exit(code)
+"""
+
+
+@pytest.fixture
+def web_dir(tmp_path, monkeypatch):
+    web_dir = tmp_path / "web"
+    web_dir.mkdir()
+    (web_dir / "index.html").write_text("<html></html>")
+    (web_dir / ".surgeignore").write_text("# state\n*.db\n*.db-wal\n*.tmp\n")
+    monkeypatch.setattr(advisor_history, "WEB_DIR", web_dir)
+    monkeypatch.setattr(advisor_history, "HISTORY_FILE", web_dir / "advisor_history.json")
+    return web_dir
+
+
+@pytest.fixture
+def upload_log(tmp_path):
+    return tmp_path / "uploads.log"
+
+
+def _publisher(upload_log, code=0, delay=0.0, **kwargs) -> HistoryPublisher:
+    cmd = [sys.executable, "-c", FAKE_UPLOAD, str(upload_log), str(code), str(delay)]
+    kwargs.setdefault("debounce", 0.05)
+    kwargs.setdefault("retry_delay", 0)
+    return HistoryPublisher(command=lambda: cmd, **kwargs)
+
+
+def _uploads(upload_log) -> int:
+    return len(upload_log.read_text().splitlines()) if upload_log.exists() else 0
+
+
+class TestContentHash:
+    """Tests for the hash of the uploaded files."""
+
+    def test_ignored_files_do_not_change_hash(self, web_dir):
+        before = content_hash(web_dir)
+        (web_dir / "advisor_history.db").write_bytes(b"sqlite")
+        (web_dir / "advisor_history.db-wal").write_bytes(b"wal")
+
+        assert content_hash(web_dir) == before
+
+    def test_uploaded_files_change_hash(self, web_dir):
+        before = content_hash(web_dir)
+        (web_dir / "advisor_history.json").write_text("[]")
+
+        assert content_hash(web_dir) != before
+
+
+class TestPublisher:
+    """Tests for debounce, dedup and subprocess handling."""
+
+    @pytest.mark.asyncio
+    async def test_burst_coalesced_into_one_upload(self, web_dir, upload_log):
+        publisher = _publisher(upload_log)
+        advisor_history.save_analysis("p", "r", [])
+
+        for _ in range(3):
+            publisher.request()
+            await asyncio.sleep(0.01)
+        assert publisher.status().startswith("3 pending")
+        await publisher.wait_idle()
+
+        assert _uploads(upload_log) == 1
+        assert publisher.uploads == 1
+        assert publisher.coalesced == 2
+        exported = json.loads(advisor_history.HISTORY_FILE.read_text())
+        assert exported["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_history_skipped(self, web_dir, upload_log):
+        publisher = _publisher(upload_log)
+        advisor_history.save_analysis("p", "r", [])
+
+        publisher.request()
+        await publisher.wait_idle()
+        publisher.request()
+        await publisher.wait_idle()
+        advisor_history.save_analysis("p2", "r", [])
+        publisher.request()
+        await publisher.wait_idle()
+
+        assert _uploads(upload_log) == 2
+        assert publisher.unchanged == 1
+
+    @pytest.mark.asyncio
+    async def test_request_during_upload_publishes_again(self, web_dir, upload_log):
+        publisher = _publisher(upload_log, delay=0.3, debounce=0)
+        advisor_history.save_analysis("p", "r", [])
+
+        publisher.request()
+        await asyncio.sleep(0.1)
+        assert publisher.publishing
+        advisor_history.save_analysis("p2", "r", [])
+        publisher.request()
+        await publisher.wait_idle()
+
+        assert _uploads(upload_log) == 2
+        assert publisher.coalesced == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_upload_retried_and_reported(self, web_dir, upload_log):
+        publisher = _publisher(upload_log, code=1, max_retries=2)
+
+        publisher.request()
+        await publisher.wait_idle()
+
+        assert _uploads(upload_log) == 2
+        assert publisher.failures == 1
+        assert "last error: upload rejected" in publisher.status()
+
+        # A failed upload is not remembered as published
+        publisher.request()
+        await publisher.wait_idle()
+        assert _uploads(upload_log) == 4
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_upload(self, web_dir, upload_log):
+        publisher = _publisher(upload_log, delay=5, timeout=0.2, max_retries=1)
+
+        publisher.request()
+        await asyncio.wait_for(publisher.wait_idle(), 3)
+
+        assert publisher.last_error == "timed out after 0.2s"
+        assert _uploads(upload_log) == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_command(self, web_dir):
+        publisher = HistoryPublisher(command=lambda: ["/nonexistent/surge"], debounce=0)
+
+        publisher.request()
+        await publisher.wait_idle()
+
+        assert publisher.last_error == "/nonexistent/surge not installed"
+
+    @pytest.mark.asyncio
+    async def test_request_does_not_block_event_loop(self, web_dir, upload_log):
+        publisher = _publisher(upload_log, delay=5, debounce=0)
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        publisher.request()
+        await asyncio.sleep(0.2)
+        assert loop.time() - started < 1
+        assert publisher.publishing
+
+        await publisher.close()
+        assert not publisher.publishing
+        assert _uploads(upload_log) == 0
+
+
+class TestAdvisorIntegration:
+    """Tests for StrategyAdvisor and /advisor_status."""
+
+    @pytest.mark.asyncio
+    async def test_analyze_requests_publish(self, monkeypatch):
+        import advisor as advisor_module
+        from advisor import CollectedData, StrategyAdvisor
+
+        monkeypatch.setattr(advisor_module.config, "ADVISOR_HISTORY_ENABLED", True)
+        llm = MagicMock()
+        llm.chat = AsyncMock(return_value='{"suggestions": []}')
+        advisor = StrategyAdvisor(llm, MagicMock())
+        advisor.collector.collect = AsyncMock(return_value=CollectedData())
+        advisor.publisher = MagicMock()
+
+        with patch("advisor_history.sync_to_surge") as sync:
+            await advisor.analyze()
+
+        advisor.publisher.request.assert_called_once()
+        sync.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_status_shows_publisher(
+        self, mock_telegram_update, mock_telegram_context, monkeypatch
+    ):
+        import commands.advisor as advisor_commands
+
+        monkeypatch.setattr(advisor_commands.config, "ADVISOR_HISTORY_ENABLED", True)
+        monitor = MagicMock(running=True, interval_seconds=7200, last_analysis=None)
+        monitor.advisor.publisher.status.return_value = "idle, last upload never"
+
+        monkeypatch.setattr(advisor_commands, "_advisor_monitor", monitor)
+        monkeypatch.setattr(advisor_commands, "is_admin", lambda user_id: True)
+
+        await advisor_commands.cmd_advisor_status(mock_telegram_update, mock_telegram_context)
+
+        text = mock_telegram_update.message.reply_text.call_args[0][0]
+        assert text.endswith("History Page: idle, last upload never")
@@ -0,0 +1,161 @@
+"""
+Unit tests for the technical indicator engine
+
+Tests for: indicators (RSI, EMA crossover, ATR, VWAP, Bollinger width, max
+drawdown; NumPy batch against the pure Python reference), indicator lines in
+format_for_llm
+"""
+
+import pytest
+
+import indicators
+import models
+from indicators import Indicators, compute, describe
+
+
+def _candles(closes, volumes=None, spread=0.0):
+    data = {
+        "s": "ok",
+        "t": list(range(len(closes))),
+        "o": list(closes),
+        "h": [c + spread for c in closes],
+        "l": [c - spread for c in closes],
+        "c": list(closes),
+    }
+    if volumes is not None:
+        data["v"] = list(volumes)
+    return models.candles(data)
+
+
+def _reference(series):
+    return {key: indicators._compute_one(candles) for key, candles in series.items()}
+
+
+@pytest.fixture(params=[compute, _reference], ids=["numpy", "reference"])
+def engine(request):
+    """Run each test against the batch engine and the reference definitions."""
+    return request.param
+
+
+class TestIndicators:
+    """Tests for indicator definitions."""
+
+    def test_rising_series(self, engine):
+        ind = engine({"a": _candles(range(1, 31))})["a"]
+
+        assert ind.rsi == 100
+        assert ind.ema_fast > ind.ema_slow
+        assert ind.ema_cross is None
+        assert ind.max_drawdown_pct == 0
+
+    def test_flat_series(self, engine):
+        ind = engine({"a": _candles([5.0] * 24)})["a"]
+
+        assert ind.rsi == 50
+        assert ind.atr_pct == 0
+        assert ind.bb_width_pct == 0
+
+    def test_ema_cross_on_last_bar(self, engine):
+        result = engine(
+            {"up": _candles([10.0] * 24 + [20.0]), "down": _candles([10.0] * 24 + [5.0])}
+        )
+
+        assert result["up"].ema_cross == "up"
+        assert result["down"].ema_cross == "down"
+
+    def test_atr_relative_to_price(self, engine):
+        ind = engine({"a": _candles([100.0] * 20, spread=1.0)})["a"]
+
+        assert ind.atr_pct == pytest.approx(2.0)
+
+    def test_vwap_weights_typical_price(self, engine):
+        ind = engine({"a": _candles([1.0, 2.0], volumes=[1.0, 3.0])})["a"]
+
+        assert ind.vwap == pytest.approx(1.75)
+
+    def test_vwap_needs_volume(self, engine):
+        result = engine({"none": _candles([1.0, 2.0]), "zero": _candles([1.0, 2.0], [0, 0])})
+
+        assert result["none"].vwap is None
+        assert result["zero"].vwap is None
+
+    def test_max_drawdown(self, engine):
+        ind = engine({"a": _candles([10.0, 5.0, 8.0, 2.0, 12.0])})["a"]
+
+        assert ind.max_drawdown_pct == pytest.approx(80.0)
+
+    def test_short_series_leaves_windowed_indicators_out(self, engine):
+        ind = engine({"1d": _candles([1.0, 2.0, 3.0, 2.0, 4.0, 5.0, 4.0], [1] * 7)})["1d"]
+
+        assert ind.rsi is None
+        assert ind.ema_fast is None
+        assert ind.atr_pct is None
+        assert ind.bb_width_pct is None
+        assert ind.vwap is not None
+        assert ind.max_drawdown_pct is not None
+
+    def test_empty_series(self, engine):
+        assert engine({"a": _candles([])})["a"] == Indicators()
+
+    def test_mixed_lengths_keep_keys(self, engine):
+        series = {("A", "1h"): _candles(range(1, 25)), ("A", "1d"): _candles(range(1, 8))}
+
+        assert list(engine(series)) == [("A", "1h"), ("A", "1d")]
+
+
+class TestImplementationsAgree:
+    """NumPy batch results match the pure Python definitions."""
+
+    def test_same_values(self):
+        closes = [100 + (i * 7919 % 23) - 11 + i * 0.5 for i in range(24)]
+        series = {
+            "a": _candles(closes, [(i * 31) % 17 for i in range(24)], spread=2.0),
+            "b": _candles(closes[::-1], spread=0.5),
+        }
+
+        batched = compute(series)
+        expected = _reference(series)
+
+        for key in series:
+            for field in Indicators.__slots__:
+                value = getattr(batched[key], field)
+                assert value == pytest.approx(getattr(expected[key], field)), field
+
+
+class TestPromptLines:
+    """Tests for indicator lines in the LLM prompt."""
+
+    def test_describe(self):
+        ind = Indicators(rsi=75.0, ema_fast=2.0, ema_slow=1.0, ema_cross="up", vwap=1.5)
+
+        lines = describe(ind, lambda v: f"{v:.1f}")
+
+        assert lines == [
+            "RSI(14): 75.0 (Overbought)",
+            "EMA9/EMA21: 2.0 / 1.0 (fast above slow, crossed up on last candle)",
+            "VWAP: 1.5",
+        ]
+
+    def test_format_for_llm_includes_indicators(self):
+        from unittest.mock import MagicMock
+
+        from advisor import CollectedData, StrategyDataCollector
+
+        candles = {
+            "s": "ok",
+            "t": list(range(24)),
+            "o": [1.0] * 24,
+            "h": [1.1] * 24,
+            "l": [0.9] * 24,
+            "c": [1.0 + i / 100 for i in range(24)],
+            "v": [100.0] * 24,
+        }
+        data = CollectedData(
+            candles={"ABC": {"1h": candles, "1d": {}}}, collected_at="2026-01-01 00:00:00"
+        )
+
+        text = StrategyDataCollector(MagicMock()).format_for_llm(data)
+
+        assert "  RSI(14): 100.0 (Overbought)" in text
+        assert "  Max Drawdown: 0.00%" in text
+        assert "  1d: No data" in text
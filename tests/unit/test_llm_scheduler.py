@@ -0,0 +1,320 @@
+"""
+Unit tests for the LLM job scheduler
+
+Tests for: llm_scheduler (bounded concurrency, priority lanes, dedup and
+promotion of queued jobs, queue statistics), advisor runs sharing the queue,
+queue status in /advisor_status
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from llm_scheduler import LLMScheduler
+from tests.support.helpers import with_snapshot_hub
+from utils.rate_limiter import BACKGROUND, INTERACTIVE, use_background_priority
+
+
+class Gate:
+    """Jobs that block until released and record their start order."""
+
+    def __init__(self):
+        self.started: list[str] = []
+        self.release = asyncio.Event()
+        self.current = 0
+        self.peak = 0
+
+    def job(self, name: str):
+        async def run():
+            self.started.append(name)
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            try:
+                await self.release.wait()
+                return f"result {name}"
+            finally:
+                self.current -= 1
+
+        return run
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestScheduling:
+    """Tests for concurrency and ordering."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self):
+        scheduler = LLMScheduler(MagicMock(), max_concurrent=2)
+        gate = Gate()
+
+        tasks = [asyncio.create_task(scheduler.submit(n, gate.job(n))) for n in "abcd"]
+        await _settle()
+        assert scheduler.running == 2
+        assert scheduler.queue_depth == 2
+        gate.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert gate.peak == 2
+        assert results == ["result a", "result b", "result c", "result d"]
+        assert scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_lane_first(self):
+        scheduler = LLMScheduler(MagicMock())
+        gate = Gate()
+
+        tasks = [asyncio.create_task(scheduler.submit("busy", gate.job("busy")))]
+        await _settle()
+        tasks.append(asyncio.create_task(scheduler.submit("p1", gate.job("p1"), BACKGROUND)))
+        tasks.append(asyncio.create_task(scheduler.submit("p2", gate.job("p2"), BACKGROUND)))
+        tasks.append(asyncio.create_task(scheduler.submit("m", gate.job("m"), INTERACTIVE)))
+        await _settle()
+        gate.release.set()
+        await asyncio.gather(*tasks)
+
+        assert gate.started == ["busy", "m", "p1", "p2"]
+
+    @pytest.mark.asyncio
+    async def test_priority_from_context(self):
+        scheduler = LLMScheduler(MagicMock())
+        gate = Gate()
+
+        async def background_submit(name):
+            use_background_priority()
+            return await scheduler.submit(name, gate.job(name))
+
+        tasks = [asyncio.create_task(scheduler.submit("busy", gate.job("busy")))]
+        await _settle()
+        tasks.append(asyncio.create_task(background_submit("periodic")))
+        await _settle()
+        tasks.append(asyncio.create_task(scheduler.submit("manual", gate.job("manual"))))
+        await _settle()
+        gate.release.set()
+        await asyncio.gather(*tasks)
+
+        assert gate.started == ["busy", "manual", "periodic"]
+
+    @pytest.mark.asyncio
+    async def test_failed_job_frees_slot(self):
+        scheduler = LLMScheduler(MagicMock())
+
+        async def boom():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            await scheduler.submit("a", boom)
+
+        assert await scheduler.submit("b", AsyncMock(return_value="ok")) == "ok"
+
+
+class TestDeduplication:
+    """Tests for sharing queued / running jobs."""
+
+    @pytest.mark.asyncio
+    async def test_identical_prompts_share_one_call(self):
+        llm = MagicMock()
+        calls = 0
+
+        async def chat(system, user):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "response"
+
+        llm.chat = chat
+        scheduler = LLMScheduler(llm)
+
+        results = await asyncio.gather(
+            scheduler.chat("sys", "data"), scheduler.chat("sys", "data"), scheduler.chat("sys", "x")
+        )
+
+        assert results == ["response"] * 3
+        assert calls == 2
+        assert scheduler.stats()["deduplicated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_interactive_duplicate_promotes_queued_job(self):
+        scheduler = LLMScheduler(MagicMock())
+        gate = Gate()
+
+        tasks = [asyncio.create_task(scheduler.submit("busy", gate.job("busy")))]
+        await _settle()
+        tasks.append(asyncio.create_task(scheduler.submit("p1", gate.job("p1"), BACKGROUND)))
+        tasks.append(asyncio.create_task(scheduler.submit("p2", gate.job("p2"), BACKGROUND)))
+        await _settle()
+        tasks.append(asyncio.create_task(scheduler.submit("p2", gate.job("dup"), INTERACTIVE)))
+        await _settle()
+        gate.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert gate.started == ["busy", "p2", "p1"]
+        assert results[2] == results[3] == "result p2"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_shared_job(self):
+        scheduler = LLMScheduler(MagicMock())
+        gate = Gate()
+
+        first = asyncio.create_task(scheduler.submit("k", gate.job("k")))
+        second = asyncio.create_task(scheduler.submit("k", gate.job("k")))
+        await _settle()
+        first.cancel()
+        gate.release.set()
+
+        assert await second == "result k"
+
+    @pytest.mark.asyncio
+    async def test_streaming_passes_progress(self):
+        llm = MagicMock()
+        llm.chat_streaming = AsyncMock(return_value="streamed")
+        on_progress = AsyncMock()
+
+        result = await LLMScheduler(llm).chat("sys", "data", on_progress=on_progress)
+
+        assert result == "streamed"
+        llm.chat_streaming.assert_awaited_once_with("sys", "data", on_progress=on_progress)
+
+
+class TestStats:
+    """Tests for queue depth and wait time."""
+
+    @pytest.mark.asyncio
+    async def test_depth_and_wait_tracked(self):
+        now = [100.0]
+        scheduler = LLMScheduler(MagicMock(), clock=lambda: now[0])
+        gate = Gate()
+
+        tasks = [asyncio.create_task(scheduler.submit(n, gate.job(n))) for n in "abc"]
+        await _settle()
+        now[0] += 4
+        gate.release.set()
+        await asyncio.gather(*tasks)
+
+        stats = scheduler.stats()
+        assert stats["max_depth"] == 2
+        assert stats["max_wait"] == 4
+        assert stats["avg_wait"] == pytest.approx(8 / 3)
+        assert scheduler.status() == (
+            "0/1 running, 0 queued (peak 2), wait avg 2.7s / max 4.0s, 0 deduplicated"
+        )
+
+
+class TestAdvisorSharesQueue:
+    """Tests for StrategyAdvisor runs going through the scheduler."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_one_llm_call(self):
+        from advisor import CollectedData, StrategyAdvisor
+
+        llm = MagicMock()
+        release = asyncio.Event()
+
+        async def chat(system, user):
+            await release.wait()
+            return json.dumps({"suggestions": [{"action": "add", "content": "x"}]})
+
+        llm.chat = AsyncMock(side_effect=chat)
+        advisor = StrategyAdvisor(llm, MagicMock())
+        advisor.collector.collect = AsyncMock(return_value=CollectedData())
+
+        with patch("advisor_history.save_analysis", return_value="rec1"):
+            runs = [asyncio.create_task(advisor.analyze()) for _ in range(3)]
+            await _settle()
+            release.set()
+            results = await asyncio.gather(*runs)
+
+        llm.chat.assert_awaited_once()
+        assert all(len(r) == 1 for r in results)
+
+    @staticmethod
+    def _advisor(release: asyncio.Event):
+        from advisor import StrategyAdvisor
+
+        candles = {"s": "ok", "t": [1, 2], "o": [1, 1], "h": [1, 1], "l": [1, 1], "c": [1, 2]}
+        api = with_snapshot_hub(MagicMock())
+        api.get_positions = AsyncMock(
+            return_value={
+                "positions": [
+                    {"tokenSymbol": "ABC", "tokenAddress": "0xabc", "currentValueUsd": "100"}
+                ]
+            }
+        )
+        api.get_strategies = AsyncMock(return_value=[])
+        api.get_vault = AsyncMock(return_value={"paused": False})
+        api.get_eth_price = AsyncMock(return_value={"priceUsd": "3000"})
+        api.get_tokens = AsyncMock(return_value={"items": [{"symbol": "ABC"}]})
+        api.get_candles = AsyncMock(return_value=candles)
+
+        async def chat(system, user):
+            await release.wait()
+            return json.dumps({"suggestions": [{"action": "add", "content": "x"}]})
+
+        llm = MagicMock()
+        llm.chat = AsyncMock(side_effect=chat)
+        advisor = StrategyAdvisor(llm, api)
+        prompts = []
+        format_for_llm = advisor.collector.format_for_llm
+
+        def record_prompt(data):
+            prompts.append(format_for_llm(data))
+            return prompts[-1]
+
+        advisor.collector.format_for_llm = record_prompt
+        return advisor, api, llm, prompts
+
+    @pytest.mark.asyncio
+    async def test_separate_collections_join_one_job(self):
+        release = asyncio.Event()
+        advisor, api, llm, prompts = self._advisor(release)
+
+        with patch("advisor_history.save_analysis", return_value="rec1"):
+            first = asyncio.create_task(advisor.analyze())
+            while not llm.chat.await_count:
+                await asyncio.sleep(0.001)
+            second = asyncio.create_task(advisor.analyze())
+            while len(prompts) < 2:
+                await asyncio.sleep(0.001)
+            await _settle()
+            release.set()
+            results = await asyncio.gather(first, second)
+
+        assert api.get_tokens.await_count == 2  # two real collections
+        assert prompts[0] != prompts[1]  # "Collected at" differs
+        llm.chat.assert_awaited_once()
+        assert advisor.scheduler.deduplicated == 1
+        assert all(len(r) == 1 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_share_one_collection(self):
+        release = asyncio.Event()
+        release.set()
+        advisor, api, llm, _ = self._advisor(release)
+
+        with patch("advisor_history.save_analysis", return_value="rec1"):
+            await asyncio.gather(advisor.analyze(), advisor.analyze())
+
+        assert api.get_tokens.await_count == 1
+        assert api.get_positions.await_count == 1
+        llm.chat.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_status_shows_queue(self, mock_telegram_update, mock_telegram_context):
+        from commands.advisor import cmd_advisor_status
+
+        monitor = MagicMock(running=True, interval_seconds=7200, last_analysis=None)
+        monitor.advisor.scheduler.status.return_value = "1/1 running, 2 queued"
+
+        with (
+            patch("commands.advisor._advisor_monitor", monitor),
+            patch("commands.advisor.is_admin", return_value=True),
+        ):
+            await cmd_advisor_status(mock_telegram_update, mock_telegram_context)
+
+        text = mock_telegram_update.message.reply_text.call_args[0][0]
+        assert "LLM Queue: 1/1 running, 2 queued" in text
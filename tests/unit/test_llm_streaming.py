@@ -0,0 +1,241 @@
+"""
+Unit tests for streaming chat completions
+
+Tests for: LLMClient.stream_chat / chat_streaming against a local SSE server
+(incremental deltas, early stop on complete JSON, first-token and total
+deadlines, HTTP errors), json_object_complete, streamed /advisor_analyze
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from llm import LLMClient, LLMConfig, json_object_complete
+
+SUGGESTIONS = '{"suggestions": [{"action": "add", "content": "Buy {dips}"}]}'
+
+
+def _chunk(content: str) -> bytes:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': content}}]})}\n\n".encode()
+
+
+class SSEServer:
+    """Local stand-in for an OpenAI-compatible streaming endpoint."""
+
+    def __init__(self):
+        self.script: list = []  # bytes to send, or float seconds to pause
+        self.status = 200
+        self.requests: list[dict] = []
+        self.disconnected = asyncio.Event()
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append(await request.json())
+        if self.status != 200:
+            return web.Response(status=self.status, text="nope")
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        try:
+            for step in self.script:
+                if isinstance(step, float):
+                    await asyncio.sleep(step)
+                else:
+                    await resp.write(step)
+        except (ConnectionResetError, asyncio.CancelledError):
+            self.disconnected.set()
+            raise
+        return resp
+
+
+@pytest.fixture
+async def sse_server():
+    server = SSEServer()
+    app = web.Application()
+    app.router.add_post("/chat/completions", server.handle)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    server.base_url = str(test_server.make_url("")).rstrip("/")
+    yield server
+    await test_server.close()
+
+
+@pytest.fixture
+async def client(sse_server):
+    client = LLMClient(
+        LLMConfig(
+            api_key="key",
+            base_url=sse_server.base_url,
+            model="glm-4",
+            timeout=2,
+            first_token_timeout=1,
+        )
+    )
+    yield client
+    await client.close()
+
+
+class TestJsonObjectComplete:
+    """Tests for detecting the end of the suggestions JSON."""
+
+    def test_incomplete(self):
+        assert not json_object_complete(SUGGESTIONS[:-1])
+
+    def test_complete_with_braces_in_strings(self):
+        assert json_object_complete(SUGGESTIONS)
+
+    def test_prose_and_code_fence(self):
+        text = 'Analysis {brief}: "quote" here\n```json\n' + SUGGESTIONS
+        assert json_object_complete(text)
+        assert not json_object_complete(text[:-2])
+
+    def test_other_objects_ignored(self):
+        assert not json_object_complete('{"note": "x"} and then {"sugg')
+
+
+class TestStreamChat:
+    """Tests for reading the SSE stream."""
+
+    @pytest.mark.asyncio
+    async def test_yields_deltas(self, client, sse_server):
+        sse_server.script = [
+            b": keep-alive\n\n",
+            _chunk("Hel"),
+            b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n',
+            _chunk("lo"),
+            b"data: [DONE]\n\n",
+        ]
+
+        deltas = [d async for d in client.stream_chat("sys", "hi")]
+
+        assert deltas == ["Hel", "lo"]
+        assert sse_server.requests[0]["stream"] is True
+        assert sse_server.requests[0]["messages"][1] == {"role": "user", "content": "hi"}
+
+    @pytest.mark.asyncio
+    async def test_chat_streaming_stops_at_closing_brace(self, client, sse_server):
+        half = len(SUGGESTIONS) // 2
+        sse_server.script = [
+            _chunk(SUGGESTIONS[:half]),
+            _chunk(SUGGESTIONS[half:]),
+            _chunk(" Let me also explain"),
+            30.0,
+        ]
+        progress = []
+
+        async def on_progress(text):
+            progress.append(len(text))
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        text = await client.chat_streaming("sys", "hi", on_progress=on_progress)
+
+        assert text == SUGGESTIONS
+        assert loop.time() - started < 1
+        assert progress == [half, len(SUGGESTIONS)]
+        await asyncio.wait_for(sse_server.disconnected.wait(), 1)
+
+    @pytest.mark.asyncio
+    async def test_progress_errors_ignored(self, client, sse_server):
+        sse_server.script = [_chunk(SUGGESTIONS)]
+
+        text = await client.chat_streaming(
+            "sys", "hi", on_progress=AsyncMock(side_effect=RuntimeError("edit failed"))
+        )
+
+        assert text == SUGGESTIONS
+
+    @pytest.mark.asyncio
+    async def test_first_token_deadline(self, client, sse_server):
+        client.config.first_token_timeout = 0.2
+        sse_server.script = [b": waiting\n\n", 1.0, _chunk("late")]
+
+        text = await client.chat_streaming("sys", "hi")
+
+        assert text.startswith("Error: No response from LLM within")
+
+    @pytest.mark.asyncio
+    async def test_total_deadline(self, client, sse_server):
+        client.config.timeout = 0.5
+        sse_server.script = [_chunk("a"), 0.3, _chunk("b"), 0.3, _chunk("c")]
+
+        text = await client.chat_streaming("sys", "hi", stop=None)
+
+        assert text.startswith("Error: LLM request timed out")
+
+    @pytest.mark.asyncio
+    async def test_stream_without_stop_reads_to_done(self, client, sse_server):
+        sse_server.script = [_chunk("plain "), _chunk("text"), b"data: [DONE]\n\n"]
+
+        assert await client.chat_streaming("sys", "hi") == "plain text"
+
+    @pytest.mark.asyncio
+    async def test_http_error(self, client, sse_server):
+        sse_server.status = 429
+
+        text = await client.chat_streaming("sys", "hi")
+
+        assert text == "Error: LLM API rate limit exceeded"
+
+    @pytest.mark.asyncio
+    async def test_empty_stream(self, client, sse_server):
+        sse_server.script = [b"data: [DONE]\n\n"]
+
+        assert await client.chat_streaming("sys", "hi") == "Error: Empty response from LLM"
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key(self, client):
+        client.config.api_key = ""
+
+        assert await client.chat_streaming("sys", "hi") == "Error: LLM API key not configured"
+
+
+class TestStreamedAnalysis:
+    """Tests for the advisor using the streamed completion."""
+
+    @pytest.mark.asyncio
+    async def test_analyze_streams_when_watched(self):
+        from advisor import CollectedData, StrategyAdvisor
+
+        llm = MagicMock()
+        llm.chat = AsyncMock()
+        llm.chat_streaming = AsyncMock(return_value=SUGGESTIONS)
+        advisor = StrategyAdvisor(llm, MagicMock())
+        advisor.collector.collect = AsyncMock(return_value=CollectedData(errors=["partial"]))
+        on_progress = AsyncMock()
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("advisor_history.save_analysis", lambda **kwargs: "rec1")
+            suggestions = await advisor.analyze(on_progress=on_progress)
+
+        assert suggestions[0].content == "Buy {dips}"
+        llm.chat.assert_not_awaited()
+        assert llm.chat_streaming.await_args.kwargs["on_progress"] is on_progress
+
+    @pytest.mark.asyncio
+    async def test_manual_analyze_shows_progress(
+        self, mock_telegram_update, mock_telegram_context, monkeypatch
+    ):
+        import commands.advisor as advisor_commands
+
+        status_msg = AsyncMock()
+        mock_telegram_update.message.reply_text = AsyncMock(return_value=status_msg)
+        monitor = MagicMock()
+
+        async def analyze(on_progress=None):
+            await on_progress("x" * 10)
+            return []
+
+        monitor.advisor.analyze = analyze
+        monkeypatch.setattr(advisor_commands, "_advisor_monitor", monitor)
+        monkeypatch.setattr(advisor_commands, "is_admin", lambda user_id: True)
+        monkeypatch.setattr(advisor_commands, "PROGRESS_EDIT_INTERVAL", 0)
+        monkeypatch.setattr(advisor_commands, "_last_manual_analysis", {})
+
+        await advisor_commands.cmd_advisor_analyze(mock_telegram_update, mock_telegram_context)
+
+        edits = [call.args[0] for call in status_msg.edit_text.await_args_list]
+        assert edits[0] == "Analyzing your portfolio... (10 chars received)"
+        assert edits[-1].startswith("No suggestions")
@@ -0,0 +1,188 @@
+"""
+Unit tests for typed API response models
+
+Tests for: models (PositionsSnapshot, Activity, Swap, Strategy, Candles,
+memoization on TerminalAPI responses)
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+import models
+from api import ApiList, _tag_response
+
+
+@pytest.fixture
+def positions_payload():
+    return {
+        "ethBalance": "1500000000000000000",
+        "overallValueUsd": "5000.50",
+        "overallPnlUsd": "-120.25",
+        "overallPnlPercent": "-2.4",
+        "positions": [
+            {
+                "tokenSymbol": "PEPE",
+                "tokenAddress": "0xpepe",
+                "currentValueUsd": "3000",
+                "totalPnlUsd": "100",
+                "totalPnlPercent": "3.5",
+                "realizedPnlUsd": "40",
+                "unrealizedPnlUsd": "60",
+            },
+            {"symbol": "WIF", "balance": "2000", "pnlUsd": "-5"},
+        ],
+    }
+
+
+class TestToFloat:
+    """Tests for numeric parsing."""
+
+    def test_decimal_string(self):
+        assert models.to_float("1.5") == 1.5
+
+    def test_missing_uses_default(self):
+        assert models.to_float(None) == 0.0
+        assert models.to_float(None, default=None) is None
+
+    def test_invalid_is_none(self):
+        assert models.to_float("N/A") is None
+
+
+class TestPositionsSnapshot:
+    """Tests for /positions decoding."""
+
+    def test_overall_fields_parsed(self, positions_payload):
+        snapshot = models.positions_snapshot(positions_payload)
+
+        assert snapshot.eth_balance_wei == 1.5e18
+        assert snapshot.overall_value_usd == 5000.5
+        assert snapshot.overall_pnl_usd == -120.25
+        assert snapshot.overall_pnl_percent == -2.4
+
+    def test_position_fallbacks(self, positions_payload):
+        pepe, wif = models.positions_snapshot(positions_payload).positions
+
+        assert (pepe.symbol, pepe.token_address, pepe.value_usd) == ("PEPE", "0xpepe", 3000.0)
+        assert pepe.unrealized_pnl_usd == 60.0
+        assert (wif.symbol, wif.value_usd, wif.unrealized_pnl_usd) == ("WIF", 2000.0, -5.0)
+        assert wif.realized_pnl_usd == 0.0
+
+    def test_total_pnl_fallback(self):
+        snapshot = models.positions_snapshot({"totalPnlUsd": "7"})
+
+        assert snapshot.overall_pnl_usd == 7.0
+        assert snapshot.positions == ()
+
+    def test_non_list_positions_ignored(self):
+        assert models.positions_snapshot({"positions": "bad"}).positions == ()
+
+    def test_slots_only(self, positions_payload):
+        position = models.positions_snapshot(positions_payload).positions[0]
+
+        with pytest.raises(AttributeError):
+            position.extra = 1
+
+
+class TestActivityAndSwaps:
+    """Tests for /activity and /swaps decoding."""
+
+    def test_swap_activity(self):
+        (activity,) = models.activities(
+            {
+                "items": [
+                    {
+                        "id": "0xabc",
+                        "type": "swap",
+                        "timestamp": 1700000000,
+                        "swap": {
+                            "side": "buy",
+                            "tokenSymbol": "PEPE",
+                            "ethAmount": "500000000000000000",
+                            "priceUsd": "0.00001",
+                        },
+                    }
+                ]
+            }
+        )
+
+        assert activity.swap.side == "BUY"
+        assert activity.swap.eth_amount_wei == 5e17
+        assert activity.swap.price_usd == 0.00001
+        assert activity.amount_wei == 0.0
+
+    def test_deposit_amount(self):
+        (activity,) = models.activities(
+            {"items": [{"type": "deposit", "deposit": {"amountWei": "1000"}}]}
+        )
+
+        assert activity.swap is None
+        assert activity.amount_wei == 1000.0
+
+    def test_swaps_list(self):
+        items = models.swaps({"items": [{"side": "sell", "effectivePriceUsd": "3500"}]})
+
+        assert items[0].side == "SELL"
+        assert items[0].price_usd == 3500.0
+
+
+class TestStrategiesAndCandles:
+    """Tests for strategies and candle decoding."""
+
+    def test_strategy_fields(self):
+        (live, expired) = models.strategies(
+            [
+                {"strategyId": 3, "content": "Buy dips", "strategyPriority": 2},
+                {"id": 4, "content": "Old", "expiry": 100},
+            ]
+        )
+
+        assert (live.id, live.priority, live.is_live(1000)) == (3, 2, True)
+        assert (expired.id, expired.priority, expired.is_live(1000)) == (4, None, False)
+
+    def test_strategies_from_dict(self):
+        assert len(models.strategies({"items": [{"active": False}]})) == 1
+
+    def test_candles_columns(self):
+        series = models.candles(
+            {"s": "ok", "t": [1, 2], "o": [1, "2"], "h": [3, 4], "l": [0, 1], "c": [2, None]}
+        )
+
+        assert series.closes == (2.0, 0.0)
+        assert series.opens == (1.0, 2.0)
+        assert series.volumes == ()
+        assert len(series) == 2
+
+
+class TestMemoization:
+    """Tests for decoding once per API response."""
+
+    def test_model_cached_on_api_response(self, positions_payload):
+        response = _tag_response(positions_payload, True, 1)
+
+        with patch.object(models, "PositionsSnapshot", wraps=models.PositionsSnapshot) as parse:
+            first = models.positions_snapshot(response)
+            second = models.positions_snapshot(response)
+
+        assert first is second
+        assert parse.call_count == 1
+
+    def test_different_parser_not_reused(self):
+        response = _tag_response({"items": []}, True, 1)
+
+        assert models.activities(response) == ()
+        assert models.swaps(response) == ()
+        assert response.model[0] is models._parse_swaps
+
+    def test_plain_dict_parsed_each_time(self, positions_payload):
+        first = models.positions_snapshot(positions_payload)
+        second = models.positions_snapshot(positions_payload)
+
+        assert first is not second
+
+    def test_list_responses_supported(self):
+        response = _tag_response([{"strategyId": 1}], True, 1)
+
+        assert isinstance(response, ApiList)
+        assert models.strategies(response)[0].id == 1
+        assert response.model is not None
@@ -0,0 +1,140 @@
+"""
+Unit tests for ActivityMonitor adaptive polling
+
+Tests for: ActivityMonitor._update_cadence (tighten after swaps, exponential
+back-off when idle), POLL_INTERVAL_MIN / POLL_INTERVAL_MAX bounds,
+cadence shown in /monitor_status
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+def _monitor():
+    from monitor import ActivityMonitor
+
+    return ActivityMonitor(MagicMock(), AsyncMock())
+
+
+class TestCadence:
+    """Tests for interval adjustment."""
+
+    @patch.dict("os.environ", {"POLL_INTERVAL": "30"})
+    def test_starts_at_poll_interval(self):
+        monitor = _monitor()
+
+        assert monitor.current_interval == 30
+
+    @patch.dict("os.environ", {"POLL_INTERVAL": "30", "POLL_INTERVAL_MAX": "100"})
+    def test_relaxes_exponentially_up_to_max(self):
+        monitor = _monitor()
+
+        intervals = []
+        for _ in range(5):
+            monitor._update_cadence(new_swaps=False)
+            intervals.append(monitor.current_interval)
+
+        assert intervals == [45, 67.5, 100, 100, 100]
+        assert monitor.quiet_polls == 5
+
+    @patch.dict("os.environ", {"POLL_INTERVAL": "60", "POLL_INTERVAL_MIN": "15"})
+    def test_tightens_after_swaps(self):
+        monitor = _monitor()
+        for _ in range(3):
+            monitor._update_cadence(new_swaps=False)
+
+        monitor._update_cadence(new_swaps=True)
+
+        assert monitor.current_interval == 15
+        assert monitor.quiet_polls == 0
+
+    @patch.dict("os.environ", {"POLL_INTERVAL": "10", "POLL_INTERVAL_MIN": "30"})
+    def test_burst_never_slower_than_base(self):
+        monitor = _monitor()
+
+        monitor._update_cadence(new_swaps=True)
+
+        assert monitor.current_interval == 10
+
+    @patch.dict("os.environ", {"POLL_INTERVAL_MIN": "1", "POLL_INTERVAL_MAX": "bad"})
+    def test_invalid_bounds(self):
+        monitor = _monitor()
+
+        assert monitor.min_interval == 5
+        assert monitor.max_interval == 300
+
+    @patch.dict("os.environ", {"POLL_INTERVAL_MIN": "60", "POLL_INTERVAL_MAX": "20"})
+    def test_max_not_below_min(self):
+        assert _monitor().max_interval == 60
+
+    @patch.dict("os.environ", {"POLL_INTERVAL": "30", "POLL_INTERVAL_MAX": "300"})
+    def test_cadence_status(self):
+        monitor = _monitor()
+        monitor._update_cadence(new_swaps=False)
+
+        assert monitor.cadence_status() == "45s (range 10-300s, quiet polls: 1)"
+
+
+class TestLoopCadence:
+    """Tests for the poll loop sleeping the adaptive interval."""
+
+    @pytest.mark.asyncio
+    @patch.dict("os.environ", {"POLL_INTERVAL": "20", "POLL_INTERVAL_MIN": "10"})
+    async def test_sleep_follows_activity(self):
+        from monitor import ActivityMonitor
+
+        pages = iter(
+            [
+                {"items": []},
+                {"items": [{"cursor": "c1", "type": "swap"}]},
+                {"items": [{"cursor": "c1", "type": "swap"}]},
+                {"error": "HTTP 500"},
+            ]
+        )
+        api = MagicMock()
+        api.vault = "0xvault"
+
+        async def get_activity(limit=10, cursor=None):
+            page = next(pages, None)
+            if page is None:
+                monitor.stop()
+                return {"items": []}
+            return page
+
+        api.get_activity = get_activity
+        monitor = ActivityMonitor(api, AsyncMock())
+        monitor._preload_existing_activities = AsyncMock()
+        sleep = AsyncMock()
+
+        with patch("monitor.asyncio.sleep", sleep):
+            await asyncio.create_task(monitor.start())
+
+        slept = [call.args[0] for call in sleep.await_args_list]
+        # quiet -> swap -> quiet -> error keeps cadence -> quiet
+        assert slept == [30, 10, 15, 15, 22.5]
+
+
+class TestMonitorStatusCadence:
+    """Tests for cadence in /monitor_status."""
+
+    @pytest.mark.asyncio
+    async def test_status_shows_cadence(self, mock_telegram_update, mock_telegram_context):
+        from commands.monitor import cmd_monitor_status
+
+        monitor = MagicMock(running=True, poll_interval=30, seen_ids=set())
+        monitor.cadence_status.return_value = "45s (range 10-300s, quiet polls: 1)"
+        api = MagicMock()
+        api.get_stats.return_value = {"requests": 0, "upstream": 0, "coalesced": 0}
+        api.get_breaker_states.return_value = {}
+
+        with (
+            patch("commands.monitor._monitor_instance", monitor),
+            patch("commands.monitor.is_admin", return_value=True),
+            patch("commands.monitor._get_api", return_value=api),
+        ):
+            await cmd_monitor_status(mock_telegram_update, mock_telegram_context)
+
+        text = mock_telegram_update.message.reply_text.call_args[0][0]
+        assert "Current Cadence: 45s (range 10-300s, quiet polls: 1)" in text
@@ -0,0 +1,199 @@
+"""
+Unit tests for cursor-based activity ingestion
+
+Tests for: ActivityMonitor._collect_since_mark (high-water mark, catch-up
+paging, aborting on page errors), TerminalAPI.get_activity cursor parameter
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+def _items(start: int, stop: int) -> list[dict]:
+    """Activities newest first, cursors c<start-1> .. c<stop>."""
+    return [{"cursor": f"c{i}", "type": "swap"} for i in range(start - 1, stop - 1, -1)]
+
+
+class FakeFeed:
+    """Activity endpoint over cursors c0..c<total-1>, newest first."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.calls: list[tuple[int, str | None]] = []
+        self.fail_on_cursor: str | None = None
+
+    async def __call__(self, limit: int = 10, cursor: str | None = None) -> dict:
+        self.calls.append((limit, cursor))
+        if cursor is not None and cursor == self.fail_on_cursor:
+            return {"error": "HTTP 500"}
+        top = self.total if cursor is None else int(cursor[1:])
+        return {"items": _items(top, max(top - limit, 0))}
+
+
+@pytest.fixture
+def monitor():
+    from monitor import ActivityMonitor
+
+    return ActivityMonitor(MagicMock(), AsyncMock())
+
+
+class TestCollectSinceMark:
+    """Tests for paging back to the last processed cursor."""
+
+    @pytest.mark.asyncio
+    async def test_single_page_stops_at_mark(self, monitor):
+        feed = FakeFeed(total=20)
+        monitor.api.get_activity = feed
+        monitor._last_cursor = "c16"
+
+        collected = await monitor._collect_since_mark(await feed(10))
+
+        assert [a["cursor"] for a in collected] == ["c19", "c18", "c17"]
+        assert len(feed.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_catches_up_across_pages(self, monitor):
+        feed = FakeFeed(total=200)
+        monitor.api.get_activity = feed
+        monitor._last_cursor = "c100"
+
+        collected = await monitor._collect_since_mark(await feed(10))
+
+        assert len(collected) == 99
+        assert collected[-1]["cursor"] == "c101"
+        assert feed.calls[1] == (monitor.CATCHUP_PAGE_SIZE, "c190")
+
+    @pytest.mark.asyncio
+    async def test_stops_at_seen_id(self, monitor):
+        feed = FakeFeed(total=30)
+        monitor.api.get_activity = feed
+        monitor.seen_ids.add("c25")
+
+        collected = await monitor._collect_since_mark(await feed(10))
+
+        assert [a["cursor"] for a in collected] == ["c29", "c28", "c27", "c26"]
+
+    @pytest.mark.asyncio
+    async def test_first_run_without_mark_takes_one_page(self, monitor):
+        feed = FakeFeed(total=100)
+        monitor.api.get_activity = feed
+
+        collected = await monitor._collect_since_mark(await feed(10))
+
+        assert len(collected) == 10
+        assert len(feed.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_page_error_aborts_poll(self, monitor):
+        feed = FakeFeed(total=100)
+        feed.fail_on_cursor = "c90"
+        monitor.api.get_activity = feed
+        monitor._last_cursor = "c10"
+
+        assert await monitor._collect_since_mark(await feed(10)) is None
+
+    @pytest.mark.asyncio
+    async def test_catch_up_bounded(self, monitor):
+        feed = FakeFeed(total=10_000)
+        monitor.api.get_activity = feed
+        monitor._last_cursor = "c0"
+        monitor.MAX_CATCHUP_PAGES = 3
+
+        collected = await monitor._collect_since_mark(await feed(10))
+
+        assert len(collected) == 10 + 2 * monitor.CATCHUP_PAGE_SIZE
+        assert len(feed.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_uses_next_cursor_when_provided(self, monitor):
+        monitor.api.get_activity = AsyncMock(return_value={"items": []})
+        monitor._last_cursor = "old"
+        first_page = {"items": _items(20, 10), "nextCursor": "page-2"}
+
+        await monitor._collect_since_mark(first_page)
+
+        monitor.api.get_activity.assert_awaited_once_with(
+            monitor.CATCHUP_PAGE_SIZE, cursor="page-2"
+        )
+
+
+class TestMonitorLoop:
+    """Tests for the poll loop with gapless ingestion."""
+
+    @pytest.mark.asyncio
+    async def test_burst_between_polls_fully_notified_in_order(self):
+        from monitor import ActivityMonitor
+
+        feed = FakeFeed(total=5)
+        polls = []
+
+        async def get_activity(limit=10, cursor=None):
+            if cursor is None:
+                polls.append(1)
+                if len(polls) == 2:
+                    feed.total = 40  # 35 new activities since the last poll
+                if len(polls) == 3:
+                    monitor.stop()
+            return await feed(limit, cursor)
+
+        api = MagicMock()
+        api.get_activity = get_activity
+        callback = AsyncMock()
+        monitor = ActivityMonitor(api, callback)
+
+        with patch("monitor.asyncio.sleep", AsyncMock()):
+            await asyncio.create_task(monitor.start())
+
+        notified = [call.args[0]["cursor"] for call in callback.await_args_list]
+        assert notified == [f"c{i}" for i in range(5, 40)]
+        assert monitor._last_cursor == "c39"
+
+    @pytest.mark.asyncio
+    async def test_failed_catch_up_retried_from_same_mark(self):
+        from monitor import ActivityMonitor
+
+        feed = FakeFeed(total=30)
+        feed.fail_on_cursor = "c20"
+        api = MagicMock()
+        polls = []
+
+        async def get_activity(limit=10, cursor=None):
+            if cursor is None:
+                polls.append(1)
+                if len(polls) == 2:
+                    feed.fail_on_cursor = None
+                    monitor.stop()
+            return await feed(limit, cursor)
+
+        api.get_activity = get_activity
+        callback = AsyncMock()
+        monitor = ActivityMonitor(api, callback)
+        monitor._preload_existing_activities = AsyncMock()
+        monitor._last_cursor = "c5"
+        monitor.seen_ids.add("c5")
+
+        with patch("monitor.asyncio.sleep", AsyncMock()):
+            await asyncio.create_task(monitor.start())
+
+        assert callback.await_count == 24
+        assert monitor._last_cursor == "c29"
+
+
+class TestGetActivityCursor:
+    """Tests for the cursor parameter on TerminalAPI.get_activity."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_passed_as_param(self):
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+        api._get = AsyncMock(return_value={"items": []})
+
+        await api.get_activity(50, cursor="abc")
+        await api.get_activity(10)
+
+        first, second = api._get.await_args_list
+        assert first.args[1] == {"limit": 50, "order": "desc", "cursor": "abc"}
+        assert "cursor" not in second.args[1]
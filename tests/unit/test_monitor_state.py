@@ -0,0 +1,140 @@
+"""
+Unit tests for ActivityMonitor dedup state
+
+Tests for: monitor.RecentIds (bounded ring), ActivityMonitor state
+persistence (_save_state / _load_state) and resuming without preload
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from monitor import ActivityMonitor, RecentIds
+
+
+class TestRecentIds:
+    """Tests for the bounded recent-ID set."""
+
+    def test_evicts_oldest(self):
+        ids = RecentIds(maxlen=3)
+        for activity_id in ("a", "b", "c", "d"):
+            ids.add(activity_id)
+
+        assert "a" not in ids
+        assert list(ids) == ["b", "c", "d"]
+        assert len(ids) == 3
+
+    def test_duplicate_add_does_not_evict(self):
+        ids = RecentIds(["a", "b"], maxlen=2)
+        ids.add("a")
+
+        assert list(ids) == ["a", "b"]
+
+    def test_memory_stays_flat(self):
+        ids = RecentIds(maxlen=100)
+        for i in range(10_000):
+            ids.add(f"id{i}")
+
+        assert len(ids) == 100
+        assert len(ids._order) == 100
+
+    def test_set_semantics(self):
+        ids = RecentIds(["a"])
+        ids.discard("a")
+        ids.discard("missing")
+
+        assert ids == set()
+
+
+def _api(vault="0xvault"):
+    api = MagicMock()
+    api.vault = vault
+    return api
+
+
+class TestStatePersistence:
+    """Tests for saving and loading the high-water mark."""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "state.json"
+        monitor = ActivityMonitor(_api(), AsyncMock(), state_path=path)
+        monitor._last_cursor = "c9"
+        monitor.seen_ids.add("c8")
+        monitor.seen_ids.add("c9")
+        monitor._save_state()
+
+        restored = ActivityMonitor(_api(), AsyncMock(), state_path=path)
+
+        assert restored._load_state() is True
+        assert restored._last_cursor == "c9"
+        assert list(restored.seen_ids) == ["c8", "c9"]
+        assert not path.with_suffix(".json.tmp").exists()
+
+    def test_missing_file(self, tmp_path):
+        monitor = ActivityMonitor(_api(), AsyncMock(), state_path=tmp_path / "none.json")
+
+        assert monitor._load_state() is False
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text("{not json")
+        monitor = ActivityMonitor(_api(), AsyncMock(), state_path=path)
+
+        assert monitor._load_state() is False
+        assert monitor._last_cursor is None
+
+    def test_other_vault_ignored(self, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text(json.dumps({"vault": "0xold", "last_cursor": "c1", "recent_ids": []}))
+        monitor = ActivityMonitor(_api("0xnew"), AsyncMock(), state_path=path)
+
+        assert monitor._load_state() is False
+
+    def test_default_path_from_module(self, tmp_path):
+        import monitor as monitor_module
+
+        monitor = ActivityMonitor(_api(), AsyncMock())
+
+        assert monitor.state_path == monitor_module.MONITOR_STATE_FILE
+
+
+class TestResume:
+    """Tests for restarting from persisted state."""
+
+    @pytest.mark.asyncio
+    async def test_restart_skips_preload_and_notifies_missed(self, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text(
+            json.dumps({"vault": "0xvault", "last_cursor": "c1", "recent_ids": ["c0", "c1"]})
+        )
+        api = _api()
+
+        async def get_activity(limit=10, cursor=None):
+            monitor.stop()
+            return {"items": [{"cursor": f"c{i}", "type": "swap"} for i in (3, 2, 1, 0)]}
+
+        api.get_activity = AsyncMock(side_effect=get_activity)
+        callback = AsyncMock()
+        monitor = ActivityMonitor(api, callback, state_path=path)
+
+        with patch("monitor.asyncio.sleep", AsyncMock()):
+            await asyncio.create_task(monitor.start())
+
+        api.get_activity.assert_awaited_once_with(monitor.PAGE_SIZE)
+        assert [c.args[0]["cursor"] for c in callback.await_args_list] == ["c2", "c3"]
+        saved = json.loads(path.read_text())
+        assert saved["last_cursor"] == "c3"
+        assert saved["recent_ids"][-2:] == ["c2", "c3"]
+
+    @pytest.mark.asyncio
+    async def test_first_start_preloads_and_saves(self, tmp_path):
+        path = tmp_path / "state.json"
+        api = _api()
+        api.get_activity = AsyncMock(return_value={"items": [{"cursor": "c5", "type": "swap"}]})
+        monitor = ActivityMonitor(api, AsyncMock(), state_path=path)
+
+        await monitor._preload_existing_activities()
+
+        assert json.loads(path.read_text())["last_cursor"] == "c5"
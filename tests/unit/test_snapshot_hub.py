@@ -0,0 +1,269 @@
+"""
+Unit tests for the shared vault snapshot hub
+
+Tests for: snapshot_hub (SnapshotHub tick caching, single-flight refresh,
+per-section failures, single-section reads, reset after contract writes,
+latest_snapshot), consumers sharing one snapshot
+"""
+
+import asyncio
+import dataclasses
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from snapshot_hub import SnapshotHub, VaultSnapshot, latest_section, latest_snapshot
+
+
+def _api():
+    api = MagicMock()
+    api.get_positions = AsyncMock(return_value={"overallPnlUsd": "10", "positions": []})
+    api.get_strategies = AsyncMock(return_value=[{"strategyId": 1, "content": "x"}])
+    api.get_vault = AsyncMock(return_value={"vaultAddress": "0xvault"})
+    api.get_eth_price = AsyncMock(return_value={"priceUsd": "3000"})
+    return api
+
+
+@pytest.fixture
+def hub(clock):
+    api = _api()
+    hub = SnapshotHub(api, interval=15, clock=clock)
+    api.snapshots = hub
+    return hub
+
+
+class TestSnapshotHub:
+    """Tests for tick caching and refresh."""
+
+    @pytest.mark.asyncio
+    async def test_fetches_all_sections(self, hub):
+        snapshot = await hub.get()
+
+        assert snapshot.positions["overallPnlUsd"] == "10"
+        assert snapshot.strategies[0]["strategyId"] == 1
+        assert snapshot.vault["vaultAddress"] == "0xvault"
+        assert snapshot.eth_price["priceUsd"] == "3000"
+        assert snapshot.tick == 1
+        assert snapshot.errors == {}
+
+    @pytest.mark.asyncio
+    async def test_same_tick_shares_snapshot(self, hub, clock):
+        first = await hub.get()
+        clock.advance(14)
+        second = await hub.get()
+
+        assert first is second
+        hub.api.get_positions.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_next_tick_refreshes(self, hub, clock):
+        await hub.get()
+        clock.advance(15)
+        snapshot = await hub.get()
+
+        assert snapshot.tick == 2
+        assert hub.api.get_positions.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_single_refresh(self, hub):
+        release = asyncio.Event()
+
+        async def slow_positions():
+            await release.wait()
+            return {"positions": []}
+
+        hub.api.get_positions = AsyncMock(side_effect=slow_positions)
+        waiters = [asyncio.create_task(hub.get()) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        snapshots = await asyncio.gather(*waiters)
+
+        assert all(s is snapshots[0] for s in snapshots)
+        hub.api.get_positions.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_refresh(self, hub):
+        release = asyncio.Event()
+
+        async def slow_vault():
+            await release.wait()
+            return {}
+
+        hub.api.get_vault = AsyncMock(side_effect=slow_vault)
+        cancelled = asyncio.create_task(hub.get())
+        waiting = asyncio.create_task(hub.get())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+
+        assert (await waiting).tick == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_section_isolated(self, hub):
+        hub.api.get_strategies = AsyncMock(side_effect=RuntimeError("boom"))
+
+        snapshot = await hub.get()
+
+        assert snapshot.strategies == {"error": "boom"}
+        assert snapshot.errors == {"strategies": "boom"}
+        assert snapshot.positions["overallPnlUsd"] == "10"
+
+    @pytest.mark.asyncio
+    async def test_error_response_recorded(self, hub):
+        hub.api.get_positions = AsyncMock(return_value={"error": "HTTP 502"})
+
+        snapshot = await hub.get()
+
+        assert snapshot.positions == {"error": "HTTP 502"}
+        assert snapshot.errors == {"positions": "HTTP 502"}
+
+    @pytest.mark.asyncio
+    async def test_each_section_has_own_deadline(self, hub):
+        hub.timeout = 0.05
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        hub.api.get_positions = AsyncMock(side_effect=hang)
+
+        snapshot = await hub.get()
+
+        assert snapshot.errors == {"positions": "timed out"}
+        assert snapshot.eth_price == {"priceUsd": "3000"}
+
+    @pytest.mark.asyncio
+    async def test_snapshot_immutable(self, hub):
+        snapshot = await hub.get()
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.positions = {}
+
+
+class TestSectionAndReset:
+    """Tests for single-section reads and invalidation after contract writes."""
+
+    @pytest.mark.asyncio
+    async def test_section_served_from_fresh_snapshot(self, hub):
+        snapshot = await hub.get()
+
+        assert await latest_section(hub.api, "vault") is snapshot.vault
+        assert hub.api.get_vault.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_section_fetches_only_that_endpoint(self, hub, clock):
+        await hub.get()
+        clock.advance(20)
+
+        price = await hub.section("eth_price")
+
+        assert price == {"priceUsd": "3000"}
+        assert hub.api.get_eth_price.await_count == 2
+        assert hub.api.get_positions.await_count == 1
+        assert hub.ticks == 1
+
+    @pytest.mark.asyncio
+    async def test_section_failure_as_error_dict(self, hub):
+        hub.api.get_vault = AsyncMock(side_effect=RuntimeError("boom"))
+
+        assert await hub.section("vault") == {"error": "boom"}
+
+    @pytest.mark.asyncio
+    async def test_refresh_started_before_reset_not_published(self, hub):
+        release = asyncio.Event()
+
+        async def slow_positions():
+            await release.wait()
+            return {"positions": ["pre-write"]}
+
+        hub.api.get_positions = AsyncMock(side_effect=slow_positions)
+        pending = asyncio.ensure_future(hub.get())
+        await asyncio.sleep(0)
+        hub.reset()
+        release.set()
+        await pending
+
+        assert hub.latest is None
+
+    @pytest.mark.asyncio
+    async def test_contract_write_resets_shared_snapshot(self):
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+        values = iter([{"overallPnlUsd": "10"}, {"overallPnlUsd": "20"}])
+        api.get_positions = AsyncMock(side_effect=lambda: next(values))
+        api.get_strategies = AsyncMock(return_value=[])
+        api.get_vault = AsyncMock(return_value={})
+        api.get_eth_price = AsyncMock(return_value={})
+
+        before = await latest_snapshot(api)
+        api.invalidate_vault_data()
+        after = await latest_snapshot(api)
+
+        assert before.positions["overallPnlUsd"] == "10"
+        assert after.positions["overallPnlUsd"] == "20"
+
+
+class TestLatestSnapshot:
+    """Tests for looking up the shared hub."""
+
+    @pytest.mark.asyncio
+    async def test_uses_shared_hub(self, hub):
+        first = await latest_snapshot(hub.api)
+        second = await latest_snapshot(hub.api)
+
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_latest_section_uses_shared_hub(self, hub):
+        await latest_snapshot(hub.api)
+
+        positions = await latest_section(hub.api, "positions")
+
+        assert positions == {"overallPnlUsd": "10", "positions": []}
+        assert hub.api.get_positions.await_count == 1
+
+    def test_terminal_api_owns_hub(self):
+        from api import TerminalAPI
+
+        api = TerminalAPI()
+
+        assert isinstance(api.snapshots, SnapshotHub)
+        assert api.snapshots.api is api
+
+
+class TestConsumersShareSnapshot:
+    """Tests that background services read one snapshot per tick."""
+
+    @pytest.mark.asyncio
+    async def test_alerter_reporter_advisor_one_fetch(self, hub):
+        from advisor_monitor import AdvisorMonitor
+        from alerter import ThresholdAlerter
+        from reporter import DailyReporter
+
+        notifier = MagicMock(notify_users=[])
+        alerter = ThresholdAlerter(hub.api, notifier)
+        reporter = DailyReporter(hub.api, notifier)
+        advisor = AdvisorMonitor(MagicMock(), hub.api, AsyncMock(), 1, MagicMock())
+
+        await alerter._send_alerts()
+        report = await reporter._gather_report_data()
+        context = await advisor._build_context()
+
+        hub.api.get_positions.assert_awaited_once()
+        hub.api.get_strategies.assert_awaited_once()
+        assert report["positions"] is hub.latest.positions
+        assert context["strategies"] == 1
+
+    @pytest.mark.asyncio
+    async def test_collector_reports_failed_sections(self, hub):
+        from advisor import StrategyDataCollector
+
+        hub.api.get_vault = AsyncMock(side_effect=RuntimeError("down"))
+        hub.api.get_tokens = AsyncMock(return_value={"items": []})
+        hub.api.get_candles = AsyncMock(return_value={})
+
+        data = await StrategyDataCollector(hub.api).collect()
+
+        assert data.vault == {}
+        assert "vault: down" in data.errors
+        assert data.eth_price["priceUsd"] == "3000"
@@ -8,6 +8,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # =============================================================================
 # Test Fixtures
 # =============================================================================
@@ -44,7 +46,7 @@ class TestCmdPrice:
     async def test_cmd_price_success(self, mock_update, mock_context):
         """Test normal query - cmd_price returns formatted ETH price."""
         # Given
-        mock_api = AsyncMock()
+        mock_api = with_snapshot_hub(AsyncMock())
         mock_api.get_eth_price = AsyncMock(return_value={"priceUsd": "3000.00"})
 
         with (
@@ -82,7 +84,7 @@ class TestCmdPrice:
     async def test_cmd_price_api_error(self, mock_update, mock_context):
         """Test API error message display."""
         # Given
-        mock_api = AsyncMock()
+        mock_api = with_snapshot_hub(AsyncMock())
         mock_api.get_eth_price = AsyncMock(return_value={"error": "API unavailable"})
 
         with (
@@ -103,7 +105,7 @@ class TestCmdPrice:
     async def test_cmd_price_low_value(self, mock_update, mock_context):
         """Test low price value formatting."""
         # Given
-        mock_api = AsyncMock()
+        mock_api = with_snapshot_hub(AsyncMock())
         mock_api.get_eth_price = AsyncMock(return_value={"priceUsd": "2800.00"})
 
         with (
@@ -66,16 +66,16 @@ class TestGetToken:
         then queries the specific token by address.
         """
         # Given
-        import api as api_module
         from api import TerminalAPI
 
-        # Pre-populate cache to avoid cache building
-        token_address = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
-        api_module._token_cache = {"ETH": token_address}
-        api_module._token_cache_time = 9999999999  # Far future
-
         api = TerminalAPI()
 
+        # Pre-populate token index to avoid index building
+        token_address = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+        api.token_index._loaded = True
+        api.token_index.tokens = {"ETH": {"symbol": "ETH", "tokenAddress": token_address}}
+        api.token_index.built_at = 9999999999  # Far future
+
         # Mock only the final token detail call
         with patch.object(api, "_get", new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_token_response
@@ -88,7 +88,7 @@ class TestGetToken:
         assert result["symbol"] == "ETH"
         assert result["name"] == "Ethereum"
         assert result["tokenAddress"] == token_address
-        # Only one call to get token details (cache was pre-populated)
+        # Only one call to get token details (index was pre-populated)
         mock_get.assert_called_once_with(f"/token/{token_address}")
 
     @pytest.mark.asyncio
@@ -115,14 +115,11 @@ class TestGetToken:
     async def test_get_token_api_error(self):
         """Test get_token handles API errors when token not in cache."""
         # Given
-        import api as api_module
         from api import TerminalAPI
 
-        # Clear cache before test
-        api_module._token_cache.clear()
-        api_module._token_cache_time = 0
-
+        # Start with an empty index (no persisted file)
         api = TerminalAPI()
+        api.token_index._loaded = True
 
         # Mock empty tokens list (token not found)
         with patch.object(api, "_get", new_callable=AsyncMock) as mock_get:
@@ -14,6 +14,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # ============================================================================
 # Test Data Factory
 # ============================================================================
@@ -129,7 +131,7 @@ def mock_api():
     api = MagicMock()
     api.get_positions = AsyncMock(return_value=ReportDataFactory.create_positions_data())
     api.get_strategies = AsyncMock(return_value=ReportDataFactory.create_strategies_data())
-    return api
+    return with_snapshot_hub(api)
 
 
 @pytest.fixture
@@ -438,6 +440,32 @@ class TestFormatDailyReport:
 
         assert "PnL" in report or "pnl" in report
 
+    def test_format_daily_report_reads_model_fields(self, mock_api, mock_notifier):
+        """Balance and PnL lines come from the parsed positions model."""
+        from reporter import DailyReporter
+
+        reporter = DailyReporter(mock_api, mock_notifier)
+        positions = ReportDataFactory.create_positions_data(
+            overallPnlUsd="120.50", overallPnlPercent="2.75"
+        )
+
+        report = reporter._format_daily_report({"positions": positions, "strategies": []})
+
+        assert "Available: 1.500000 ETH" in report
+        assert "Total Value: $4,500.00" in report
+        assert "24h PnL: +$120.50 (+2.75%)" in report
+
+    def test_format_daily_report_missing_pnl(self, mock_api, mock_notifier):
+        """Missing PnL fields render as zero."""
+        from reporter import DailyReporter
+
+        reporter = DailyReporter(mock_api, mock_notifier)
+
+        report = reporter._format_daily_report({"positions": {}, "strategies": []})
+
+        assert "Total Value: $0.00" in report
+        assert "24h PnL: +$0.00 (+0.00%)" in report
+
     def test_format_daily_report_includes_positions(
         self, mock_api, mock_notifier, report_data_factory
     ):
@@ -16,6 +16,8 @@ UTC = UTC
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # ============================================================================
 # Test Data Factory
 # ============================================================================
@@ -101,7 +103,7 @@ def mock_api():
     """Create mock TerminalAPI instance."""
     api = MagicMock()
     api.get_positions = AsyncMock(return_value=AlertDataFactory.create_positions_data())
-    return api
+    return with_snapshot_hub(api)
 
 
 @pytest.fixture
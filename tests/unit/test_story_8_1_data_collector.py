@@ -14,6 +14,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # ============================================================================
 # Test Data Factory
 # ============================================================================
@@ -149,7 +151,7 @@ def mock_api(data_factory):
     api.get_tokens.return_value = data_factory.create_token_list(10)
     api.get_candles.return_value = data_factory.create_candle_data(24)
 
-    return api
+    return with_snapshot_hub(api)
 
 
 @pytest.fixture
@@ -15,6 +15,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # ============================================================================
 # Test Data Factory
 # ============================================================================
@@ -124,7 +126,7 @@ def mock_api():
     api.get_tokens.return_value = factory.create_token_list(10)
     api.get_candles.return_value = factory.create_candle_data(24)
 
-    return api
+    return with_snapshot_hub(api)
 
 
 @pytest.fixture
@@ -1067,8 +1067,8 @@ class TestCallbackQueryHandler:
         context = MagicMock()
         context.bot = mock_bot
 
-        with patch("advisor_monitor.execute_suggestion") as mock_execute:
-            mock_execute.return_value = "Executed successfully"
+        with patch("advisor_monitor.execute_suggestions") as mock_execute:
+            mock_execute.return_value = ["Executed successfully"] * 2
 
             await handle_advisor_callback(update, context)
 
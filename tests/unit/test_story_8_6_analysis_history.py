@@ -19,6 +19,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests.support.helpers import with_snapshot_hub
+
 # =============================================================================
 # Fixtures
 # =============================================================================
@@ -402,7 +404,7 @@ class TestAdvisorAnalyzeIntegration:
         """StrategyAdvisor.analyze should save analysis record via save_analysis."""
         # Mock the LLM and API
         mock_llm = AsyncMock()
-        mock_api = AsyncMock()
+        mock_api = with_snapshot_hub(AsyncMock())
 
         # Mock data collection
         mock_api.get_positions = AsyncMock(return_value={"ethBalance": "1000000000000000000"})
@@ -443,7 +445,7 @@ class TestAdvisorAnalyzeIntegration:
     def test_analyze_stores_last_record_id(self, monkeypatch):
         """StrategyAdvisor should store last_record_id after analysis."""
         mock_llm = AsyncMock()
-        mock_api = AsyncMock()
+        mock_api = with_snapshot_hub(AsyncMock())
 
         mock_api.get_positions = AsyncMock(return_value={"ethBalance": "1000000000000000000"})
         mock_api.get_strategies = AsyncMock(return_value=[])
@@ -0,0 +1,479 @@
+"""
+Unit tests for the token index
+
+Tests for: token_index.TokenIndex (concurrent build, persistence,
+background refresh, listing order), token_index.TokenSearch, TerminalAPI
+token lookup and local paging, /tokens and /token commands
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _make_tokens(start: int, count: int) -> list[dict]:
+    return [
+        {
+            "symbol": f"T{i}",
+            "name": f"Token {i}",
+            "tokenAddress": f"0x{i:040x}",
+            "type": "meme_token",
+            "description": "ignored",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+class FakeTokensAPI:
+    """Serves /tokens pages from a fixed list and tracks concurrency."""
+
+    def __init__(self, tokens: list[dict], with_total: bool = True, delay: float = 0.01):
+        self.tokens = tokens
+        self.with_total = with_total
+        self.delay = delay
+        self.calls: list[int] = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_pages: set[int] = set()
+
+    async def _get(self, endpoint, params=None):
+        page, limit = params["page"], params["limit"]
+        self.calls.append(page)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if page in self.fail_pages:
+            return {"error": "HTTP 500"}
+        items = self.tokens[(page - 1) * limit : page * limit]
+        if self.with_total:
+            return {"items": items, "total": len(self.tokens)}
+        return items
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return tmp_path / "token_index.json"
+
+
+class TestConcurrentBuild:
+    """Tests for building the index from /tokens pages."""
+
+    @pytest.mark.asyncio
+    async def test_pages_fetched_concurrently_with_bound(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI(_make_tokens(0, 230))
+        index = TokenIndex(api, path=index_path, concurrency=2)
+
+        await index.refresh()
+
+        assert len(index.tokens) == 230
+        assert sorted(api.calls) == [1, 2, 3, 4, 5]
+        assert api.max_active == 2
+
+    @pytest.mark.asyncio
+    async def test_build_without_total_stops_at_short_page(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI(_make_tokens(0, 120), with_total=False)
+        index = TokenIndex(api, path=index_path, concurrency=3)
+
+        await index.refresh()
+
+        assert len(index.tokens) == 120
+        assert max(api.calls) == 4  # window 2-4, page 3 is short
+
+    @pytest.mark.asyncio
+    async def test_only_lookup_fields_kept(self, index_path):
+        from token_index import TokenIndex
+
+        index = TokenIndex(FakeTokensAPI(_make_tokens(0, 3)), path=index_path)
+
+        await index.refresh()
+
+        assert set(index.tokens["T1"]) == {"symbol", "name", "tokenAddress", "type", "rank"}
+
+    @pytest.mark.asyncio
+    async def test_missing_fields_left_out(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI([{"symbol": "BARE", "tokenAddress": "0xbare", "name": None}])
+        index = TokenIndex(api, path=index_path)
+
+        await index.refresh()
+
+        assert index.tokens["BARE"] == {"symbol": "BARE", "tokenAddress": "0xbare", "rank": 0}
+
+    @pytest.mark.asyncio
+    async def test_shared_symbol_keeps_listing_order(self, index_path):
+        from token_index import TokenIndex
+
+        tokens = _make_tokens(0, 4)
+        tokens[2]["symbol"] = "T0"  # relaunch under the same ticker
+        index = TokenIndex(FakeTokensAPI(tokens), path=index_path)
+
+        await index.refresh()
+
+        assert [t["tokenAddress"] for t in index.page(1, 4)["items"]] == [
+            t["tokenAddress"] for t in tokens
+        ]
+        assert index.page(1, 4)["total"] == 4
+        assert index.tokens["T0"]["tokenAddress"] == tokens[0]["tokenAddress"]
+
+    @pytest.mark.asyncio
+    async def test_incomplete_refresh_keeps_missing_symbols(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI(_make_tokens(0, 120))
+        index = TokenIndex(api, path=index_path)
+        index._loaded = True
+        index.tokens = {"OLD": {"symbol": "OLD", "tokenAddress": "0xold"}}
+        api.fail_pages = {2}
+
+        await index.refresh()
+
+        assert "OLD" in index.tokens
+        assert "T0" in index.tokens
+
+    @pytest.mark.asyncio
+    async def test_complete_refresh_drops_delisted_symbols(self, index_path):
+        from token_index import TokenIndex
+
+        index = TokenIndex(FakeTokensAPI(_make_tokens(0, 10)), path=index_path)
+        index._loaded = True
+        index.tokens = {"OLD": {"symbol": "OLD", "tokenAddress": "0xold"}}
+
+        await index.refresh()
+
+        assert "OLD" not in index.tokens
+
+    @pytest.mark.asyncio
+    async def test_complete_refresh_trims_listing(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI(_make_tokens(0, 10))
+        index = TokenIndex(api, path=index_path)
+        await index.refresh()
+        api.tokens = api.tokens[:6]
+
+        await index.refresh()
+
+        assert index.page(1, 50)["total"] == 6
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_build(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI(_make_tokens(0, 10))
+        index = TokenIndex(api, path=index_path)
+
+        await asyncio.gather(index.refresh(), index.refresh(), index.refresh())
+
+        assert api.calls == [1]
+
+
+class TestPersistence:
+    """Tests for saving and loading the index."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_persists_index(self, index_path):
+        from token_index import TokenIndex
+
+        index = TokenIndex(FakeTokensAPI(_make_tokens(0, 5)), path=index_path)
+
+        await index.refresh()
+
+        saved = json.loads(index_path.read_text())
+        assert len(saved["tokens"]) == 5
+        assert saved["built_at"] == index.built_at
+        assert not index_path.with_suffix(".json.tmp").exists()
+
+    @pytest.mark.asyncio
+    async def test_restart_starts_warm(self, index_path):
+        from token_index import TokenIndex
+
+        await TokenIndex(FakeTokensAPI(_make_tokens(0, 5)), path=index_path).refresh()
+        api = FakeTokensAPI(_make_tokens(0, 5))
+        restarted = TokenIndex(api, path=index_path)
+
+        address = await restarted.lookup("t3")
+
+        assert address == f"0x{3:040x}"
+        assert api.calls == []
+        assert [t["symbol"] for t in restarted.page(1, 2)["items"]] == ["T0", "T1"]
+
+    def test_corrupt_file_ignored(self, index_path):
+        from token_index import TokenIndex
+
+        index_path.write_text("{not json")
+        index = TokenIndex(MagicMock(), path=index_path)
+
+        assert index.load() is False
+        assert index.tokens == {}
+
+    @pytest.mark.asyncio
+    async def test_default_path_isolated_from_working_tree(self, tmp_path):
+        from main import api
+        from token_index import TokenIndex
+
+        await TokenIndex(FakeTokensAPI(_make_tokens(0, 3))).refresh()
+
+        assert (tmp_path / "token_index.json").exists()
+        assert api.token_index.path == tmp_path / "token_index.json"
+
+
+class TestBackgroundRefresh:
+    """Tests for non-blocking refresh of an expired index."""
+
+    @pytest.mark.asyncio
+    async def test_expired_index_serves_stale_and_refreshes(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI(_make_tokens(0, 5), delay=0.05)
+        index = TokenIndex(api, path=index_path)
+        index._loaded = True
+        index.tokens = {"OLD": {"symbol": "OLD", "tokenAddress": "0xold"}}
+        index.built_at = time.time() - 7200
+
+        address = await index.lookup("OLD")
+
+        assert address == "0xold"
+        assert index.refreshing
+        await index._refresh_task
+        assert "T0" in index.tokens
+        assert not index.is_expired
+
+    @pytest.mark.asyncio
+    async def test_cold_index_blocks_until_built(self, index_path):
+        from token_index import TokenIndex
+
+        index = TokenIndex(FakeTokensAPI(_make_tokens(0, 5)), path=index_path)
+
+        address = await index.lookup("T2")
+
+        assert address == f"0x{2:040x}"
+
+    @pytest.mark.asyncio
+    async def test_warm_up_loads_and_schedules_refresh(self, index_path):
+        from token_index import TokenIndex
+
+        api = FakeTokensAPI(_make_tokens(0, 5))
+        index = TokenIndex(api, path=index_path)
+
+        index.warm_up()
+
+        assert index.refreshing
+        await index._refresh_task
+        assert len(index.tokens) == 5
+
+
+@pytest.fixture
+def search_tokens():
+    return {
+        "PEPE": {"symbol": "PEPE", "name": "Pepe", "tokenAddress": "0xpepe", "rank": 2},
+        "PEPU": {"symbol": "PEPU", "name": "Pepe Unchained", "tokenAddress": "0xpepu", "rank": 1},
+        "WIF": {"symbol": "WIF", "name": "Dogwifhat", "tokenAddress": "0xwif", "rank": 0},
+        "DOGE": {"symbol": "DOGE", "name": "Dogecoin", "tokenAddress": "0xdoge", "rank": 3},
+    }
+
+
+class TestTokenSearch:
+    """Tests for the prefix trie and fuzzy matcher."""
+
+    def test_prefix_matches_symbols(self, search_tokens):
+        from token_index import TokenSearch
+
+        search = TokenSearch(search_tokens)
+
+        assert search.prefix("pep") == ["PEPE", "PEPU"]
+
+    def test_prefix_matches_name_words(self, search_tokens):
+        from token_index import TokenSearch
+
+        search = TokenSearch(search_tokens)
+
+        assert search.prefix("unch") == ["PEPU"]
+
+    def test_prefix_respects_limit(self, search_tokens):
+        from token_index import TokenSearch
+
+        search = TokenSearch(search_tokens)
+
+        assert len(search.prefix("", limit=2)) == 2
+
+    def test_prefix_no_match(self, search_tokens):
+        from token_index import TokenSearch
+
+        assert TokenSearch(search_tokens).prefix("xyz") == []
+
+    def test_fuzzy_finds_typo(self, search_tokens):
+        from token_index import TokenSearch
+
+        matches = TokenSearch(search_tokens).fuzzy("DGOE", max_distance=2)
+
+        assert (2, "DOGE") in matches
+
+    def test_fuzzy_single_substitution(self, search_tokens):
+        from token_index import TokenSearch
+
+        matches = TokenSearch(search_tokens).fuzzy("PEPA")
+
+        assert [symbol for _, symbol in matches] == ["PEPE", "PEPU"]
+        assert all(distance == 1 for distance, _ in matches)
+
+
+class TestIndexSearch:
+    """Tests for TokenIndex.search and local paging."""
+
+    def _index(self, tokens):
+        from token_index import TokenIndex
+
+        index = TokenIndex(MagicMock())
+        index._loaded = True
+        index.built_at = time.time()
+        index.tokens = dict(tokens)
+        index.listing = {t["rank"]: t for t in tokens.values()}
+        return index
+
+    def test_exact_match_first(self, search_tokens):
+        index = self._index(search_tokens)
+
+        results = index.search("pepu")
+
+        assert results[0]["symbol"] == "PEPU"
+
+    def test_prefix_then_fuzzy(self, search_tokens):
+        index = self._index(search_tokens)
+
+        symbols = [t["symbol"] for t in index.search("WIFF")]
+
+        assert symbols == ["WIF"]
+
+    def test_search_rebuilt_after_index_change(self, search_tokens):
+        index = self._index(search_tokens)
+        index.search("pep")
+
+        index.tokens["PEPX"] = {"symbol": "PEPX", "name": "", "tokenAddress": "0xx"}
+        index._search = None
+
+        assert "PEPX" in [t["symbol"] for t in index.search("pep")]
+
+    def test_page_uses_listing_rank(self, search_tokens):
+        index = self._index(search_tokens)
+
+        first = index.page(1, 2)
+        second = index.page(2, 2)
+
+        assert [t["symbol"] for t in first["items"]] == ["WIF", "PEPU"]
+        assert [t["symbol"] for t in second["items"]] == ["PEPE", "DOGE"]
+        assert first["total"] == 4
+
+
+class TestTerminalAPISearch:
+    """Tests for TerminalAPI search integration."""
+
+    @pytest.fixture
+    def api(self, search_tokens):
+        from unittest.mock import AsyncMock
+
+        from api import TerminalAPI
+
+        client = TerminalAPI()
+        client.token_index._loaded = True
+        client.token_index.built_at = time.time()
+        client.token_index.tokens = dict(search_tokens)
+        client.token_index.listing = {t["rank"]: t for t in search_tokens.values()}
+        client._get = AsyncMock(return_value={"symbol": "PEPE"})
+        return client
+
+    @pytest.mark.asyncio
+    async def test_get_token_miss_returns_candidates(self, api):
+        result = await api.get_token("pep")
+
+        assert "error" in result
+        assert [t["symbol"] for t in result["candidates"]] == ["PEPE", "PEPU"]
+        api._get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_tokens_pages_locally(self, api):
+        result = await api.get_tokens(page=1, limit=3)
+
+        assert len(result["items"]) == 3
+        api._get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_tokens_remote_when_index_empty(self):
+        from unittest.mock import AsyncMock
+
+        from api import TerminalAPI
+
+        client = TerminalAPI()
+        client._get = AsyncMock(return_value={"items": []})
+
+        await client.get_tokens(2)
+
+        client._get.assert_called_once_with("/tokens", {"page": 2, "limit": 10})
+
+    @pytest.mark.asyncio
+    async def test_cmd_tokens_with_missing_fields(self, index_path):
+        from unittest.mock import AsyncMock, patch
+
+        from api import TerminalAPI
+        from commands.query import cmd_tokens
+        from token_index import TokenIndex
+
+        client = TerminalAPI()
+        client.token_index = TokenIndex(
+            FakeTokensAPI([{"symbol": "BARE", "tokenAddress": "0xbare"}] + _make_tokens(0, 1)),
+            path=index_path,
+        )
+        await client.token_index.refresh()
+        update = MagicMock()
+        update.message = AsyncMock()
+        ctx = MagicMock()
+        ctx.args = []
+
+        with (
+            patch("commands.query.authorized", return_value=True),
+            patch("commands.query._get_api", return_value=client),
+        ):
+            await cmd_tokens(update, ctx)
+
+        text = update.message.reply_text.call_args[0][0]
+        assert "1. $BARE - ?\n   Type: Unknown" in text
+        assert "2. $T0 - Token 0\n   Type: Meme Token" in text
+        assert "None" not in text
+
+    @pytest.mark.asyncio
+    async def test_cmd_token_lists_candidates(self, search_tokens):
+        from unittest.mock import AsyncMock, patch
+
+        from commands.query import cmd_token
+
+        update = MagicMock()
+        update.effective_user.id = 123456789
+        update.message = AsyncMock()
+        ctx = MagicMock()
+        ctx.args = ["pep"]
+        mock_api = MagicMock()
+        mock_api.get_token = AsyncMock(
+            return_value={
+                "error": "Token 'pep' not found",
+                "candidates": [search_tokens["PEPE"], search_tokens["PEPU"]],
+            }
+        )
+
+        with (
+            patch("commands.query.authorized", return_value=True),
+            patch("commands.query._get_api", return_value=mock_api),
+        ):
+            await cmd_token(update, ctx)
+
+        text = update.message.reply_text.call_args[0][0]
+        assert "Did you mean" in text
+        assert "$PEPE - Pepe" in text
+        assert "$PEPU - Pepe Unchained" in text
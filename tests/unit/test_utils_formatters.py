@@ -88,6 +88,13 @@ class TestFormatEth:
         # Then
         assert result == "1000.000000"
 
+    @pytest.mark.unit
+    def test_format_eth_none_as_zero(self) -> None:
+        """Test format_eth renders a missing amount as zero."""
+        from utils.formatters import format_eth
+
+        assert format_eth(None) == "0.000000"
+
 
 # =============================================================================
 # Tests for format_usd
@@ -153,6 +160,14 @@ class TestFormatUsd:
         # Then
         assert result == "$0.00"
 
+    @pytest.mark.unit
+    def test_format_usd_none_as_zero(self) -> None:
+        """Test format_usd renders a missing amount as $0.00."""
+        from utils.formatters import format_price, format_usd
+
+        assert format_usd(None) == "$0.00"
+        assert format_price(None) == "$0.00"
+
 
 # =============================================================================
 # Tests for format_percent
@@ -0,0 +1,43 @@
+"""
+Unit tests for utils/json_file.py
+
+Tests for: write_json_atomic (parent directories, replace, no temp file left,
+failed write keeps the previous file)
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from utils.json_file import write_json_atomic
+
+
+class TestWriteJsonAtomic:
+    """Tests for the atomic JSON write helper."""
+
+    def test_creates_parent_directories(self, tmp_path):
+        path = tmp_path / "nested" / "state.json"
+
+        write_json_atomic(path, {"symbol": "佩佩"})
+
+        assert json.loads(path.read_text(encoding="utf-8")) == {"symbol": "佩佩"}
+        assert not path.with_suffix(".json.tmp").exists()
+
+    def test_replaces_existing_file(self, tmp_path):
+        path = tmp_path / "state.json"
+        write_json_atomic(path, [1])
+
+        write_json_atomic(path, [2])
+
+        assert json.loads(path.read_text()) == [2]
+
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        path = tmp_path / "state.json"
+        write_json_atomic(path, {"ok": True})
+
+        with patch("utils.json_file.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                write_json_atomic(path, {"ok": False})
+
+        assert json.loads(path.read_text()) == {"ok": True}
@@ -0,0 +1,164 @@
+"""
+Unit tests for VaultContract running web3 calls off the event loop.
+
+Tests for: _send_transaction executing estimate / nonce / gas price concurrently,
+build / sign / send / receipt wait on the web3 thread pool, the event loop
+staying responsive while a transaction confirms, concurrent sends on one
+instance taking distinct nonces.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from web3.exceptions import ContractLogicError
+
+import contract
+
+
+class SlowRPC:
+    """Blocking stand-ins for web3 calls that record the calling threads."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.threads: dict[str, threading.Thread] = {}
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def call(self, name: str, result):
+        def fn(*args, **kwargs):
+            with self.lock:
+                self.threads[name] = threading.current_thread()
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(self.delay)
+            with self.lock:
+                self.active -= 1
+            return result
+
+        return fn
+
+
+def _vault(rpc: SlowRPC, receipt_delay: float | None = None):
+    vault = contract.VaultContract.__new__(contract.VaultContract)
+    vault.on_transaction = None
+    vault.account = MagicMock()
+    vault.account.sign_transaction.side_effect = rpc.call("sign", MagicMock(raw_transaction=b"tx"))
+    vault.w3 = MagicMock()
+    eth = vault.w3.eth
+    eth.get_transaction_count.side_effect = rpc.call("nonce", 7)
+    type(eth).gas_price = property(lambda self: rpc.call("gas_price", 10**9)())
+    eth.send_raw_transaction.side_effect = rpc.call("send", b"\x01" * 32)
+    receipt = {"status": 1, "blockNumber": 42}
+    if receipt_delay is None:
+        eth.wait_for_transaction_receipt.side_effect = rpc.call("receipt", receipt)
+    else:
+        slow = SlowRPC(receipt_delay)
+        eth.wait_for_transaction_receipt.side_effect = slow.call("receipt", receipt)
+
+    tx_func = MagicMock()
+    tx_func.estimate_gas.side_effect = rpc.call("estimate", 50_000)
+    tx_func.build_transaction.side_effect = rpc.call("build", {"nonce": 7})
+    return vault, tx_func
+
+
+class TestOffLoopTransactions:
+    """Tests for the web3 thread pool pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_prefetch_runs_concurrently(self):
+        rpc = SlowRPC(0.2)
+        vault, tx_func = _vault(rpc)
+
+        result = await vault._send_transaction(tx_func, value=5)
+
+        assert result["success"] is True
+        assert rpc.peak == 3  # estimate, nonce and gas price overlapped
+        built = tx_func.build_transaction.call_args[0][0]
+        assert built["nonce"] == 7
+        assert built["gasPrice"] == 10**9
+        assert built["gas"] == 60_000
+        assert built["value"] == 5
+
+    @pytest.mark.asyncio
+    async def test_all_calls_leave_event_loop_thread(self):
+        rpc = SlowRPC(0)
+        vault, tx_func = _vault(rpc)
+
+        await vault._send_transaction(tx_func)
+
+        assert set(rpc.threads) == {
+            "estimate",
+            "nonce",
+            "gas_price",
+            "build",
+            "sign",
+            "send",
+            "receipt",
+        }
+        assert all(t is not threading.main_thread() for t in rpc.threads.values())
+
+    @pytest.mark.asyncio
+    async def test_event_loop_responsive_while_confirming(self):
+        vault, tx_func = _vault(SlowRPC(0), receipt_delay=0.5)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            result = await vault._send_transaction(tx_func)
+        finally:
+            beat.cancel()
+
+        assert result["blockNumber"] == 42
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_estimation_revert_still_reported(self):
+        vault, tx_func = _vault(SlowRPC(0))
+        tx_func.estimate_gas.side_effect = ContractLogicError("execution reverted")
+
+        result = await vault._send_transaction(tx_func)
+
+        assert result == {
+            "success": False,
+            "error": contract.ERROR_MESSAGES["gas_estimation_failed"],
+        }
+        vault.w3.eth.send_raw_transaction.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_transactions_do_not_serialize(self):
+        vault, tx_func = _vault(SlowRPC(0), receipt_delay=0.3)
+        tx_func.build_transaction.side_effect = lambda params: dict(params)
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        results = await asyncio.gather(*(vault._send_transaction(tx_func) for _ in range(3)))
+
+        assert all(r["success"] for r in results)
+        assert loop.time() - started < 0.8  # only nonce allocation is serialized
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sends_on_one_instance_get_distinct_nonces(self):
+        # Both sends see the same pending nonce from the node
+        vault, tx_func = _vault(SlowRPC(0.05))
+        tx_func.build_transaction.side_effect = lambda params: dict(params)
+        vault.account.sign_transaction.side_effect = lambda tx: MagicMock(
+            raw_transaction=tx["nonce"]
+        )
+
+        results = await asyncio.gather(
+            vault._send_transaction(tx_func), vault._send_transaction(tx_func)
+        )
+
+        assert all(r["success"] for r in results)
+        sent = [c.args[0] for c in vault.w3.eth.send_raw_transaction.call_args_list]
+        assert sorted(sent) == [7, 8]
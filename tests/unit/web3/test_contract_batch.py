@@ -0,0 +1,347 @@
+"""
+Unit tests for local nonce management and batched transactions.
+
+Tests for: NonceManager, VaultContract.send_batch (consecutive local nonces,
+back-to-back broadcast, concurrent receipts, gap recovery, failed resync),
+the nonce lock across event loop restarts,
+VaultContract.apply_strategy_changes, advisor "Execute All" using one batch.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from web3.exceptions import ContractLogicError, TimeExhausted
+
+import contract
+from contract import NonceManager
+
+
+class FakeChain:
+    """Blocking web3 stand-in: records broadcasts, mines after a delay."""
+
+    def __init__(self, nonce: int = 7, receipt_delay: float = 0.0):
+        self.nonce = nonce  # pending nonce reported by the node
+        self.receipt_delay = receipt_delay
+        self.sent: list[int] = []
+        self.fail_sends: dict[int, Exception] = {}  # send attempt -> error
+        self.failed: list[int] = []
+        self.receipt_error: Exception | None = None
+        self.nonce_fetches = 0
+
+    def get_transaction_count(self, address, block="latest"):
+        self.nonce_fetches += 1
+        return self.nonce
+
+    def send_raw_transaction(self, raw):
+        attempt = len(self.sent) + len(self.failed)
+        error = self.fail_sends.get(attempt)
+        if error is not None:
+            self.failed.append(attempt)
+            raise error
+        self.sent.append(raw)
+        self.nonce = max(self.nonce, raw + 1)
+        return raw.to_bytes(32, "big")
+
+    def wait_for_transaction_receipt(self, tx_hash):
+        time.sleep(self.receipt_delay)
+        if self.receipt_error is not None:
+            raise self.receipt_error
+        return {"status": 1, "blockNumber": 100, "logs": []}
+
+
+def _vault(chain: FakeChain):
+    vault = contract.VaultContract.__new__(contract.VaultContract)
+    vault.on_transaction = MagicMock()
+    vault.account = MagicMock()
+    # The "raw transaction" is just its nonce, so broadcasts can be checked
+    vault.account.sign_transaction.side_effect = lambda tx: MagicMock(raw_transaction=tx["nonce"])
+    vault.w3 = MagicMock()
+    vault.w3.eth.get_transaction_count.side_effect = chain.get_transaction_count
+    vault.w3.eth.send_raw_transaction.side_effect = chain.send_raw_transaction
+    vault.w3.eth.wait_for_transaction_receipt.side_effect = chain.wait_for_transaction_receipt
+    vault.w3.eth.gas_price = 10**9
+    return vault
+
+
+def _call(estimate=21_000):
+    tx_func = MagicMock()
+    if isinstance(estimate, Exception):
+        tx_func.estimate_gas.side_effect = estimate
+    else:
+        tx_func.estimate_gas.return_value = estimate
+    tx_func.build_transaction.side_effect = lambda params: dict(params)
+    return tx_func, 0
+
+
+class TestNonceManager:
+    """Tests for the local nonce counter."""
+
+    def test_take_is_consecutive(self):
+        nonces = NonceManager()
+        nonces.sync(5)
+
+        assert [nonces.take() for _ in range(3)] == [5, 6, 7]
+
+    def test_sync_only_moves_forward(self):
+        nonces = NonceManager()
+        nonces.sync(5)
+        nonces.take()
+
+        nonces.sync(3)  # lagging node
+        assert nonces.take() == 6
+        nonces.sync(10)  # transactions sent from elsewhere
+        assert nonces.take() == 10
+        nonces.sync(4, force=True)
+        assert nonces.take() == 4
+
+    def test_give_back_last_nonce(self):
+        nonces = NonceManager()
+        nonces.sync(5)
+        nonce = nonces.take()
+
+        nonces.give_back(nonce)
+
+        assert nonces.take() == 5
+
+    def test_reset(self):
+        nonces = NonceManager()
+        nonces.sync(9)
+        nonces.take()
+
+        nonces.reset()
+        nonces.sync(2)
+
+        assert nonces.take() == 2
+
+
+class TestSendBatch:
+    """Tests for the pipelined batch."""
+
+    @pytest.mark.asyncio
+    async def test_consecutive_nonces_one_fetch(self):
+        chain = FakeChain(nonce=7)
+        vault = _vault(chain)
+
+        results = await vault.send_batch([_call(), _call(), _call()])
+
+        assert [r["success"] for r in results] == [True, True, True]
+        assert chain.sent == [7, 8, 9]
+        assert chain.nonce_fetches == 1
+        assert vault.on_transaction.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_receipts_awaited_concurrently(self):
+        chain = FakeChain(receipt_delay=0.3)
+        vault = _vault(chain)
+
+        started = time.monotonic()
+        results = await vault.send_batch([_call(), _call(), _call()])
+
+        assert all(r["success"] for r in results)
+        assert time.monotonic() - started < 0.6  # one confirmation, not three
+
+    @pytest.mark.asyncio
+    async def test_failed_broadcast_leaves_no_gap(self):
+        chain = FakeChain(nonce=7)
+        chain.fail_sends = {1: ValueError("insufficient funds")}
+        vault = _vault(chain)
+
+        results = await vault.send_batch([_call(), _call(), _call()])
+
+        assert [r["success"] for r in results] == [True, False, True]
+        assert "insufficient funds" in results[1]["error"]
+        assert chain.sent == [7, 8]
+
+    @pytest.mark.asyncio
+    async def test_reverting_estimate_skips_call(self):
+        chain = FakeChain(nonce=7)
+        vault = _vault(chain)
+
+        results = await vault.send_batch(
+            [_call(), _call(ContractLogicError("execution reverted")), _call()]
+        )
+
+        assert results[1]["error"] == contract.ERROR_MESSAGES["gas_estimation_failed"]
+        assert chain.sent == [7, 8]
+
+    @pytest.mark.asyncio
+    async def test_nonce_error_resyncs_from_chain(self):
+        chain = FakeChain(nonce=7)
+        vault = _vault(chain)
+        vault.nonces.sync(20)  # counter ran ahead of the chain
+        chain.fail_sends = {0: ValueError("nonce too high")}
+
+        results = await vault.send_batch([_call(), _call()])
+
+        assert [r["success"] for r in results] == [False, True]
+        assert chain.sent == [7]
+
+    @pytest.mark.asyncio
+    async def test_failed_resync_fails_rest_of_batch(self):
+        chain = FakeChain(nonce=7)
+        vault = _vault(chain)
+        chain.fail_sends = {0: ValueError("nonce too low")}
+        fetches = iter([7])
+
+        def get_transaction_count(address, block="latest"):
+            chain.nonce_fetches += 1
+            try:
+                return next(fetches)
+            except StopIteration:
+                raise ConnectionError("rpc down") from None
+
+        vault.w3.eth.get_transaction_count.side_effect = get_transaction_count
+
+        results = await vault.send_batch([_call(), _call(), _call()])
+
+        assert [r["success"] for r in results] == [False, False, False]
+        assert results[2]["error"] == contract.ERROR_MESSAGES["network_error"]
+        assert chain.sent == []
+
+        fetches = iter([9])
+        await vault.send_batch([_call()])
+        assert chain.sent == [9]  # counter was reset, chain value taken
+
+    @pytest.mark.asyncio
+    async def test_lagging_node_does_not_reuse_nonces(self):
+        chain = FakeChain(nonce=7)
+        vault = _vault(chain)
+        await vault.send_batch([_call(), _call()])
+
+        chain.nonce = 7  # node has not seen the broadcasts yet
+        await vault.send_batch([_call()])
+
+        assert chain.sent == [7, 8, 9]
+
+    @pytest.mark.asyncio
+    async def test_dropped_transaction_resets_counter(self):
+        chain = FakeChain(nonce=7)
+        vault = _vault(chain)
+        chain.receipt_error = TimeExhausted("not mined")
+
+        results = await vault.send_batch([_call()])
+        chain.receipt_error = None
+        chain.nonce = 7  # the transaction was dropped
+        await vault.send_batch([_call()])
+
+        assert results[0]["success"] is False
+        assert chain.sent == [7, 7]
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        chain = FakeChain()
+
+        assert await _vault(chain).send_batch([]) == []
+        assert chain.nonce_fetches == 0
+
+
+class TestLoopRestart:
+    """Tests for the nonce lock across event loop restarts."""
+
+    def test_new_loop_gets_new_lock_and_counter(self):
+        chain = FakeChain(nonce=7)
+        vault = _vault(chain)
+
+        async def send():
+            await vault.send_batch([_call()])
+            return vault.nonces.lock
+
+        first = asyncio.run(send())
+        chain.nonce = 7  # broadcast lost with the old loop
+        second = asyncio.run(send())
+
+        assert first is not second
+        assert chain.sent == [7, 7]
+
+
+class TestApplyStrategyChanges:
+    """Tests for adding / disabling strategies in one batch."""
+
+    @pytest.mark.asyncio
+    async def test_mixed_changes(self):
+        chain = FakeChain(nonce=3)
+        vault = _vault(chain)
+        vault.contract = MagicMock()
+        vault.contract.functions.addStrategy.return_value = _call()[0]
+        vault.contract.functions.disableStrategy.return_value = _call()[0]
+
+        with patch.object(vault, "_parse_strategy_id_from_logs", return_value=42):
+            results = await vault.apply_strategy_changes(
+                [
+                    {"action": "disable", "strategy_id": 5},
+                    {"action": "add", "content": "", "expiry": 0, "priority": 1},
+                    {"action": "add", "content": "Buy dips", "expiry": 0, "priority": 2},
+                ]
+            )
+
+        assert results[0]["success"] is True
+        assert results[1] == {"success": False, "error": "Strategy content cannot be empty"}
+        assert results[2]["strategyId"] == 42
+        assert chain.sent == [3, 4]
+        vault.contract.functions.disableStrategy.assert_called_once_with(5)
+        vault.contract.functions.addStrategy.assert_called_once_with("Buy dips", 0, 2)
+
+
+class TestExecuteAll:
+    """Tests for the advisor "Execute All" button."""
+
+    @pytest.mark.asyncio
+    async def test_execute_suggestions_uses_one_batch(self):
+        from advisor import Suggestion
+        from advisor_monitor import execute_suggestions
+
+        vault = MagicMock()
+        vault.apply_strategy_changes = AsyncMock(
+            return_value=[
+                {"success": True, "transactionHash": "0xaaaaaaaaaaaa", "strategyId": 9},
+                {"success": False, "error": "reverted"},
+            ]
+        )
+        suggestions = [
+            Suggestion(action="add", content="Buy", priority=1, reason="r", expiry_hours=2),
+            {"action": "disable", "strategy_id": 4},
+            {"action": "pause"},
+        ]
+
+        with patch("main.get_contract", return_value=vault):
+            messages = await execute_suggestions(suggestions)
+
+        changes = vault.apply_strategy_changes.await_args.args[0]
+        assert [c["action"] for c in changes] == ["add", "disable"]
+        assert changes[0]["expiry"] > time.time()
+        assert messages == [
+            "Strategy #9 added (TX: 0xaaaaaaaa...)",
+            "Failed: reverted",
+            "Unknown action: pause",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_execute_all_button(self):
+        from advisor_monitor import handle_advisor_callback, pending_requests
+
+        pending_requests["batch001"] = {
+            "suggestions": [{"action": "disable", "strategy_id": 1}] * 3,
+            "created_at": datetime.now(),
+            "executed": False,
+        }
+        update = MagicMock()
+        update.callback_query.data = "adv:batch001:all"
+        update.callback_query.message.text = "Suggestions"
+        update.callback_query.answer = AsyncMock()
+        update.callback_query.edit_message_text = AsyncMock()
+
+        with (
+            patch("config.is_admin", return_value=True),
+            patch(
+                "advisor_monitor.execute_suggestions", AsyncMock(return_value=["ok"] * 3)
+            ) as execute,
+        ):
+            await handle_advisor_callback(update, MagicMock())
+
+        execute.assert_awaited_once()
+        text = update.callback_query.edit_message_text.await_args.args[0]
+        assert text.endswith("[1] ok\n[2] ok\n[3] ok")
+        assert "batch001" not in pending_requests
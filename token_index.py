@@ -0,0 +1,386 @@
+"""
+Token Index Module
+
+Maintains a symbol -> token index built from the paginated /tokens endpoint.
+Pages are fetched concurrently with a bounded fan-out, the index is persisted
+to disk so restarts start warm, and an expired index is refreshed in the
+background instead of blocking the lookup that noticed the expiry.
+
+The index also backs local search (prefix trie + typo-tolerant matching) and
+local paging of the token list.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from utils.json_file import write_json_atomic
+from utils.rate_limiter import use_background_priority
+
+if TYPE_CHECKING:
+    from api import TerminalAPI
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = Path(os.getenv("TOKEN_INDEX_FILE", "data/token_index.json"))
+TOKEN_INDEX_TTL = 3600  # 1 hour
+PAGE_SIZE = 50
+MAX_PAGES = 50
+FETCH_CONCURRENCY = 5
+
+# Fields kept per token (enough for lookup and local /tokens paging)
+TOKEN_FIELDS = ("symbol", "name", "tokenAddress", "type")
+
+# Search configuration
+SEARCH_LIMIT = 10
+MIN_NAME_WORD_LENGTH = 2
+
+
+class _TrieNode:
+    __slots__ = ("children", "symbols")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.symbols: set[str] = set()
+
+
+class TokenSearch:
+    """Prefix trie over token symbols and name words with fuzzy matching.
+
+    Keys are upper-cased; every key maps back to the token symbols it came
+    from, so "pep" finds PEPE and a name word like "Pepe Coin" finds its symbol.
+
+    Args:
+        tokens: Token index (SYMBOL -> token dict)
+    """
+
+    def __init__(self, tokens: dict[str, dict[str, Any]]):
+        self.root = _TrieNode()
+        for symbol, token in tokens.items():
+            self._insert(symbol, symbol)
+            for word in str(token.get("name") or "").upper().split():
+                if len(word) >= MIN_NAME_WORD_LENGTH:
+                    self._insert(word, symbol)
+
+    def _insert(self, key: str, symbol: str):
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.symbols.add(symbol)
+
+    def prefix(self, query: str, limit: int = SEARCH_LIMIT) -> list[str]:
+        """Symbols whose symbol or name word starts with query, shortest keys first."""
+        node = self.root
+        for ch in query.upper():
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        results: list[str] = []
+        level = [node]
+        while level and len(results) < limit:
+            for current in level:
+                for symbol in sorted(current.symbols):
+                    if symbol not in results:
+                        results.append(symbol)
+            level = [child for current in level for _, child in sorted(current.children.items())]
+        return results[:limit]
+
+    def fuzzy(self, query: str, max_distance: int | None = None) -> list[tuple[int, str]]:
+        """Symbols within an edit distance of query.
+
+        Walks the trie carrying one Levenshtein DP row per node and prunes
+        branches whose best cell already exceeds max_distance.
+
+        Returns:
+            (distance, symbol) pairs sorted by distance
+        """
+        word = query.upper()
+        if max_distance is None:
+            max_distance = 1 if len(word) <= 4 else 2
+        found: dict[str, int] = {}
+        first_row = list(range(len(word) + 1))
+
+        stack = [(child, ch, first_row) for ch, child in self.root.children.items()]
+        while stack:
+            node, ch, prev_row = stack.pop()
+            row = [prev_row[0] + 1]
+            for col in range(1, len(word) + 1):
+                row.append(
+                    min(
+                        row[col - 1] + 1,
+                        prev_row[col] + 1,
+                        prev_row[col - 1] + (word[col - 1] != ch),
+                    )
+                )
+            if row[-1] <= max_distance:
+                for symbol in node.symbols:
+                    found[symbol] = min(found.get(symbol, row[-1]), row[-1])
+            if min(row) <= max_distance:
+                stack.extend((child, next_ch, row) for next_ch, child in node.children.items())
+
+        return sorted((distance, symbol) for symbol, distance in found.items())
+
+
+class TokenIndex:
+    """Symbol -> token index with concurrent build and disk persistence.
+
+    Args:
+        api: TerminalAPI instance used to page through /tokens
+        path: JSON file the index is persisted to (default: INDEX_FILE)
+        ttl: Seconds before the index is considered expired
+        concurrency: Maximum number of /tokens pages fetched at once
+
+    Example:
+        index = TokenIndex(api)
+        address = await index.lookup("PEPE")
+    """
+
+    def __init__(
+        self,
+        api: "TerminalAPI",
+        path: Path | None = None,
+        ttl: float = TOKEN_INDEX_TTL,
+        concurrency: int = FETCH_CONCURRENCY,
+    ):
+        self.api = api
+        self.path = Path(path) if path is not None else INDEX_FILE
+        self.ttl = ttl
+        self.concurrency = max(concurrency, 1)
+        self.tokens: dict[str, dict[str, Any]] = {}
+        # Listing position -> token, so paging matches the API even when symbols repeat
+        self.listing: dict[int, dict[str, Any]] = {}
+        self.built_at: float = 0
+        self._loaded = False
+        self._refresh_task: asyncio.Task | None = None
+        self._search: TokenSearch | None = None
+
+    @property
+    def is_expired(self) -> bool:
+        return (time.time() - self.built_at) > self.ttl
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    def load(self) -> bool:
+        """Load a previously persisted index from disk.
+
+        Returns:
+            True if an index was loaded
+        """
+        self._loaded = True
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            listing = {int(t.get("rank", i)): t for i, t in enumerate(data.get("tokens", []))}
+            tokens: dict[str, dict[str, Any]] = {}
+            for rank in sorted(listing):
+                token = listing[rank]
+                if token.get("symbol") and token.get("tokenAddress"):
+                    tokens.setdefault(token["symbol"].upper(), token)
+        except (OSError, json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to load token index: {e}")
+            return False
+        self.tokens = tokens
+        self.listing = listing
+        self._search = None
+        self.built_at = float(data.get("built_at", 0))
+        logger.info(f"Loaded {len(tokens)} tokens from {self.path}")
+        return True
+
+    def _save(self):
+        """Persist the index atomically (write temp file, then rename)."""
+        payload = {
+            "built_at": self.built_at,
+            "tokens": [self.listing[rank] for rank in sorted(self.listing)],
+        }
+        write_json_atomic(self.path, payload)
+
+    def warm_up(self):
+        """Load the persisted index and start a background refresh if needed.
+
+        Called from post_init so the first /token lookup does not pay for a build.
+        """
+        if not self._loaded:
+            self.load()
+        if not self.tokens or self.is_expired:
+            self.refresh_background()
+
+    async def ensure_ready(self):
+        """Make sure the index can serve lookups.
+
+        A cold (empty) index is built in the foreground; an expired one keeps
+        serving its current contents while refreshing in the background.
+        """
+        if not self._loaded:
+            self.load()
+        if not self.tokens:
+            await self.refresh()
+        elif self.is_expired:
+            self.refresh_background()
+
+    async def lookup(self, symbol: str) -> str | None:
+        """Get a token address by symbol (case-insensitive)."""
+        await self.ensure_ready()
+        token = self.tokens.get(symbol.upper())
+        return token.get("tokenAddress") if token else None
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[dict[str, Any]]:
+        """Find tokens matching query: exact symbol, then prefix, then fuzzy matches.
+
+        Served entirely from memory; the search structure is rebuilt lazily
+        after the index changes.
+        """
+        query = query.strip().upper()
+        if not query or not self.tokens:
+            return []
+        if self._search is None:
+            self._search = TokenSearch(self.tokens)
+
+        symbols = [query] if query in self.tokens else []
+        for symbol in self._search.prefix(query, limit):
+            if symbol not in symbols:
+                symbols.append(symbol)
+        if len(symbols) < limit:
+            for _, symbol in self._search.fuzzy(query):
+                if symbol not in symbols:
+                    symbols.append(symbol)
+        return [self.tokens[s] for s in symbols[:limit] if s in self.tokens]
+
+    def page(self, page: int = 1, limit: int = 10) -> dict[str, Any]:
+        """Page through the listing in API order, shaped like the /tokens response."""
+        ranks = sorted(self.listing)
+        start = (max(page, 1) - 1) * limit
+        return {
+            "items": [self.listing[rank] for rank in ranks[start : start + limit]],
+            "total": len(ranks),
+        }
+
+    def refresh_background(self) -> asyncio.Task:
+        """Start a refresh unless one is already running."""
+        if not self.refreshing:
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    def discard_refresh(self):
+        """Forget the refresh task (it belongs to an event loop that is gone)."""
+        self._refresh_task = None
+
+    async def refresh(self):
+        """Refresh the index, joining a refresh that is already running."""
+        await asyncio.shield(self.refresh_background())
+
+    async def _refresh(self):
+        """Fetch all pages and merge them into the index as they arrive.
+
+        Tokens are upserted page by page so lookups see new tokens before the
+        whole listing completes. Symbols (and listing positions) missing from
+        the listing are only dropped when every page was fetched successfully.
+        """
+        # 在后台任务中运行，让用户命令优先
+        use_background_priority()
+        started = time.monotonic()
+        seen: set[str] = set()
+        listed: set[int] = set()
+        try:
+            complete = await self._fetch_pages(seen, listed)
+        except Exception as e:
+            logger.error(f"Token index refresh failed: {e}")
+            return
+        if not listed:
+            logger.warning("Token index refresh returned no tokens, keeping current index")
+            return
+        if complete:
+            for symbol in set(self.tokens) - seen:
+                del self.tokens[symbol]
+            for rank in set(self.listing) - listed:
+                del self.listing[rank]
+        self._search = None
+        self.built_at = time.time()
+        try:
+            await asyncio.to_thread(self._save)
+        except OSError as e:
+            logger.warning(f"Failed to persist token index: {e}")
+        logger.info(
+            f"Token index refreshed: {len(self.tokens)} tokens in {time.monotonic() - started:.2f}s"
+        )
+
+    async def _fetch_pages(self, seen: set[str], listed: set[int]) -> bool:
+        """Fetch /tokens pages concurrently and merge each page.
+
+        The first page tells us the total when the API provides one; otherwise
+        pages are fetched in windows of `concurrency` until a short page.
+
+        Returns:
+            True if the full listing was fetched without errors
+        """
+        first = await self._fetch_page(1, seen, listed)
+        if first is None:
+            return False
+        items, total = first
+        if len(items) < PAGE_SIZE:
+            return True
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(page: int):
+            async with semaphore:
+                return await self._fetch_page(page, seen, listed)
+
+        if total:
+            last_page = min(math.ceil(total / PAGE_SIZE), MAX_PAGES)
+            results = await asyncio.gather(*(fetch(p) for p in range(2, last_page + 1)))
+            return all(r is not None for r in results) and total <= MAX_PAGES * PAGE_SIZE
+
+        page = 2
+        while page <= MAX_PAGES:
+            window = range(page, min(page + self.concurrency, MAX_PAGES + 1))
+            results = await asyncio.gather(*(fetch(p) for p in window))
+            if any(r is None for r in results):
+                return False
+            if any(len(r[0]) < PAGE_SIZE for r in results):
+                return True
+            page = window.stop
+        return False
+
+    async def _fetch_page(
+        self, page: int, seen: set[str], listed: set[int]
+    ) -> tuple[list, int | None] | None:
+        """Fetch one page and upsert its tokens.
+
+        Fields the API left out stay absent from the entry, so callers' .get()
+        defaults still apply. Tokens sharing a symbol all stay in the listing;
+        lookups resolve the symbol to the one listed first.
+
+        Returns:
+            (items, total) or None on error
+        """
+        data = await self.api._get("/tokens", {"page": page, "limit": PAGE_SIZE})
+        if isinstance(data, dict) and "error" in data:
+            logger.warning(f"Failed to fetch tokens page {page}: {data['error']}")
+            return None
+        items = data if isinstance(data, list) else data.get("items", [])
+        total = None if isinstance(data, list) else data.get("total")
+        for position, token in enumerate(items):
+            rank = (page - 1) * PAGE_SIZE + position
+            entry = {k: token[k] for k in TOKEN_FIELDS if token.get(k) is not None}
+            entry["rank"] = rank
+            self.listing[rank] = entry
+            listed.add(rank)
+            symbol = str(entry.get("symbol", "")).upper()
+            if not symbol or not entry.get("tokenAddress"):
+                continue
+            if symbol not in seen or rank < self.tokens[symbol]["rank"]:
+                self.tokens[symbol] = entry
+                seen.add(symbol)
+        if items:
+            self._search = None
+        return items, total
@@ -0,0 +1,153 @@
+"""熔断器、重试预算和带抖动的指数退避。
+
+上游不可用时快速失败，避免大量协程挂在重试和超时上。
+"""
+
+import random
+import time
+from collections import deque
+from collections.abc import Callable
+
+# 熔断器状态
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """单个 endpoint 的熔断器。
+
+    - closed: 正常放行，连续失败达到阈值后进入 open
+    - open: 直接拒绝，reset_timeout 秒后进入 half-open
+    - half-open: 只放行一个探测请求，成功则 closed，失败则重新 open
+
+    Args:
+        failure_threshold: 连续失败多少次后熔断
+        reset_timeout: 熔断后多久允许探测（秒）
+        clock: 时间函数（测试时可替换）
+
+    Example:
+        breaker = CircuitBreaker()
+        if not breaker.allow_request():
+            return {"error": "Circuit open"}
+        try:
+            result = await call()
+            breaker.record_success()
+        except aiohttp.ClientError:
+            breaker.record_failure()
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: float | None = None
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态（open 超过 reset_timeout 后视为 half-open）。"""
+        if self._state == OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """距离允许探测还剩多少秒（非 open 状态返回 0）。"""
+        if self._state != OPEN:
+            return 0.0
+        return max(self.reset_timeout - (self._clock() - self.opened_at), 0.0)
+
+    def allow_request(self) -> bool:
+        """判断是否放行请求。half-open 状态下同一时间只放行一个探测请求。"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            now = self._clock()
+            # 探测请求被取消时不会回报结果，超过 reset_timeout 后允许新的探测
+            if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._probe_started = now
+                return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self._state = CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_started = None
+        if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = OPEN
+            self.opened_at = self._clock()
+
+
+class RetryBudget:
+    """全局重试预算：滑动窗口内的重试次数不超过请求数的一定比例。
+
+    上游整体故障时，所有调用方的重试加起来也不会把请求量放大数倍。
+
+    Args:
+        ratio: 允许的重试占请求数的比例
+        min_retries: 窗口内始终允许的最少重试次数（低流量时也能重试）
+        window: 滑动窗口长度（秒）
+        clock: 时间函数（测试时可替换）
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries: int = 10,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self.exhausted = 0
+
+    def _trim(self, now: float):
+        cutoff = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] <= cutoff:
+                events.popleft()
+
+    def record_request(self):
+        now = self._clock()
+        self._trim(now)
+        self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """申请一次重试，预算用完时返回 False。"""
+        now = self._clock()
+        self._trim(now)
+        allowed = max(self.min_retries, int(len(self._requests) * self.ratio))
+        if len(self._retries) >= allowed:
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = 0.5,
+    cap: float = 8.0,
+    rand: Callable[[], float] | None = None,
+) -> float:
+    """Full jitter 指数退避：在 [0, min(cap, base * 2^attempt)) 内随机取值。"""
+    return (rand or random.random)() * min(cap, base * (2**attempt))
@@ -1,4 +1,8 @@
-"""格式化工具函数模块。"""
+"""格式化工具函数模块。
+
+金额类函数把 None（缺失或无法解析的字段）按 0 显示，与直接读取 API 字段、
+缺省值为 "0" 时的输出一致。
+"""
 
 from datetime import UTC, datetime
 
@@ -6,7 +10,7 @@ from datetime import UTC, datetime
 def format_eth(wei: str) -> str:
     """将 Wei 转换为 ETH 字符串。"""
     try:
-        return f"{float(wei) / 1e18:.6f}"
+        return f"{float(0 if wei is None else wei) / 1e18:.6f}"
     except (ValueError, TypeError):
         return wei
 
@@ -14,15 +18,26 @@ def format_eth(wei: str) -> str:
 def format_usd(value) -> str:
     """格式化 USD 金额。"""
     try:
-        return f"${float(value):.2f}"
+        return f"${float(0 if value is None else value):.2f}"
+    except (ValueError, TypeError):
+        return str(value)
+
+
+def format_price(value) -> str:
+    """格式化 USD 单价，小于 $0.01 时保留有效数字（meme token 价格很小）。"""
+    try:
+        v = float(0 if value is None else value)
     except (ValueError, TypeError):
         return str(value)
+    if v == 0 or abs(v) >= 0.01:
+        return f"${v:.2f}"
+    return "$" + f"{v:.10f}".rstrip("0")
 
 
 def format_percent(value) -> str:
     """格式化百分比，带正负号。"""
     try:
-        v = float(value)
+        v = float(0 if value is None else value)
         sign = "+" if v > 0 else ""
         return f"{sign}{v:.2f}%"
     except (ValueError, TypeError):
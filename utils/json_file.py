@@ -0,0 +1,18 @@
+"""JSON 状态文件的原子写入。"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+def write_json_atomic(path: Path, data: Any):
+    """原子地写入 JSON 文件（先写临时文件再重命名），读者不会看到写了一半的文件。
+
+    会自动创建父目录；写入失败时抛出 OSError，由调用方决定如何处理。
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
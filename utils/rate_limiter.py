@@ -0,0 +1,145 @@
+"""客户端令牌桶限流，带优先级通道并根据 429 / Retry-After 自适应。
+
+所有后台服务和用户命令共享同一个限流器；用户命令走 interactive 通道，
+有 interactive 请求在等待时，background 请求让行。
+"""
+
+import asyncio
+import contextvars
+import time
+from collections.abc import Callable
+from email.utils import parsedate_to_datetime
+
+# 优先级通道（数值越小优先级越高）
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# 当前协程的请求优先级。asyncio.create_task 会复制 context，
+# 所以在后台服务的 start() 开头设置一次即可覆盖整个循环。
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "request_priority", default=INTERACTIVE
+)
+
+
+def use_background_priority():
+    """将当前 context 中的 API 请求标记为后台优先级（在后台服务的 start() 中调用）。"""
+    request_priority.set(BACKGROUND)
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数。"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at - (time.time() if now is None else now), 0.0)
+
+
+class RateLimiter:
+    """令牌桶限流器。
+
+    - 按 rate 匀速补充令牌，最多积累 burst 个
+    - 收到 429 时暂停发放令牌直到 Retry-After 到期（最多 max_block 秒），并将速率减半
+    - 之后每次成功请求把速率逐步恢复到配置值
+
+    Args:
+        rate: 每秒允许的请求数
+        burst: 令牌桶容量
+        min_rate: 429 降速的下限
+        max_block: 单次 429 最多暂停发放令牌的秒数，过长的 Retry-After
+                   不会让之后所有请求（包括用户命令）都跟着等下去
+        clock: 时间函数（测试时可替换）
+
+    Example:
+        limiter = RateLimiter(rate=10, burst=20)
+        await limiter.acquire()
+        ...
+        if resp.status == 429:
+            limiter.record_throttled(parse_retry_after(resp.headers.get("Retry-After")))
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        min_rate: float = 0.5,
+        max_block: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_rate = max(rate, min_rate)
+        self.rate = self.max_rate
+        self.min_rate = min_rate
+        self.max_block = max_block
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self.blocked_until = 0.0
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        elapsed = max(now - self._updated, 0.0)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _preempted(self, priority: int) -> bool:
+        """是否有更高优先级的请求在等待。"""
+        return any(count for lane, count in self._waiting.items() if lane < priority)
+
+    def try_acquire(self, priority: int = INTERACTIVE) -> float:
+        """尝试取一个令牌。
+
+        Returns:
+            0 表示已取到令牌，否则为建议的等待秒数
+        """
+        now = self._clock()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self._preempted(priority):
+            return 1.0 / self.rate
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self, priority: int | None = None):
+        """等待直到取到令牌。不传 priority 时使用当前 context 的 request_priority。"""
+        if priority is None:
+            priority = request_priority.get()
+        wait = self.try_acquire(priority)
+        if not wait:
+            return
+        self._waiting[priority] += 1
+        try:
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self.try_acquire(priority)
+        finally:
+            self._waiting[priority] -= 1
+
+    def record_throttled(self, retry_after: float | None = None):
+        """收到 429：暂停发放令牌（不超过 max_block 秒）并降速。"""
+        self.throttled += 1
+        now = self._clock()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._refill(now)
+        self._tokens = 0.0
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + min(retry_after, self.max_block))
+
+    def record_success(self):
+        """请求成功：逐步恢复速率（每次恢复最大速率的 5%）。"""
+        if self.rate < self.max_rate:
+            self._refill(self._clock())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    @property
+    def waiting(self) -> int:
+        return sum(self._waiting.values())
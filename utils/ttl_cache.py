@@ -0,0 +1,94 @@
+"""带 TTL 和 LRU 淘汰的内存缓存，支持 stale-while-revalidate。"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """缓存条目。
+
+    Attributes:
+        value: 缓存值
+        stored_at: 写入时间 (time.monotonic)
+        ttl: 新鲜期（秒），期内直接返回
+        stale_ttl: 过期后仍可返回旧值的宽限期（秒），期内返回旧值并后台刷新
+    """
+
+    value: Any
+    stored_at: float
+    ttl: float
+    stale_ttl: float = 0.0
+
+    def age(self, now: float) -> float:
+        return now - self.stored_at
+
+    def is_fresh(self, now: float) -> bool:
+        return self.age(now) < self.ttl
+
+    def is_usable(self, now: float) -> bool:
+        return self.age(now) < self.ttl + self.stale_ttl
+
+
+class TTLCache:
+    """有容量上限的 TTL 缓存，超过上限时淘汰最久未使用的条目。
+
+    Args:
+        max_entries: 最大条目数
+        clock: 时间函数（测试时可替换）
+
+    Example:
+        cache = TTLCache(max_entries=128)
+        cache.set(key, value, ttl=15, stale_ttl=30)
+        entry = cache.get(key)
+        if entry and entry.is_fresh(cache.now()):
+            return entry.value
+    """
+
+    def __init__(self, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(max_entries, 1)
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self.evictions = 0
+
+    def now(self) -> float:
+        return self._clock()
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        """获取仍可用（新鲜或在宽限期内）的条目，已完全过期的条目会被删除。"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.is_usable(self.now()):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0.0):
+        """写入条目，必要时淘汰最久未使用的条目。"""
+        self._entries[key] = CacheEntry(value, self.now(), ttl, stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] | None = None) -> int:
+        """删除匹配的条目（不传 predicate 则清空），返回删除数量。"""
+        if predicate is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+        keys = [k for k in self._entries if predicate(k)]
+        for k in keys:
+            del self._entries[k]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries